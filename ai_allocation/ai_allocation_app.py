@@ -5,20 +5,19 @@ Runs on port 8001.
 """
 
 import os
-import re
-import json
-import requests
 from typing import List, Optional
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from managix_common.groq_client import GroqError, aclose
+from managix_common.structured_output import structured_completion
 
 # Load environment variables
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = "llama-3.1-8b-instant"
 
 app = FastAPI(
@@ -69,6 +68,52 @@ class TeamMemberInfo(BaseModel):
     experience: List[ExperienceItem] = []
     activeTasks: int = 0
 
+# Response shapes (the OUTPUT FORMAT of each prompt); used for JSON mode validation.
+# Endpoints return what the model sent: keys it left out are not filled in
+# (call_groq dumps with exclude_unset) and keys not declared here are kept.
+
+class ResponseShape(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+class TeamSuggestion(ResponseShape):
+    userId: str = ""
+    role: str = ""
+    reason: str = ""
+
+class SuggestTeamResponse(ResponseShape):
+    team: List[TeamSuggestion] = []
+
+class EmployeeRecommendation(ResponseShape):
+    userId: str = ""
+    matchScore: int = 0
+    reason: str = ""
+
+class SuggestEmployeesResponse(ResponseShape):
+    recommendedEmployees: List[EmployeeRecommendation] = []
+
+class TaskAssignment(ResponseShape):
+    taskId: str = ""
+    userId: str = ""
+    reason: str = ""
+    confidence: int = 0
+
+class SuggestTaskAllocationResponse(ResponseShape):
+    taskAssignments: List[TaskAssignment] = []
+
+class PlanTask(ResponseShape):
+    title: str = ""
+    description: str = ""
+
+class PlanMilestone(ResponseShape):
+    title: str = ""
+    description: str = ""
+    deadlineOffsetDays: int = 0
+    budgetPercentage: float = 0.0
+    tasks: List[PlanTask] = []
+
+class GeneratePlanResponse(ResponseShape):
+    milestones: List[PlanMilestone] = []
+
 # Request models with Swagger examples
 
 class SuggestTeamRequest(BaseModel):
@@ -135,180 +180,6 @@ class SuggestTaskAllocationRequest(BaseModel):
         }
     }
 
-# ---------------------------------------------------------------------------
-# Groq JSON extraction (copied from resume_parser/fastapi_app.py lines 151-319)
-# ---------------------------------------------------------------------------
-
-def extract_json_from_groq_response(response_text: str) -> dict:
-    """Extract JSON from Groq response (handles markdown code blocks and text before JSON)"""
-    if not response_text:
-        print("[WARNING] Empty response text from Groq")
-        return {}
-
-    text = response_text.strip()
-    original_text = text
-
-    # Strategy 1: Look for JSON in markdown code blocks first (most reliable)
-    # Handle both complete and incomplete code blocks
-    if "```json" in text or "```" in text:
-        # Find all code block markers
-        code_blocks = list(re.finditer(r'```(?:json)?', text))
-        if code_blocks:
-            # Extract content from first code block
-            start_marker = code_blocks[0].end()
-            # Find the next ``` after start_marker, or use end of text if not found
-            end_marker = text.find("```", start_marker)
-            if end_marker == -1:
-                # No closing ```, use end of text (incomplete JSON from Groq)
-                end_marker = len(text)
-                print("[DEBUG] No closing ``` found, using end of text (JSON might be incomplete)")
-
-            text = text[start_marker:end_marker].strip()
-            print("[DEBUG] Extracted JSON from markdown code block")
-
-    text = text.strip()
-
-    # Strategy 3: Find JSON object boundaries by matching braces (handles text before JSON)
-    if not text.startswith("{"):
-        start_idx = text.find("{")
-        if start_idx != -1:
-            # Count braces to find the matching closing brace
-            brace_count = 0
-            end_idx = -1
-            for i in range(start_idx, len(text)):
-                if text[i] == '{':
-                    brace_count += 1
-                elif text[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_idx = i
-                        break
-
-            if end_idx != -1 and end_idx > start_idx:
-                text = text[start_idx:end_idx+1]
-                print("[DEBUG] Extracted JSON object from text with prefix (handled nested braces)")
-
-    text = text.strip()
-
-    # Strategy 4: Try to parse as-is
-    try:
-        parsed = json.loads(text)
-        print(f"[DEBUG] Successfully parsed JSON with {len(parsed)} top-level keys")
-        return parsed
-    except json.JSONDecodeError as e:
-        print(f"[WARNING] Initial JSON parse failed: {str(e)} at position {e.pos}")
-        print(f"[DEBUG] Text around error (chars {max(0, e.pos-100)} to {min(len(text), e.pos+100)}):")
-        print(f"  ...{text[max(0, e.pos-100):e.pos+100]}...")
-
-        # Strategy 5: Fix common JSON issues
-        try:
-            fixed_text = text
-            # Remove trailing commas
-            fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-            # Fix unclosed strings (if any)
-            # Remove any text after the last }
-            last_brace = fixed_text.rfind('}')
-            if last_brace != -1:
-                fixed_text = fixed_text[:last_brace+1]
-
-            parsed = json.loads(fixed_text)
-            print("[DEBUG] Successfully parsed after fixing JSON issues (trailing commas, etc.)")
-            return parsed
-        except json.JSONDecodeError as e2:
-            print(f"[ERROR] JSON decode error after fixes: {str(e2)} at position {e2.pos}")
-
-            # Strategy 6: Try progressive truncation from the end
-            # Sometimes Groq returns incomplete JSON or extra text
-            brace_start = text.find('{')
-            if brace_start != -1:
-                print(f"[DEBUG] Attempting progressive truncation from position {len(text)}")
-                # Try different end positions, starting from the last } and working backwards
-                last_brace = text.rfind('}')
-                if last_brace != -1:
-                    # Try parsing from first { to last }
-                    try:
-                        potential_json = text[brace_start:last_brace+1]
-                        parsed = json.loads(potential_json)
-                        print(f"[DEBUG] Successfully parsed by using first {{ to last }}")
-                        return parsed
-                    except:
-                        pass
-
-                # Try truncating character by character from the end
-                for truncate_pos in range(len(text), brace_start + 50, -1):
-                    try:
-                        potential_json = text[brace_start:truncate_pos]
-                        # Check if it's valid JSON structure
-                        if potential_json.count('{') == potential_json.count('}'):
-                            parsed = json.loads(potential_json)
-                            print(f"[DEBUG] Successfully parsed by truncating to position {truncate_pos}")
-                            return parsed
-                    except:
-                        continue
-
-            # Strategy 7: Try to fix incomplete JSON by closing arrays/objects intelligently
-            try:
-                fixed_text = text
-
-                # Remove trailing commas first
-                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-
-                # Count unclosed brackets/braces
-                open_braces = fixed_text.count('{') - fixed_text.count('}')
-                open_brackets = fixed_text.count('[') - fixed_text.count(']')
-
-                # If we have unclosed structures, try to fix them
-                if open_braces > 0 or open_brackets > 0:
-                    # Find where the JSON is incomplete and close it properly
-                    # Close brackets first (they're inside objects), then braces
-                    if open_brackets > 0:
-                        # Find the last unclosed array
-                        last_open_bracket = fixed_text.rfind('[')
-                        if last_open_bracket != -1:
-                            # Check if it has content
-                            after_bracket = fixed_text[last_open_bracket+1:].strip()
-                            if after_bracket and not after_bracket.startswith(']'):
-                                # There's content, need to close the array
-                                # Find a safe place to insert ]
-                                # Look for the last complete item before the truncation
-                                fixed_text = fixed_text.rstrip()
-                                if not fixed_text.endswith(']'):
-                                    fixed_text += ']'
-                                    open_brackets -= 1
-
-                    # Close braces
-                    if open_braces > 0:
-                        fixed_text = fixed_text.rstrip()
-                        if not fixed_text.endswith('}'):
-                            # Find where to close - before the last incomplete structure
-                            fixed_text += '\n' + '}' * open_braces
-
-                    # Close remaining brackets
-                    if open_brackets > 0:
-                        fixed_text += '\n' + ']' * open_brackets
-
-                # Remove any trailing commas again after closing
-                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-
-                parsed = json.loads(fixed_text)
-                print(f"[DEBUG] Successfully parsed after closing {open_braces} braces and {open_brackets} brackets")
-                return parsed
-            except Exception as e3:
-                print(f"[WARNING] Failed to fix incomplete JSON: {str(e3)}")
-                import traceback
-                print(f"[DEBUG] Traceback: {traceback.format_exc()}")
-
-            # Strategy 8: Last resort - try to extract partial data and return what we can
-            print(f"[ERROR] All JSON extraction strategies failed")
-            print(f"[DEBUG] Full response text length: {len(original_text)}")
-            print(f"[DEBUG] First 1000 chars of original: {original_text[:1000]}")
-            print(f"[DEBUG] Last 500 chars of original: {original_text[-500:]}")
-            print(f"[DEBUG] Extracted text length: {len(text)}")
-            print(f"[DEBUG] First 1000 chars of extracted: {text[:1000]}")
-
-            # Return empty dict so caller can handle gracefully
-            return {}
-
 # ---------------------------------------------------------------------------
 # Groq LLM helper
 # ---------------------------------------------------------------------------
@@ -318,39 +189,30 @@ SYSTEM_MESSAGE = (
     "and task allocation. Always return complete, valid JSON. Never truncate your response."
 )
 
-def call_groq(prompt: str) -> dict:
-    """Call Groq LLM and return parsed JSON."""
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "model": GROQ_MODEL,
-        "messages": [
-            {"role": "system", "content": SYSTEM_MESSAGE},
-            {"role": "user", "content": prompt},
-        ],
-        "max_tokens": 4096,
-        "temperature": 0.3,
-    }
+async def call_groq(prompt: str, response_model=None) -> dict:
+    """Call Groq LLM in JSON mode and return parsed JSON (validated against response_model when it fits)."""
+    messages = [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt},
+    ]
 
     print(f"[DEBUG] Sending request to Groq API ({GROQ_MODEL})...")
     print(f"[DEBUG] Prompt length: {len(prompt)} chars")
 
-    response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=60)
-    print(f"[DEBUG] Groq API response status: {response.status_code}")
-
-    if response.status_code != 200:
-        error_detail = response.text
-        print(f"[ERROR] Groq API error: {error_detail}")
-        raise HTTPException(status_code=500, detail=f"Groq API error: {error_detail}")
+    try:
+        parsed, info = await structured_completion(
+            messages, response_model, model=GROQ_MODEL, max_tokens=4096, temperature=0.3, api_key=GROQ_API_KEY,
+            exclude_unset=True,
+        )
+    except GroqError as e:
+        print(f"[ERROR] Groq API error: {e.body}")
+        raise HTTPException(status_code=500, detail=f"Groq API error: {e.body}")
 
-    data = response.json()
-    raw_text = data["choices"][0]["message"]["content"]
-    print(f"[DEBUG] Groq raw response length: {len(raw_text)} chars")
+    raw_text = info["content"]
+    print(f"[DEBUG] Groq raw response length: {len(raw_text)} chars "
+          f"(validated={info['validated']}, continuations={info['continuations']})")
     print(f"[DEBUG] Groq raw response (first 500 chars): {raw_text[:500]}")
 
-    parsed = extract_json_from_groq_response(raw_text)
     if not parsed:
         print("[ERROR] Failed to extract JSON from Groq response")
         raise HTTPException(
@@ -363,6 +225,11 @@ def call_groq(prompt: str) -> dict:
 # Endpoints
 # ---------------------------------------------------------------------------
 
+@app.on_event("shutdown")
+async def close_groq_client():
+    await aclose()
+
+
 @app.get("/")
 def health_check():
     return {
@@ -373,7 +240,7 @@ def health_check():
 
 
 @app.post("/suggest-team")
-def suggest_team(req: SuggestTeamRequest):
+async def suggest_team(req: SuggestTeamRequest):
     """Suggest an optimal team for a project based on employee skills, experience, and workload."""
     try:
         employees_text = ""
@@ -429,7 +296,7 @@ RULES:
 Return ONLY valid JSON. Do not include any explanation or extra text."""
 
         print(f"[DEBUG] /suggest-team called for project: {req.project.title}")
-        result = call_groq(prompt)
+        result = await call_groq(prompt, SuggestTeamResponse)
         print(f"[DEBUG] /suggest-team result keys: {list(result.keys())}")
         return result
 
@@ -443,7 +310,7 @@ Return ONLY valid JSON. Do not include any explanation or extra text."""
 
 
 @app.post("/suggest-employees")
-def suggest_employees(req: SuggestEmployeesRequest):
+async def suggest_employees(req: SuggestEmployeesRequest):
     """Rank employees by match score for a given project description."""
     try:
         employees_text = ""
@@ -498,7 +365,7 @@ RULES:
 Return ONLY valid JSON. Do not include any explanation or extra text."""
 
         print(f"[DEBUG] /suggest-employees called")
-        result = call_groq(prompt)
+        result = await call_groq(prompt, SuggestEmployeesResponse)
         print(f"[DEBUG] /suggest-employees result keys: {list(result.keys())}")
         return result
 
@@ -512,7 +379,7 @@ Return ONLY valid JSON. Do not include any explanation or extra text."""
 
 
 @app.post("/suggest-task-allocation")
-def suggest_task_allocation(req: SuggestTaskAllocationRequest):
+async def suggest_task_allocation(req: SuggestTaskAllocationRequest):
     """Assign each task to the best-suited team member."""
     try:
         tasks_text = ""
@@ -579,7 +446,7 @@ RULES:
 Return ONLY valid JSON. Do not include any explanation or extra text."""
 
         print(f"[DEBUG] /suggest-task-allocation called with {len(req.tasks)} tasks and {len(req.teamMembers)} members")
-        result = call_groq(prompt)
+        result = await call_groq(prompt, SuggestTaskAllocationResponse)
         print(f"[DEBUG] /suggest-task-allocation result keys: {list(result.keys())}")
         return result
 
@@ -615,7 +482,7 @@ class GeneratePlanRequest(BaseModel):
 
 
 @app.post("/api/generate-plan")
-def generate_plan(req: GeneratePlanRequest):
+async def generate_plan(req: GeneratePlanRequest):
     """Generate milestones and tasks for a project based on its description. Pure INPUT -> AI -> JSON OUTPUT."""
     try:
         prompt = f"""You are an AI project planning assistant. Generate a detailed project plan with milestones and tasks.
@@ -663,7 +530,7 @@ RULES:
 Return ONLY valid JSON. Do not include any explanation or extra text."""
 
         print(f"[DEBUG] /api/generate-plan called for project: {req.projectName}")
-        result = call_groq(prompt)
+        result = await call_groq(prompt, GeneratePlanResponse)
         print(f"[DEBUG] /api/generate-plan result keys: {list(result.keys())}")
 
         if "milestones" not in result:
@@ -0,0 +1,49 @@
+"""Tests that the ai_allocation endpoints return the model's JSON as sent (no injected defaults, no dropped keys)"""
+import asyncio, json, sys
+sys.path.insert(0, '.')
+import managix_common.structured_output as structured_output
+from ai_allocation_app import (GeneratePlanResponse, SuggestEmployeesResponse, SuggestTaskAllocationResponse,
+                               SuggestTeamResponse, call_groq)
+
+
+real_chat_completion = structured_output.chat_completion
+
+
+def answer_with(payload):
+    """Stand-in for chat_completion that always returns payload as the message content."""
+    async def fake_chat_completion(messages, **kwargs):
+        return {"choices": [{"message": {"content": json.dumps(payload)}, "finish_reason": "stop"}]}
+    return fake_chat_completion
+
+
+def call(payload, response_model):
+    structured_output.chat_completion = answer_with(payload)
+    return asyncio.run(call_groq("prompt", response_model))
+
+
+# Test 1: fields the model left out are not filled in with defaults
+payload = {"team": [{"userId": "u1", "role": "Backend"}]}
+assert call(payload, SuggestTeamResponse) == payload, call(payload, SuggestTeamResponse)
+print("[PASS] Test 1: missing fields stay missing")
+
+# Test 2: keys not declared on the response models are kept, at every level
+payload = {
+    "recommendedEmployees": [{"userId": "u2", "matchScore": 87, "reason": "React", "skillsMatched": ["React"]}],
+    "summary": "one strong match",
+}
+assert call(payload, SuggestEmployeesResponse) == payload, call(payload, SuggestEmployeesResponse)
+print("[PASS] Test 2: undeclared keys are kept")
+
+# Test 3: a complete answer comes back unchanged
+payload = {"taskAssignments": [{"taskId": "t1", "userId": "u1", "reason": "owns the API", "confidence": 90}]}
+assert call(payload, SuggestTaskAllocationResponse) == payload
+print("[PASS] Test 3: complete answer unchanged")
+
+# Test 4: an answer without milestones has no injected empty list, so generate-plan can reject it
+payload = {"plan": "none"}
+result = call(payload, GeneratePlanResponse)
+assert result == payload and "milestones" not in result, result
+print("[PASS] Test 4: no default milestones injected")
+
+structured_output.chat_completion = real_chat_completion
+print("\n=== ALL 4 TESTS PASSED ===")
@@ -0,0 +1,11 @@
+"""
+Code shared by the Managix Python services (resume_parser, ai_allocation).
+
+    groq_client        pooled Groq chat-completions client with usage totals
+    json_repair        tolerant, linear-time JSON parsing of LLM responses
+    structured_output  JSON-mode completions validated against a Pydantic model
+    rate_limit         token buckets for outgoing Groq requests
+
+Installed into each service as a path dependency (`-e ../common` in its
+requirements files).
+"""
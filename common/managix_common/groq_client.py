@@ -0,0 +1,222 @@
+"""
+Shared Groq chat-completions client.
+
+One pooled keep-alive httpx client per process (an AsyncClient per event
+loop for async endpoints, a thread-safe Client for sync code), so calls
+reuse TLS connections instead of opening a new one per request.
+
+Every request first waits for the rate_limit token buckets, so retries,
+continuations and summary calls all count against the configured limits.
+
+Token usage reported by Groq is added to process-wide totals
+(usage_totals()) and to the innermost usage_scope() of the current
+request, so endpoints can report what each request cost.
+
+Configuration (env):
+    GROQ_BASE_URL          API root, e.g. a local mock server for benchmarks
+                           (default https://api.groq.com/openai/v1)
+    GROQ_TIMEOUT           read/write/pool timeout in seconds (default 60)
+    GROQ_CONNECT_TIMEOUT   connect timeout in seconds (default 10)
+    GROQ_MAX_CONNECTIONS   max open connections to the API host (default 20)
+    GROQ_MAX_KEEPALIVE     idle keep-alive connections kept (default 10)
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+import httpx
+from dotenv import load_dotenv
+
+from managix_common.rate_limit import acquire_groq, acquire_groq_sync
+
+load_dotenv()
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "10"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+
+class GroqError(Exception):
+    """Groq answered with a non-2xx status."""
+
+    def __init__(self, status_code, body):
+        super().__init__(f"Groq API Error: {status_code} - {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+def _client_options():
+    # All requests go to one host, so the pool limits are per-host limits
+    return {
+        "base_url": GROQ_BASE_URL,
+        "timeout": httpx.Timeout(GROQ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+        ),
+    }
+
+
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncClient
+_sync_client = None
+_lock = threading.Lock()
+
+
+def get_async_client():
+    """The pooled AsyncClient of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def get_sync_client():
+    """The process-wide pooled Client for sync callers (safe to share across threads)."""
+    global _sync_client
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def _payload(messages, model, max_tokens, temperature, extra):
+    payload = {"model": model, "messages": messages}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    if temperature is not None:
+        payload["temperature"] = temperature
+    payload.update(extra)
+    return payload
+
+
+def _estimated_tokens(payload):
+    # What Groq counts against tokens per minute: the prompt (~4 chars per token) plus max_tokens
+    prompt_chars = sum(len(message.get("content") or "") for message in payload["messages"])
+    return prompt_chars // 4 + (payload.get("max_tokens") or 0)
+
+
+def _headers(api_key):
+    return {"Authorization": f"Bearer {api_key or os.getenv('GROQ_API_KEY')}"}
+
+
+_USAGE_FIELDS = ("requests", "prompt_tokens", "completion_tokens", "max_tokens")
+_usage_totals = dict.fromkeys(_USAGE_FIELDS, 0)
+_usage_lock = threading.Lock()
+_request_usage = contextvars.ContextVar("groq_request_usage", default=None)
+
+
+def _record_usage(usage, max_tokens):
+    counts = {
+        "requests": 1,
+        "prompt_tokens": (usage or {}).get("prompt_tokens") or 0,
+        "completion_tokens": (usage or {}).get("completion_tokens") or 0,
+        "max_tokens": max_tokens or 0,
+    }
+    scope = _request_usage.get()
+    with _usage_lock:
+        for field, value in counts.items():
+            _usage_totals[field] += value
+            if scope is not None:
+                scope[field] += value
+
+
+@contextmanager
+def usage_scope():
+    """Collect the token usage of the Groq calls made inside the block into the yielded dict."""
+    usage = dict.fromkeys(_USAGE_FIELDS, 0)
+    token = _request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(token)
+
+
+def usage_totals():
+    with _usage_lock:
+        return dict(_usage_totals)
+
+
+def _result(response, max_tokens):
+    if response.status_code != 200:
+        raise GroqError(response.status_code, response.text)
+    data = response.json()
+    _record_usage(data.get("usage"), max_tokens)
+    return data
+
+
+async def chat_completion(messages, model=DEFAULT_MODEL, max_tokens=None, temperature=None, api_key=None,
+                          **extra):
+    """POST /chat/completions and return the decoded response body."""
+    payload = _payload(messages, model, max_tokens, temperature, extra)
+    await acquire_groq(_estimated_tokens(payload))
+    response = await get_async_client().post("/chat/completions", headers=_headers(api_key), json=payload)
+    return _result(response, max_tokens)
+
+
+def chat_completion_sync(messages, model=DEFAULT_MODEL, max_tokens=None, temperature=None, api_key=None,
+                         **extra):
+    """Blocking chat_completion for sync code paths (Streamlit, worker threads, CLI scripts)."""
+    payload = _payload(messages, model, max_tokens, temperature, extra)
+    acquire_groq_sync(_estimated_tokens(payload))
+    response = get_sync_client().post("/chat/completions", headers=_headers(api_key), json=payload)
+    return _result(response, max_tokens)
+
+
+async def stream_chat_completion(messages, model=DEFAULT_MODEL, max_tokens=None, temperature=None, api_key=None,
+                                 **extra):
+    """
+    POST /chat/completions with stream=true and yield the content deltas
+    as they arrive (server-sent events, terminated by "data: [DONE]").
+    """
+    payload = _payload(messages, model, max_tokens, temperature, extra)
+    payload["stream"] = True
+    await acquire_groq(_estimated_tokens(payload))
+    usage = None
+    async with get_async_client().stream(
+        "POST", "/chat/completions", headers=_headers(api_key), json=payload
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise GroqError(response.status_code, response.text)
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            # Groq reports usage on the last chunk, under x_groq
+            usage = (event.get("x_groq") or {}).get("usage") or event.get("usage") or usage
+            choices = event.get("choices") or []
+            delta = choices[0].get("delta", {}).get("content") if choices else None
+            if delta:
+                yield delta
+    _record_usage(usage, max_tokens)
+
+
+def message_content(response_data):
+    """Text of the first choice; raises ValueError on a response without choices."""
+    if not response_data.get("choices"):
+        raise ValueError("Invalid response from Groq API: missing choices")
+    return response_data["choices"][0]["message"]["content"]
+
+
+def finish_reason(response_data):
+    return (response_data.get("choices") or [{}])[0].get("finish_reason", "")
+
+
+async def aclose():
+    """Close the running loop's AsyncClient (call from a shutdown hook)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
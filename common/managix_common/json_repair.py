@@ -0,0 +1,205 @@
+"""
+Tolerant, linear-time parsing of the JSON object in an LLM response.
+
+parse_json_object() first tries json's C decoder on the object (after any
+``` fence or leading prose). Only if that fails does repair_json() make a
+single pass over the text, tracking the container stack and string state,
+and rebuild it as valid JSON:
+
+    - text before the object and after it closes is ignored
+    - trailing and doubled commas are dropped
+    - raw newlines/tabs inside strings and invalid backslash escapes are escaped
+    - Python literals (True/False/None) become true/false/null
+    - a mismatched closer closes the inner containers it skips
+    - at end of input, the trailing partial value (an unterminated string,
+      a number or literal that may be cut off, a key without a value) is
+      dropped and every open container is closed
+
+The result is decoded with a single json.loads, so a truncated 16 KB
+response costs one scan instead of thousands of trial parses.
+"""
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?\Z")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_ESCAPES = set('"\\/bfnrtu')
+_BARE = set("+-.0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+
+
+def find_json_start(text):
+    """Index of the first '{' inside the first ``` fence (if any), else in text; -1 if none."""
+    fence = text.find("```")
+    if fence != -1:
+        start = text.find("{", fence)
+        if start != -1:
+            return start
+    return text.find("{")
+
+
+class _Frame:
+    __slots__ = ("kind", "state", "members", "safe")
+
+    def __init__(self, kind, safe):
+        self.kind = kind      # '{' or '['
+        self.state = "key" if kind == "{" else "value"  # key | colon | value | after
+        self.members = 0      # complete members written so far
+        self.safe = safe      # len(out) after the last complete member
+
+
+_HEX = set("0123456789abcdefABCDEF")
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _read_string(text, i, n):
+    """Scan a string from just after its opening quote. Returns (json_text, end), or (None, n) if unterminated."""
+    parts = ['"']
+    start = i
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            parts.append(text[start:i])
+            parts.append('"')
+            return "".join(parts), i + 1
+        if ch == "\\":
+            if i + 1 >= n:
+                break
+            parts.append(text[start:i])
+            nxt = text[i + 1]
+            valid = nxt in _ESCAPES and (nxt != "u" or set(text[i + 2:i + 6]) <= _HEX and i + 6 <= n)
+            parts.append("\\" + nxt if valid else "\\\\" + nxt)
+            i += 2
+            start = i
+            continue
+        if ch < " ":
+            parts.append(text[start:i])
+            parts.append(_CONTROL_ESCAPES.get(ch) or "\\u%04x" % ord(ch))
+            start = i + 1
+        i += 1
+    return None, n
+
+
+def repair_json(text, start=None):
+    """
+    Rebuild the JSON object starting at text[start] (default: find_json_start)
+    as valid JSON text. Returns "" if there is no object.
+    """
+    if start is None:
+        start = find_json_start(text)
+    if start < 0:
+        return ""
+
+    out = []
+    stack = []
+    n = len(text)
+    i = start
+
+    def add_value(piece):
+        # Append a value (or a container opener) as the next member of the top frame
+        frame = stack[-1]
+        if frame.kind == "[" and frame.members:
+            out.append(",")
+        elif frame.kind == "{" and frame.state == "colon":
+            out.append(":")  # tolerate a missing colon
+        out.append(piece)
+
+    def value_done():
+        if stack:
+            frame = stack[-1]
+            frame.members += 1
+            frame.state = "after"
+            frame.safe = len(out)
+
+    def expects_value():
+        frame = stack[-1]
+        return frame.state in ("value", "colon") if frame.kind == "{" else True
+
+    while i < n:
+        ch = text[i]
+        if ch in "{[":
+            if stack:
+                if not expects_value():
+                    break  # a container where a key belongs: give up here
+                add_value(ch)
+            else:
+                out.append(ch)
+            stack.append(_Frame(ch, len(out)))
+            i += 1
+        elif ch in "}]":
+            i += 1
+            kind = "{" if ch == "}" else "["
+            if not any(frame.kind == kind for frame in stack):
+                continue  # stray closer
+            while True:
+                frame = stack.pop()
+                if frame.kind == "{" and frame.state in ("colon", "value"):
+                    del out[frame.safe:]  # key without a value
+                out.append(_CLOSERS[frame.kind])
+                value_done()
+                if frame.kind == kind:
+                    break
+            if not stack:
+                break
+        elif ch == ",":
+            i += 1
+            frame = stack[-1]
+            if frame.state == "after":
+                frame.state = "key" if frame.kind == "{" else "value"
+        elif ch == ":":
+            i += 1
+            frame = stack[-1]
+            if frame.kind == "{" and frame.state == "colon":
+                out.append(":")
+                frame.state = "value"
+        elif ch == '"':
+            string, i = _read_string(text, i + 1, n)
+            if string is None:
+                break  # unterminated: dropped below
+            frame = stack[-1]
+            if frame.kind == "{" and frame.state in ("key", "after"):
+                if frame.members:
+                    out.append(",")
+                out.append(string)
+                frame.state = "colon"
+            else:
+                add_value(string)
+                value_done()
+        elif ch in _BARE:
+            end = i
+            while end < n and text[end] in _BARE:
+                end += 1
+            if end >= n:
+                break  # may be cut off: dropped below
+            token = text[i:end]
+            i = end
+            value = _LITERALS.get(token) or (token if _NUMBER.match(token) else None)
+            if value is not None and expects_value():
+                add_value(value)
+                value_done()
+        else:
+            i += 1  # whitespace, fence backticks, comments, ...
+
+    if stack:
+        # Input ended inside the object: keep complete members only, close the rest
+        del out[stack[-1].safe:]
+        out.extend(_CLOSERS[frame.kind] for frame in reversed(stack))
+    return "".join(out)
+
+
+def parse_json_object(text):
+    """The JSON object in an LLM response (fast path, then repair_json); {} if none is recoverable."""
+    if not text:
+        return {}
+    start = find_json_start(text)
+    if start < 0:
+        return {}
+    try:
+        parsed, _ = _decoder.raw_decode(text, start)
+    except ValueError:
+        try:
+            parsed = json.loads(repair_json(text, start))
+        except ValueError:
+            return {}
+    return parsed if isinstance(parsed, dict) else {}
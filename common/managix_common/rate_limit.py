@@ -0,0 +1,111 @@
+"""
+Token-bucket rate limiting for outgoing Groq calls.
+
+Groq limits each API key by requests and by tokens per minute. Every HTTP
+request groq_client sends (parses, continuations, summary calls, streams)
+first takes one request and its estimated tokens (prompt + max_tokens)
+from process-wide buckets; when a bucket is empty the call waits for it
+to refill instead of running into 429 responses. Work that never reaches
+Groq (parse cache hits) is not charged.
+
+Waiting is a reservation: take() debits the bucket at once (it may go
+negative) and returns how long the caller must wait, so async callers
+(await asyncio.sleep) and sync callers in worker threads (time.sleep)
+share the same buckets and are served in arrival order.
+
+Limiting is off unless GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE
+are set. The buckets are per process: every service using this package
+(resume_parser's fastapi_app and app.main, ai_allocation) and every
+uvicorn worker of each has its own. When enabling a limit, split the API
+key's quota between them, e.g. a 30 RPM key shared by fastapi_app with
+2 workers and ai_allocation with 1 worker: GROQ_REQUESTS_PER_MINUTE=10
+in each.
+
+Configuration (env):
+    GROQ_REQUESTS_PER_MINUTE   request bucket refill rate, 0 = unlimited (default 0)
+    GROQ_TOKENS_PER_MINUTE     token bucket refill rate, 0 = unlimited (default 0)
+    GROQ_RATE_BURST_SECONDS    bucket capacity in seconds of refill (default 10)
+"""
+import asyncio
+import os
+import threading
+import time
+
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "0"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "0"))
+GROQ_RATE_BURST_SECONDS = float(os.getenv("GROQ_RATE_BURST_SECONDS", "10"))
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to capacity; take(cost) reserves cost tokens."""
+
+    def __init__(self, name, rate, capacity):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost=1):
+        """Reserve cost tokens; returns the seconds to wait before using them (0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        cost = min(cost, self.capacity)  # a single oversized call still goes through
+        with self._lock:
+            self._refill()
+            self.tokens -= cost
+            wait = max(0.0, -self.tokens / self.rate)
+            self.acquired += 1
+            self.waited_seconds += wait
+        return wait
+
+    def stats(self):
+        with self._lock:
+            if self.rate > 0:
+                self._refill()
+            return {
+                "per_minute": self.rate * 60,
+                "available": round(self.tokens, 1),
+                "acquired": self.acquired,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+def _per_minute_bucket(name, per_minute):
+    rate = per_minute / 60
+    return TokenBucket(name, rate, rate * GROQ_RATE_BURST_SECONDS)
+
+
+request_bucket = _per_minute_bucket("requests", GROQ_REQUESTS_PER_MINUTE)
+token_bucket = _per_minute_bucket("tokens", GROQ_TOKENS_PER_MINUTE)
+
+
+def _reserve(tokens):
+    # Both buckets are debited up front; the caller waits for the slower one
+    return max(request_bucket.take(1), token_bucket.take(tokens) if tokens else 0.0)
+
+
+async def acquire_groq(tokens=0):
+    """Wait for one request and tokens (estimated prompt + max_tokens) from the buckets."""
+    wait = _reserve(tokens)
+    if wait:
+        await asyncio.sleep(wait)
+
+
+def acquire_groq_sync(tokens=0):
+    """Blocking acquire_groq for sync callers (worker threads, scripts)."""
+    wait = _reserve(tokens)
+    if wait:
+        time.sleep(wait)
+
+
+def rate_limit_stats():
+    return {"requests": request_bucket.stats(), "tokens": token_bucket.stats()}
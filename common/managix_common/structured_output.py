@@ -0,0 +1,120 @@
+"""
+JSON-mode chat completions validated against a Pydantic model.
+
+structured_completion() asks Groq for a JSON object (response_format
+json_object, or json_schema generated from the model when the deployed
+model supports it), validates the answer with the model in one step
+(model_validate_json, parsing and validation in pydantic-core), and only
+falls back to json_repair when that fails. With exclude_unset=True the
+validated data is dumped with only the keys the model actually returned
+(plus any extra keys the response model allows), instead of filled-in
+defaults.
+
+If the answer is cut off at max_tokens, the partial answer is sent back
+as an assistant prefill so the model continues where it stopped, instead
+of the whole answer being regenerated from scratch.
+
+Configuration (env):
+    GROQ_JSON_MODE            json_object (default) | json_schema | off
+    GROQ_MAX_CONTINUATIONS    continuation requests after a truncated answer (default 2)
+"""
+import json
+import os
+
+from pydantic import ValidationError
+
+from managix_common.groq_client import DEFAULT_MODEL, GroqError, chat_completion, finish_reason, message_content
+from managix_common.json_repair import parse_json_object
+
+GROQ_JSON_MODE = os.getenv("GROQ_JSON_MODE", "json_object")
+GROQ_MAX_CONTINUATIONS = int(os.getenv("GROQ_MAX_CONTINUATIONS", "2"))
+
+
+def response_format(response_model=None):
+    """The response_format request field for GROQ_JSON_MODE, or None when off."""
+    if GROQ_JSON_MODE == "json_schema" and response_model is not None:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": response_model.__name__, "schema": response_model.model_json_schema()},
+        }
+    if GROQ_JSON_MODE in ("json_object", "json_schema"):
+        return {"type": "json_object"}
+    return None
+
+
+def decode(content, response_model=None, exclude_unset=False):
+    """
+    Returns (data, validated). Fast path: response_model.model_validate_json;
+    otherwise the repaired object, validated if it fits the model and
+    returned as-is if not (callers normalize loosely shaped answers).
+    """
+    if response_model is not None:
+        try:
+            return response_model.model_validate_json(content).model_dump(exclude_unset=exclude_unset), True
+        except ValidationError:
+            pass
+    data = parse_json_object(content)
+    if response_model is not None and data:
+        try:
+            return response_model.model_validate(data).model_dump(exclude_unset=exclude_unset), True
+        except ValidationError:
+            pass
+    return data, False
+
+
+def _failed_generation(error):
+    # In JSON mode Groq rejects output that is not valid JSON (including
+    # output cut off at max_tokens) with 400 json_validate_failed and
+    # returns the text it generated
+    if error.status_code != 400:
+        return None
+    try:
+        details = json.loads(error.body).get("error") or {}
+    except (ValueError, AttributeError):
+        return None
+    if details.get("code") != "json_validate_failed":
+        return None
+    return details.get("failed_generation") or ""
+
+
+async def structured_completion(messages, response_model=None, max_tokens=None, temperature=None, api_key=None,
+                                model=DEFAULT_MODEL, max_continuations=GROQ_MAX_CONTINUATIONS, exclude_unset=False):
+    """
+    Returns (data, info); info has "validated", "truncated" (still cut off
+    after all continuations), "continuations" and the raw "content".
+    """
+    content = ""
+    continuations = 0
+    truncated = False
+    fmt = response_format(response_model)
+    while True:
+        if content:
+            # Continuation: the partial answer is not valid JSON by itself, so no JSON mode here
+            request_messages, extra = messages + [{"role": "assistant", "content": content}], {}
+        else:
+            request_messages, extra = messages, ({"response_format": fmt} if fmt else {})
+        try:
+            response_data = await chat_completion(
+                request_messages, model=model, max_tokens=max_tokens, temperature=temperature, api_key=api_key,
+                **extra
+            )
+            content += message_content(response_data)
+            truncated = finish_reason(response_data) == "length"
+        except GroqError as e:
+            failed = _failed_generation(e)
+            if failed is None:
+                raise
+            print("[WARNING] Groq JSON mode rejected the generated output, repairing it locally")
+            content += failed
+            truncated = not failed.rstrip().endswith("}")
+
+        if not truncated or continuations >= max_continuations:
+            break
+        continuations += 1
+        print(f"[WARNING] Groq response truncated at {len(content)} chars, requesting continuation "
+              f"{continuations}/{max_continuations}")
+
+    data, validated = decode(content, response_model, exclude_unset)
+    if truncated:
+        print("[WARNING] Groq response still truncated after continuations. JSON may be incomplete.")
+    return data, {"validated": validated, "truncated": truncated, "continuations": continuations, "content": content}
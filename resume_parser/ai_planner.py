@@ -8,13 +8,17 @@ No database operations - just AI planning and returning structured JSON.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
 import os
-import requests
-import json
-import re
 from dotenv import load_dotenv
+import httpx
+
+from managix_common.groq_client import GroqError, aclose, stream_chat_completion
+from app.incremental_json import IncrementalJSONParser, iter_partial_json, ndjson_event
+from managix_common.json_repair import parse_json_object
+from managix_common.structured_output import structured_completion
 
 load_dotenv()
 
@@ -121,119 +125,15 @@ def extract_json_from_response(response_text: str) -> dict:
     """
     Extract JSON from Groq response.
     Handles markdown code blocks, text before/after JSON, 
-    trailing commas, and unclosed brackets.
-    (Reuses proven patterns from fastapi_app.py)
+    trailing commas, and unclosed brackets (see app/json_repair.py).
     """
-    if not response_text:
-        print("[WARNING] Empty response text from Groq")
-        return {}
-    
-    text = response_text.strip()
-    original_text = text
-    
-    # Strategy 1: Look for JSON in markdown code blocks
-    if "```json" in text or "```" in text:
-        code_blocks = list(re.finditer(r'```(?:json)?', text))
-        if code_blocks:
-            start_marker = int(code_blocks[0].end())
-            end_marker = int(text.find("```", start_marker))
-            if end_marker == -1:
-                end_marker = len(text)
-                print("[DEBUG] No closing ``` found, using end of text")
-            text = str(text[start_marker:end_marker]).strip()  # pyre-ignore
-            print("[DEBUG] Extracted JSON from markdown code block")
-    
-    text = text.strip()
-    
-    # Strategy 2: Find JSON object boundaries by matching braces
-    if not text.startswith("{"):
-        start_idx = int(text.find("{"))
-        if start_idx != -1:
-            brace_count = 0
-            end_idx = -1
-            for i in range(start_idx, len(text)):
-                char = str(text)[i]
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_idx = int(i)
-                        break
-            if end_idx != -1 and end_idx > start_idx:
-                text = str(text[start_idx:end_idx+1])  # pyre-ignore
-                print("[DEBUG] Extracted JSON object from text with prefix")
-    
-    text = text.strip()
-    
-    # Strategy 3: Try to parse as-is
-    try:
-        parsed = json.loads(text)
-        print(f"[DEBUG] Successfully parsed JSON")
-        return parsed
-    except json.JSONDecodeError as e:
-        print(f"[WARNING] Initial JSON parse failed: {str(e)}")
-        
-        # Strategy 4: Fix common JSON issues (trailing commas, etc.)
-        try:
-            fixed_text = text
-            fixed_text = re.sub(r',(\s*[}\]])', r'\g<1>', fixed_text)
-            last_brace = int(fixed_text.rfind('}'))
-            if last_brace != -1:
-                fixed_text = str(fixed_text[:last_brace+1])  # pyre-ignore
-            parsed = json.loads(fixed_text)
-            print("[DEBUG] Successfully parsed after fixing trailing commas")
-            return parsed
-        except json.JSONDecodeError:
-            pass
-        
-        # Strategy 5: Try first { to last }
-        brace_start = int(text.find('{'))
-        if brace_start != -1:
-            last_brace = int(text.rfind('}'))
-            if last_brace != -1:
-                try:
-                    potential_json = str(text[brace_start:last_brace+1])  # pyre-ignore
-                    potential_json = re.sub(r',(\s*[}\]])', r'\g<1>', potential_json)
-                    parsed = json.loads(potential_json)
-                    print("[DEBUG] Successfully parsed using first { to last }")
-                    return parsed
-                except:
-                    pass
-        
-        # Strategy 6: Fix incomplete JSON by closing unclosed brackets/braces
-        try:
-            fixed_text = text
-            fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-            
-            open_braces = fixed_text.count('{') - fixed_text.count('}')
-            open_brackets = fixed_text.count('[') - fixed_text.count(']')
-            
-            if open_braces > 0 or open_brackets > 0:
-                # Remove any trailing incomplete content after the last complete value
-                # Try to find where the JSON breaks and close it
-                fixed_text = fixed_text.rstrip()
-                
-                # Close open brackets first (they're usually inside objects)
-                for _ in range(open_brackets):
-                    fixed_text += ']'
-                for _ in range(open_braces):
-                    fixed_text += '}'
-                
-                fixed_text = re.sub(r',(\s*[}\]])', r'\g<1>', fixed_text)
-                
-                parsed = json.loads(str(fixed_text))
-                print(f"[DEBUG] Successfully parsed after closing {open_braces} braces and {open_brackets} brackets")
-                return parsed
-        except:
-            pass
-        
-        print(f"[ERROR] All JSON extraction strategies failed")
-        print(f"[DEBUG] First 500 chars: {original_text[:500]}")  # pyre-ignore
-        return {}
-
-
-# ===================== Validation =====================
+    parsed = parse_json_object(response_text)
+    if parsed:
+        print(f"[DEBUG] Successfully parsed JSON with {len(parsed)} top-level keys")
+    else:
+        print("[ERROR] No JSON object could be recovered from the Groq response")
+        print(f"[DEBUG] First 1000 chars of response: {(response_text or '')[:1000]}")
+    return parsed
 
 def validate_and_normalize_plan(plan: dict) -> dict:
     """
@@ -313,63 +213,43 @@ def validate_and_normalize_plan(plan: dict) -> dict:
 
 # ===================== Groq API Call =====================
 
-def call_groq_for_plan(project_name: str, project_description: str, deadline: str, budget: float) -> dict:
+PLAN_SYSTEM_MESSAGE = (
+    'You are a software project planning assistant. You ALWAYS return ONLY valid JSON. '
+    'Never include explanations or text outside the JSON object.'
+)
+
+
+def build_plan_messages(project_name: str, project_description: str, deadline: str, budget: float) -> list:
+    return [
+        {'role': 'system', 'content': PLAN_SYSTEM_MESSAGE},
+        {'role': 'user', 'content': build_prompt(project_name, project_description, deadline, budget)},
+    ]
+
+
+async def call_groq_for_plan(project_name: str, project_description: str, deadline: str, budget: float) -> dict:
     """Send project details to Groq LLM and get back a structured project plan."""
     
     if not GROQ_API_KEY:
         print("[ERROR] GROQ_API_KEY not set in environment")
         raise ValueError("GROQ_API_KEY not set in environment. Please set it in the .env file.")
     
-    prompt = build_prompt(project_name, project_description, deadline, budget)
-    
     print(f"[DEBUG] Sending project plan request to Groq API for: {project_name}")
     
-    headers = {
-        'Authorization': f'Bearer {GROQ_API_KEY}',
-        'Content-Type': 'application/json'
-    }
-    
-    data = {
-        'messages': [
-            {
-                'role': 'system', 
-                'content': 'You are a software project planning assistant. You ALWAYS return ONLY valid JSON. Never include explanations or text outside the JSON object.'
-            },
-            {
-                'role': 'user', 
-                'content': prompt
-            }
-        ],
-        'model': 'llama-3.1-8b-instant',
-        'max_tokens': 4096,
-        'temperature': 0.3  # Low temperature for consistent, deterministic plans
-    }
+    messages = build_plan_messages(project_name, project_description, deadline, budget)
     
     try:
         print("[DEBUG] Making request to Groq API...")
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers=headers,
-            json=data,
-            timeout=60
+        # JSON mode + ProjectPlanResponse validation; a truncated answer is continued, not regenerated
+        plan_json, info = await structured_completion(
+            messages,
+            ProjectPlanResponse,
+            max_tokens=4096,
+            temperature=0.3,  # Low temperature for consistent, deterministic plans
+            api_key=GROQ_API_KEY
         )
-        print(f"[DEBUG] Groq API response status: {response.status_code}")
-        response.raise_for_status()
-        
-        response_data = response.json()
-        if 'choices' not in response_data or not response_data['choices']:
-            raise ValueError("Invalid response from Groq API: missing choices")
-        
-        content = response_data['choices'][0]['message']['content']
-        print(f"[DEBUG] Groq returned {len(content)} characters of content")
-        
-        # Check if response was truncated
-        finish_reason = response_data['choices'][0].get('finish_reason', '')
-        if finish_reason == 'length':
-            print("[WARNING] Groq response was truncated (hit max_tokens limit)")
-        
-        # Extract JSON from response
-        plan_json = extract_json_from_response(content)
+        content = info["content"]
+        print(f"[DEBUG] Groq returned {len(content)} characters of content "
+              f"(validated={info['validated']}, continuations={info['continuations']})")
         
         if not plan_json:
             print("[ERROR] Failed to extract JSON from Groq response")
@@ -382,7 +262,7 @@ def call_groq_for_plan(project_name: str, project_description: str, deadline: st
         print(f"[DEBUG] Successfully generated plan with {len(plan_json.get('milestones', []))} milestones")
         return plan_json
         
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, GroqError) as e:
         print(f"[ERROR] Groq API request failed: {str(e)}")
         raise Exception(f"Groq API request error: {str(e)}")
     except ValueError as e:
@@ -394,6 +274,11 @@ def call_groq_for_plan(project_name: str, project_description: str, deadline: st
 
 # ===================== API Endpoints =====================
 
+@app.on_event("shutdown")
+async def close_groq_client():
+    await aclose()
+
+
 @app.get("/")
 def health_check():
     """Health check endpoint"""
@@ -404,6 +289,18 @@ def health_check():
     }
 
 
+def validate_plan_request(request: ProjectPlanRequest):
+    """Reject incomplete plan requests with a 400."""
+    if not request.projectName.strip():
+        raise HTTPException(status_code=400, detail="Project name is required")
+    if not request.projectDescription.strip():
+        raise HTTPException(status_code=400, detail="Project description is required")
+    if not request.deadline.strip():
+        raise HTTPException(status_code=400, detail="Project deadline is required")
+    if request.budget <= 0:
+        raise HTTPException(status_code=400, detail="Project budget must be greater than 0")
+
+
 @app.post("/api/generate-plan", response_model=ProjectPlanResponse)
 async def generate_plan(request: ProjectPlanRequest):
     """
@@ -421,18 +318,10 @@ async def generate_plan(request: ProjectPlanRequest):
     try:
         print(f"[DEBUG] Received plan request for project: {request.projectName}")
         
-        # Validate inputs
-        if not request.projectName.strip():
-            raise HTTPException(status_code=400, detail="Project name is required")
-        if not request.projectDescription.strip():
-            raise HTTPException(status_code=400, detail="Project description is required")
-        if not request.deadline.strip():
-            raise HTTPException(status_code=400, detail="Project deadline is required")
-        if request.budget <= 0:
-            raise HTTPException(status_code=400, detail="Project budget must be greater than 0")
+        validate_plan_request(request)
         
         # Call Groq to generate the plan
-        plan_json = call_groq_for_plan(
+        plan_json = await call_groq_for_plan(
             project_name=request.projectName.strip(),
             project_description=request.projectDescription.strip(),
             deadline=request.deadline.strip(),
@@ -461,6 +350,62 @@ async def generate_plan(request: ProjectPlanRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate project plan: {str(e)}")
 
 
+async def stream_plan_events(request: ProjectPlanRequest):
+    """NDJSON events for /api/generate-plan/stream (see its docstring)."""
+    messages = build_plan_messages(
+        request.projectName.strip(), request.projectDescription.strip(), request.deadline.strip(), request.budget
+    )
+    parser = IncrementalJSONParser()
+    try:
+        print(f"[DEBUG] Streaming project plan from Groq for: {request.projectName}")
+        chunks = stream_chat_completion(messages, max_tokens=4096, temperature=0.3, api_key=GROQ_API_KEY)
+        content = ""
+        async for kind, value in iter_partial_json(chunks, parser=parser):
+            if kind == "complete":
+                content = value
+                continue
+            try:
+                partial = ProjectPlanResponse(**value)
+            except Exception:
+                continue  # e.g. a milestone whose numeric field is still malformed
+            yield ndjson_event("partial", data=partial.model_dump())
+        
+        if not parser.done:
+            print("[WARNING] Groq stream ended before the plan JSON was closed (truncated)")
+        plan_json = extract_json_from_response(content)
+        if not plan_json:
+            print(f"[DEBUG] Raw content (first 1000 chars): {content[:1000]}")
+            raise ValueError("Groq returned empty or invalid JSON")
+        result = ProjectPlanResponse(**validate_and_normalize_plan(plan_json))
+        print(f"[DEBUG] Streamed plan with {len(result.milestones)} milestones")
+        yield ndjson_event("final", data=result.model_dump())
+    except (httpx.HTTPError, GroqError) as e:
+        print(f"[ERROR] Groq API request failed: {str(e)}")
+        yield ndjson_event("error", detail=f"Groq API request error: {str(e)}")
+    except Exception as e:
+        print(f"[ERROR] Streaming plan generation failed: {str(e)}")
+        yield ndjson_event("error", detail=f"Failed to generate project plan: {str(e)}")
+
+
+@app.post("/api/generate-plan/stream")
+async def generate_plan_stream(request: ProjectPlanRequest):
+    """
+    Streaming variant of /api/generate-plan. Returns application/x-ndjson,
+    one event per line:
+    
+        {"event": "partial", "data": {"milestones": [...]}}  milestones/tasks generated so far
+        {"event": "final", "data": {"milestones": [...]}}    same body as /api/generate-plan
+        {"event": "error", "detail": "..."}                  generation failed after streaming began
+    
+    Partial milestones are not normalized yet (budget percentages are
+    rescaled and milestones sorted only in the final event).
+    """
+    validate_plan_request(request)
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=400, detail="GROQ_API_KEY not set in environment. Please set it in the .env file.")
+    return StreamingResponse(stream_plan_events(request), media_type="application/x-ndjson")
+
+
 # ===================== Run Server =====================
 
 if __name__ == "__main__":
@@ -1,11 +1,10 @@
 import os
 import json
-import requests
 from dotenv import load_dotenv
-from langchain.docstore.document import Document
-from langchain_community.vectorstores import FAISS
-from sentence_transformers import SentenceTransformer
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from managix_common.groq_client import chat_completion_sync, message_content
+from app.index_manager import get_index_manager
+from app.models import EMBEDDING_MODEL, get_embedding_function
+from app.vector_store import open_vector_store
 
 # ========= CONFIG ==========
 
@@ -14,11 +13,10 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not found in .env!")
 
+# Legacy one-FAISS-folder-per-freelancer layout (see app.migrate_vectors)
 BASE_FOLDER = "embedding_vectors_fl"
-# Use HuggingFaceEmbeddings for local embeddings (FAISS compatible)
-EMBEDDING_FUNCTION = HuggingFaceEmbeddings(
-    model_name="all-MiniLM-L6-v2"
-)
+# Local HuggingFace embeddings (EMBEDDING_MODEL) behind the content-hash
+# cache shared with the Recommender; loaded on first use by get_embedding_function()
 
 # ===========================
 
@@ -45,34 +43,18 @@ def generate_summary_with_groq(parsed_json, api_key):
     - Keep the summary between **30 to 50 words.**
     - **Output only the summary text. No extra explanations or labels.**
     """
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
-
-    data = {
-        'messages': [
-            {'role': 'system', 'content': 'You are a helpful assistant.'},
-            {'role': 'user', 'content': prompt}
-        ],
-        'model': 'llama-3.1-8b-instant',
-        'max_tokens': 150
-    }
-
-    response = requests.post(
-        'https://api.groq.com/openai/v1/chat/completions',
-        headers=headers,
-        json=data
-    )
+    messages = [
+        {'role': 'system', 'content': 'You are a helpful assistant.'},
+        {'role': 'user', 'content': prompt}
+    ]
 
-    if response.status_code == 200:
-        content = response.json()['choices'][0]['message']['content']
-        return content.strip()
-    else:
-        raise Exception(f"Groq API Error: {response.status_code} - {response.text}")
+    # Raises GroqError on a non-200 response
+    response_data = chat_completion_sync(messages, max_tokens=150, api_key=api_key)
+    return message_content(response_data).strip()
 
 
-def process_freelancer(freelancer, api_key, embedding_func=EMBEDDING_FUNCTION):
+def process_freelancer(freelancer, api_key, embedding_func=None):
+    embedding_func = embedding_func or get_embedding_function()
     freelancer_id = freelancer['freelancer_id']
     parsed_json = freelancer['parsed_resume']
 
@@ -95,18 +77,18 @@ def process_freelancer(freelancer, api_key, embedding_func=EMBEDDING_FUNCTION):
         "availability": freelancer.get("availability", "Unknown")
     }
 
-    # Create Document
-    doc = Document(page_content=summary, metadata=metadata)
+    # Embed the summary (local embeddings)
+    vector = embedding_func.embed_documents([summary])[0]
 
-    # Create FAISS vector store (local embeddings)
-    faiss_store = FAISS.from_documents([doc], embedding_func)
+    # Append to the consolidated vector store; the live recommender index,
+    # when running in this process, is updated in the same step
+    manager = get_index_manager()
+    if manager is not None:
+        manager.upsert(freelancer_id, vector, metadata)
+    else:
+        open_vector_store().upsert(freelancer_id, vector, metadata)
 
-    # Save FAISS vector store to local folder
-    save_path = os.path.join(BASE_FOLDER, freelancer_id)
-    os.makedirs(save_path, exist_ok=True)
-    faiss_store.save_local(save_path)
-    
-    print(f"✅ Saved FAISS vector for freelancer: {freelancer_id}")
+    print(f"✅ Saved vector for freelancer: {freelancer_id}")
 
 
 def main():
@@ -156,9 +138,9 @@ def main():
     ]
 
     for freelancer in freelancers:
-        process_freelancer(freelancer, GROQ_API_KEY, EMBEDDING_FUNCTION)
+        process_freelancer(freelancer, GROQ_API_KEY)
 
-    print("\n🚀 All freelancer FAISS vectors saved locally with HuggingFace embeddings!")
+    print("\n🚀 All freelancer vectors saved to the local vector store with HuggingFace embeddings!")
 
 
 if __name__ == "__main__":
@@ -1,25 +1,22 @@
 import os
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-import math
-from flashrank import Ranker, RerankRequest
 import math
+from app.index_manager import init_index_manager
+from app.models import get_embedding_function
+from app.reranker import rerank
 
 # Load ENV
 load_dotenv()
 
-EMBEDDING_FUNCTION = HuggingFaceEmbeddings(
-    model_name="all-MiniLM-L6-v2"
-)
-
-VECTOR_FOLDER = os.getenv("VECTOR_FOLDER_PATH")
-if not VECTOR_FOLDER:
-    raise ValueError("VECTOR_FOLDER_PATH not found in .env!")
+# Only the legacy per-freelancer folders live here; searches without a
+# collection_list go through the consolidated store (VECTOR_STORE_PATH)
+VECTOR_FOLDER = os.getenv("VECTOR_FOLDER_PATH", "embedding_vectors_fl")
 
 LEN_OF_CHUNKS = 10  # Top K from FAISS
 
 def load_faiss_collections(collection_list, return_as_retriever=True):
+    from langchain_community.vectorstores import FAISS
+
     vector_stores = []
     for collection in collection_list:
         path = os.path.join(VECTOR_FOLDER, collection)
@@ -27,7 +24,7 @@ def load_faiss_collections(collection_list, return_as_retriever=True):
             raise ValueError(f"Collection '{collection}' not found in {VECTOR_FOLDER}")
         vs = FAISS.load_local(
             path,
-            EMBEDDING_FUNCTION,
+            get_embedding_function(),
             allow_dangerous_deserialization=True
         )
         if return_as_retriever:
@@ -55,18 +52,12 @@ def rerank_with_flashrank(query, docs):
     if not docs:
         return []
 
-    ranker = Ranker(model_name="ms-marco-MiniLM-L-12-v2")
-
-    passages = [{"text": doc.page_content} for doc in docs]
-
-    req = RerankRequest(query=query, passages=passages)
-
-    scores = ranker.rerank(req)  # Returns list of dicts: [{'score': float}, ...]
+    # Shared, lazily loaded cross-encoder; scores come back in input order
+    scores = rerank(query, [doc.page_content for doc in docs])
 
     reranked_results = []
 
-    for score_dict, doc in zip(scores, docs):
-        score = score_dict.get("score", None)
+    for score, doc in zip(scores, docs):
         if score is not None and not math.isnan(score):
             reranked_results.append({
                 "score": score,
@@ -79,34 +70,51 @@ def rerank_with_flashrank(query, docs):
     return reranked_results
 
 
-def recommend_freelancers(project_summary, collection_list, top_n=10):
+def recommend_freelancers(project_summary, collection_list=None, top_n=10,
+                          availability="Available", min_rate=None, max_rate=None, skills=None):
+    """
+    Recommend freelancers for a project summary.
+    Without a collection_list the long-lived in-memory index over the
+    consolidated vector store is queried, pre-filtered on availability,
+    hourly rate range and skills so only eligible freelancers reach the
+    reranker; an explicit list still loads and merges just those legacy
+    per-freelancer folders and filters availability afterwards.
+    """
     if not isinstance(project_summary, str):
         raise ValueError("project_summary must be a string")
     project_summary = project_summary.strip()
     if not project_summary:
         raise ValueError("project_summary is empty")
 
-    retriever = merge_freelancer_vectors(collection_list)
-    initial_docs = retriever.invoke(project_summary)
+    if collection_list is None:
+        manager = init_index_manager()
+        initial_docs = manager.search(
+            project_summary,
+            k=max(top_n, LEN_OF_CHUNKS) * 2,
+            availability=availability,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            skills=skills,
+        )
+    else:
+        retriever = merge_freelancer_vectors(collection_list)
+        initial_docs = [
+            doc for doc in retriever.invoke(project_summary)
+            if availability is None or doc.metadata.get("availability") == availability
+        ]
 
     reranked = rerank_with_flashrank(project_summary, initial_docs)
 
     top_freelancers = []
     for res in reranked[:top_n]:
         meta = res["meta"]
-        
-        # Filter out freelancers who are not available
-        availability = meta.get("availability")
-        if availability != "Available":
-            continue
-            
         top_freelancers.append({
             "name": meta.get("name"),
             "skills": meta.get("skills", []),
             "summary": meta.get("summary"),
             "freelancer_id": meta.get("freelancer_id", "Unknown"),
             "score": res["score"],
-            "availability": availability
+            "availability": meta.get("availability")
         })
     return top_freelancers
 
@@ -0,0 +1,186 @@
+"""
+Bulk re-indexing of every freelancer into the consolidated vector store.
+
+Streams the freelancers table in keyset-paginated pages, generates missing
+summaries with bounded Groq concurrency, encodes each page in large
+SentenceTransformer batches and appends it to the store in one write.
+A checkpoint after every page lets an interrupted run resume.
+
+Usage:
+    python -m app.bulk_index --dest freelancer_store.new --batch-size 256 --concurrency 8
+    python -m app.bulk_index --dest freelancer_store.new --resume      # continue a run
+    python -m app.bulk_index --dest freelancer_store.new --swap        # then go live
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sentence_transformers import SentenceTransformer
+
+from app.db import get_connection
+from app.Embedding import EMBEDDING_MODEL, GROQ_API_KEY, generate_summary_with_groq
+from app.embedding_cache import get_embedding_cache
+from app.vector_store import DEFAULT_STORE_PATH, FreelancerVectorStore, swap_store
+
+CHECKPOINT_FILE = "bulk_index_checkpoint.json"
+
+
+def fetch_page(after_id, page_size):
+    """One page of freelancers with a parsed resume, ordered by id."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, summary, parsed_json
+                FROM freelancers
+                WHERE id > %s AND parsed_json IS NOT NULL
+                ORDER BY id
+                LIMIT %s
+            """, (after_id, page_size))
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def stream_freelancers(page_size, after_id=0):
+    """Yield pages of freelancer rows until the table is exhausted."""
+    while True:
+        rows = fetch_page(after_id, page_size)
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+def _summary_for(row, parsed_json, regenerate):
+    if not regenerate and row.get("summary"):
+        return row["summary"]
+    return generate_summary_with_groq(parsed_json, GROQ_API_KEY)
+
+
+def prepare_page(rows, executor, regenerate):
+    """Turn DB rows into (freelancer_id, summary, metadata), summarising concurrently."""
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append((row, json.loads(row["parsed_json"])))
+        except (TypeError, ValueError):
+            print(f"[WARNING] Skipping freelancer {row['id']}: invalid parsed_json")
+
+    futures = [executor.submit(_summary_for, row, parsed_json, regenerate) for row, parsed_json in parsed]
+
+    items = []
+    for (row, parsed_json), future in zip(parsed, futures):
+        try:
+            summary = (future.result() or "").strip()
+        except Exception as e:
+            print(f"[WARNING] Summary failed for freelancer {row['id']}: {e}")
+            continue
+        if not summary:
+            continue
+        freelancer_id = str(row["id"])
+        items.append((freelancer_id, summary, {
+            "freelancer_id": freelancer_id,
+            "name": parsed_json.get("name", ""),
+            "skills": parsed_json.get("skills", []),
+            "categories": ["Freelancer"],
+            "summary": summary,
+            "hourly_rate": parsed_json.get("hourly_rate", 0),
+            "availability": parsed_json.get("availability", "Unknown"),
+        }))
+    return items
+
+
+def load_checkpoint(dest):
+    path = os.path.join(dest, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {"last_id": 0, "indexed": 0}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(dest, checkpoint):
+    path = os.path.join(dest, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+
+def bulk_index(dest, page_size=500, batch_size=256, concurrency=8, regenerate=False, resume=False):
+    if not resume and os.path.exists(dest):
+        shutil.rmtree(dest)
+    store = FreelancerVectorStore(dest, model_name=EMBEDDING_MODEL)
+    checkpoint = load_checkpoint(dest) if resume else {"last_id": 0, "indexed": 0}
+    if resume:
+        print(f"[DEBUG] Resuming after freelancer id {checkpoint['last_id']} ({checkpoint['indexed']} already indexed)")
+
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    cache = get_embedding_cache(EMBEDDING_MODEL)
+
+    started = time.perf_counter()
+    indexed_this_run = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for rows in stream_freelancers(page_size, checkpoint["last_id"]):
+            items = prepare_page(rows, executor, regenerate)
+            if items:
+                summaries = [summary for _, summary, _ in items]
+                vectors = model.encode(summaries, batch_size=batch_size, convert_to_numpy=True,
+                                       show_progress_bar=False)
+                for summary, vector in zip(summaries, vectors):
+                    cache.put(summary, vector)
+                store.upsert_many([
+                    (freelancer_id, vector, metadata)
+                    for (freelancer_id, _, metadata), vector in zip(items, vectors)
+                ])
+
+            indexed_this_run += len(items)
+            checkpoint = {
+                "last_id": rows[-1]["id"],
+                "indexed": checkpoint["indexed"] + len(items),
+                "model": EMBEDDING_MODEL,
+            }
+            save_checkpoint(dest, checkpoint)
+
+            elapsed = time.perf_counter() - started
+            print(f"[PROGRESS] {checkpoint['indexed']} indexed (last id {checkpoint['last_id']}) - "
+                  f"{indexed_this_run / elapsed:.1f} freelancers/s")
+
+    if store.dead_rows():
+        store.compact()  # rows a resumed run re-indexed
+    elapsed = time.perf_counter() - started
+    print(f"✅ Indexed {indexed_this_run} freelancers in {elapsed:.1f}s "
+          f"({indexed_this_run / elapsed if elapsed else 0:.1f}/s); store has {len(store)} live vectors")
+    return checkpoint
+
+
+def swap_into_place(dest, live=DEFAULT_STORE_PATH):
+    """Replace the live store with a freshly built one, keeping the old copy as <live>.old."""
+    backup = live + ".old"
+    swap_store(dest, live, backup)
+    print(f"✅ {dest} is now the live vector store ({live}); previous store kept at {backup}. "
+          "Running API processes reload it on their next search.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-index every freelancer into the consolidated vector store")
+    parser.add_argument("--dest", default=DEFAULT_STORE_PATH + ".new", help="Store directory to build")
+    parser.add_argument("--page-size", type=int, default=500, help="Freelancers fetched per DB page")
+    parser.add_argument("--batch-size", type=int, default=256, help="SentenceTransformer encode batch size")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent Groq summary requests")
+    parser.add_argument("--regenerate-summaries", action="store_true",
+                        help="Call Groq for every freelancer instead of reusing stored summaries")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint in --dest")
+    parser.add_argument("--swap", action="store_true", help="Make --dest the live store when done")
+    args = parser.parse_args()
+
+    bulk_index(args.dest, args.page_size, args.batch_size, args.concurrency,
+               args.regenerate_summaries, args.resume)
+    if args.swap:
+        swap_into_place(args.dest)
+
+
+if __name__ == "__main__":
+    main()
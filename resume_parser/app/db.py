@@ -2,11 +2,14 @@
 import pymysql
 import os
 import json
+import threading
 from dotenv import load_dotenv
+from app.db_pool import pool_from_env
+from app.profile_cache import get_profile_cache
 
 load_dotenv()
 
-def get_connection():
+def _connect():
     return pymysql.connect(
         host=os.getenv("DB_HOST", "localhost"),
         user=os.getenv("DB_USER"),
@@ -17,6 +20,27 @@ def get_connection():
         cursorclass=pymysql.cursors.DictCursor
     )
 
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool_from_env(_connect)
+    return _pool
+
+def get_connection():
+    """
+    Check out a pooled connection. Use it like a pymysql connection;
+    close() returns it to the pool.
+    """
+    return get_pool().connection()
+
+def pool_stats():
+    return get_pool().stats()
+
 print("User:", os.getenv("DB_USER"))
 print("Password:", os.getenv("DB_PASSWORD"))
 print("Host:", os.getenv("DB_HOST"))
@@ -34,15 +58,24 @@ DEFAULT_PARSED_JSON = {
 }
 
 def get_default_parsed_json():
-    return DEFAULT_PARSED_JSON.copy()
+    # Deep copy: callers append to the lists
+    return json.loads(json.dumps(DEFAULT_PARSED_JSON))
 
 def get_parsed_resume(freelancer_id):
+    cache = get_profile_cache()
+    hit, parsed_json, version = cache.get("parsed", freelancer_id)
+    if hit:
+        return parsed_json
+
     conn = get_connection()
     with conn.cursor() as cursor:
         cursor.execute("SELECT parsed_json FROM freelancers WHERE id=%s", (freelancer_id,))
         result = cursor.fetchone()
     conn.close()
-    return json.loads(result['parsed_json']) if result and result['parsed_json'] else None
+    parsed_json = json.loads(result['parsed_json']) if result and result['parsed_json'] else None
+    if parsed_json is not None:
+        cache.set("parsed", freelancer_id, parsed_json, version)
+    return parsed_json
 
 import json
 import pymysql  # or your preferred import style
@@ -61,6 +94,41 @@ def _normalize_scalar(value):
     return str(value)
 
 
+def _write_parsed_json(cursor, freelancer_id, parsed_json):
+    """UPDATE a freelancer's contact fields, summary and parsed_json from parsed_json."""
+    # Extract and normalize fields from parsed JSON
+    name = _normalize_scalar(parsed_json.get('name', ''))
+    email = _normalize_scalar(parsed_json.get('email', ''))
+    phone = _normalize_scalar(parsed_json.get('phone', ''))
+    summary = _normalize_scalar(parsed_json.get('summary', ''))
+
+    # Update freelancer record
+    cursor.execute("""
+        UPDATE freelancers 
+        SET 
+            name = %s,
+            email = %s,
+            phone = %s,
+            summary = %s,
+            parsed_json = %s,
+            parsed_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+    """, (
+        name,
+        email,
+        phone,
+        summary,
+        json.dumps(parsed_json),
+        freelancer_id
+    ))
+
+    if cursor.rowcount == 0:
+        print(f"Warning: No rows updated for freelancer ID: {freelancer_id}")
+    else:
+        print(f"Successfully updated freelancer profile for ID: {freelancer_id}")
+        print(f"Updated fields: name='{name}', email='{email}', phone='{phone}', summary='{summary[:50]}...'")
+
+
 def save_parsed_json(freelancer_id, parsed_json):
     conn = get_connection()
     try:
@@ -76,39 +144,10 @@ def save_parsed_json(freelancer_id, parsed_json):
                     VALUES (%s)
                 """, (freelancer_id,))
             
-            # Extract and normalize fields from parsed JSON
-            name = _normalize_scalar(parsed_json.get('name', ''))
-            email = _normalize_scalar(parsed_json.get('email', ''))
-            phone = _normalize_scalar(parsed_json.get('phone', ''))
-            summary = _normalize_scalar(parsed_json.get('summary', ''))
-            
-            # Update freelancer record
-            cursor.execute("""
-                UPDATE freelancers 
-                SET 
-                    name = %s,
-                    email = %s,
-                    phone = %s,
-                    summary = %s,
-                    parsed_json = %s,
-                    parsed_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (
-                name,
-                email,
-                phone,
-                summary,
-                json.dumps(parsed_json),
-                freelancer_id
-            ))
-
-            if cursor.rowcount == 0:
-                print(f"Warning: No rows updated for freelancer ID: {freelancer_id}")
-            else:
-                print(f"Successfully updated freelancer profile for ID: {freelancer_id}")
-                print(f"Updated fields: name='{name}', email='{email}', phone='{phone}', summary='{summary[:50]}...'")
+            _write_parsed_json(cursor, freelancer_id, parsed_json)
         
         conn.commit()
+        get_profile_cache().invalidate(freelancer_id, parsed_json)
 
     except pymysql.MySQLError as e:
         print(f"Database error: {e}")
@@ -134,119 +173,169 @@ def is_email_duplicate(email, freelancer_id):
 
 # Manual Insertions
 
-def add_skill_manual(freelancer_id, skill_name):
+def _add_manual_entry(freelancer_id, exists_query, exists_params, insert_query, insert_params, add_to_json):
+    """
+    Add one manually entered child row and mirror it into parsed_json, in one
+    transaction on one connection: the freelancer row is locked first
+    (SELECT ... FOR UPDATE), so concurrent edits of the same freelancer queue
+    instead of losing each other's parsed_json update. add_to_json(parsed_json)
+    returns True if it changed the JSON.
+    """
     conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT COUNT(*) as cnt FROM skills WHERE freelancer_id=%s AND skill_name=%s
-        """, (freelancer_id, skill_name))
-        if cursor.fetchone()['cnt'] == 0:
-            cursor.execute("""
-                INSERT INTO skills (freelancer_id, skill_name, source) VALUES (%s, %s, 'manual')
-            """, (freelancer_id, skill_name))
-
-            parsed_json = get_parsed_resume(freelancer_id) or get_default_parsed_json()
-            if skill_name not in parsed_json.get("skills", []):
-                parsed_json["skills"].append(skill_name)
-                save_parsed_json(freelancer_id, parsed_json)
-    conn.commit()
-    conn.close()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO freelancers (id) VALUES (%s) ON DUPLICATE KEY UPDATE id = id",
+                (freelancer_id,)
+            )
+            cursor.execute("SELECT parsed_json FROM freelancers WHERE id=%s FOR UPDATE", (freelancer_id,))
+            row = cursor.fetchone()
+            parsed_json = None
+            cursor.execute(exists_query, exists_params)
+            if cursor.fetchone()['cnt'] == 0:
+                cursor.execute(insert_query, insert_params)
+                parsed_json = (
+                    json.loads(row['parsed_json']) if row and row['parsed_json'] else get_default_parsed_json()
+                )
+                if add_to_json(parsed_json):
+                    _write_parsed_json(cursor, freelancer_id, parsed_json)
+                else:
+                    parsed_json = None
+        conn.commit()
+        get_profile_cache().invalidate(freelancer_id, parsed_json)
+    except Exception as e:
+        print(f"Error adding manual entry: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def add_skill_manual(freelancer_id, skill_name):
+    def add_to_json(parsed_json):
+        skills = parsed_json.setdefault("skills", [])
+        if skill_name in skills:
+            return False
+        skills.append(skill_name)
+        return True
+
+    _add_manual_entry(
+        freelancer_id,
+        "SELECT COUNT(*) as cnt FROM skills WHERE freelancer_id=%s AND skill_name=%s",
+        (freelancer_id, skill_name),
+        "INSERT INTO skills (freelancer_id, skill_name, source) VALUES (%s, %s, 'manual')",
+        (freelancer_id, skill_name),
+        add_to_json,
+    )
 
 def add_project_manual(freelancer_id, title, description):
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT COUNT(*) as cnt FROM projects WHERE freelancer_id=%s AND title=%s
-        """, (freelancer_id, title))
-        if cursor.fetchone()['cnt'] == 0:
-            cursor.execute("""
-                INSERT INTO projects (freelancer_id, title, description, source) VALUES (%s, %s, %s, 'manual')
-            """, (freelancer_id, title, description))
-
-            parsed_json = get_parsed_resume(freelancer_id) or get_default_parsed_json()
-            if title not in {p["title"] for p in parsed_json.get("projects", [])}:
-                parsed_json["projects"].append({
-                    "title": title,
-                    "description": description
-                })
-                save_parsed_json(freelancer_id, parsed_json)
-    conn.commit()
-    conn.close()
+    def add_to_json(parsed_json):
+        projects = parsed_json.setdefault("projects", [])
+        if title in {p.get("title") for p in projects}:
+            return False
+        projects.append({"title": title, "description": description})
+        return True
+
+    _add_manual_entry(
+        freelancer_id,
+        "SELECT COUNT(*) as cnt FROM projects WHERE freelancer_id=%s AND title=%s",
+        (freelancer_id, title),
+        "INSERT INTO projects (freelancer_id, title, description, source) VALUES (%s, %s, %s, 'manual')",
+        (freelancer_id, title, description),
+        add_to_json,
+    )
 
 def add_experience_manual(freelancer_id, title, company, duration, description):
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT COUNT(*) as cnt FROM experience WHERE freelancer_id=%s AND title=%s AND company=%s
-        """, (freelancer_id, title, company))
-        if cursor.fetchone()['cnt'] == 0:
-            cursor.execute("""
-                INSERT INTO experience (freelancer_id, title, company, duration, description, source)
-                VALUES (%s, %s, %s, %s, %s, 'manual')
-            """, (freelancer_id, title, company, duration, description))
-
-            parsed_json = get_parsed_resume(freelancer_id) or get_default_parsed_json()
-            existing = {(e["title"], e["company"]) for e in parsed_json.get("experience", [])}
-            if (title, company) not in existing:
-                parsed_json["experience"].append({
-                    "title": title,
-                    "company": company,
-                    "duration": duration,
-                    "description": description
-                })
-                save_parsed_json(freelancer_id, parsed_json)
-    conn.commit()
-    conn.close()
+    def add_to_json(parsed_json):
+        experience = parsed_json.setdefault("experience", [])
+        if (title, company) in {(e.get("title"), e.get("company")) for e in experience}:
+            return False
+        experience.append({
+            "title": title,
+            "company": company,
+            "duration": duration,
+            "description": description
+        })
+        return True
+
+    _add_manual_entry(
+        freelancer_id,
+        "SELECT COUNT(*) as cnt FROM experience WHERE freelancer_id=%s AND title=%s AND company=%s",
+        (freelancer_id, title, company),
+        "INSERT INTO experience (freelancer_id, title, company, duration, description, source) "
+        "VALUES (%s, %s, %s, %s, %s, 'manual')",
+        (freelancer_id, title, company, duration, description),
+        add_to_json,
+    )
 
 # Parsed Insert Helpers
+#
+# Child rows are written with one multi-row INSERT per table. Duplicates are
+# skipped by the unique keys in migrations/001_unique_child_keys.sql: the
+# no-op ON DUPLICATE KEY UPDATE makes MySQL report 1 affected row per new
+# row and 0 per existing one, which gives the inserted/skipped counts.
+
+def _insert_ignoring_duplicates(cursor, table, columns, rows):
+    """
+    Insert rows (tuples matching columns) in one statement, skipping rows
+    whose unique key already exists. Returns {"inserted": n, "skipped": m}.
+    """
+    total = len(rows)
+    rows = list(dict.fromkeys(rows))
+    if not rows:
+        return {"inserted": 0, "skipped": total}
+    placeholders = ", ".join(["%s"] * len(columns))
+    # pymysql rewrites this executemany into a single multi-row INSERT
+    cursor.executemany(f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({placeholders})
+        ON DUPLICATE KEY UPDATE freelancer_id = freelancer_id
+    """, rows)
+    inserted = max(cursor.rowcount, 0)
+    return {"inserted": inserted, "skipped": total - inserted}
+
+def bulk_insert_skills(cursor, freelancer_id, skills, source='parsed'):
+    return _insert_ignoring_duplicates(
+        cursor, "skills", ("freelancer_id", "skill_name", "source"),
+        [(freelancer_id, skill, source) for skill in skills]
+    )
+
+def bulk_insert_projects(cursor, freelancer_id, projects, source='parsed'):
+    return _insert_ignoring_duplicates(
+        cursor, "projects", ("freelancer_id", "title", "description", "source"),
+        [(freelancer_id, p.get("title", ""), p.get("description", ""), source) for p in projects]
+    )
+
+def bulk_insert_experience(cursor, freelancer_id, experience, source='parsed'):
+    # Use only duration (not startDate/endDate) to match database schema
+    return _insert_ignoring_duplicates(
+        cursor, "experience", ("freelancer_id", "title", "company", "duration", "description", "source"),
+        [(
+            freelancer_id,
+            e.get("title", ""),
+            e.get("company", ""),
+            e.get("duration", ""),
+            e.get("description", ""),
+            source
+        ) for e in experience]
+    )
 
 def insert_skill_if_not_exists(cursor, freelancer_id, skill, source='parsed'):
-    cursor.execute("""
-        SELECT COUNT(*) as cnt FROM skills WHERE freelancer_id=%s AND skill_name=%s
-    """, (freelancer_id, skill))
-    if cursor.fetchone()['cnt'] == 0:
-        cursor.execute("""
-            INSERT INTO skills (freelancer_id, skill_name, source) VALUES (%s, %s, %s)
-        """, (freelancer_id, skill, source))
+    return bulk_insert_skills(cursor, freelancer_id, [skill], source)["inserted"] == 1
 
 def insert_project_if_not_exists(cursor, freelancer_id, project, source='parsed'):
-    cursor.execute("""
-        SELECT COUNT(*) as cnt FROM projects WHERE freelancer_id=%s AND title=%s
-    """, (freelancer_id, project["title"]))
-    if cursor.fetchone()['cnt'] == 0:
-        cursor.execute("""
-            INSERT INTO projects (freelancer_id, title, description, source)
-            VALUES (%s, %s, %s, %s)
-        """, (freelancer_id, project["title"], project["description"], source))
+    return bulk_insert_projects(cursor, freelancer_id, [project], source)["inserted"] == 1
 
 def insert_experience_if_not_exists(cursor, freelancer_id, experience, source='parsed'):
-    cursor.execute("""
-        SELECT COUNT(*) as cnt FROM experience
-        WHERE freelancer_id=%s AND title=%s AND company=%s
-    """, (freelancer_id, experience["title"], experience["company"]))
-    if cursor.fetchone()['cnt'] == 0:
-        cursor.execute("""
-            INSERT INTO experience (freelancer_id, title, company, duration, description, source)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (
-            freelancer_id,
-            experience["title"],
-            experience["company"],
-            experience["duration"],
-            experience["description"],
-            source
-        ))
+    return bulk_insert_experience(cursor, freelancer_id, [experience], source)["inserted"] == 1
 
 # Resume Updater
 
-def update_resume(freelancer_id, new_parsed_json):
+def merge_resumes(old_parsed, new_parsed_json):
     """
-    Merge old and new resumes.
-    Insert only new skills, projects, and experience into tables.
+    Merge a newly parsed resume into the stored one (no database access).
+    Returns (merged_json, skills_to_add, projects_to_add, experience_to_add),
+    the last three being the child rows not stored yet.
     """
-
-    old_parsed = get_parsed_resume(freelancer_id) or get_default_parsed_json()
-
     # Summary
     summary = new_parsed_json.get("summary") or old_parsed.get("summary", "")
 
@@ -337,40 +426,66 @@ def update_resume(freelancer_id, new_parsed_json):
         "experience": combined_experience
     }
 
-    # Save JSON back
-    save_parsed_json(freelancer_id, merged_json)
+    return merged_json, list(skills_to_add), projects_to_add, experience_to_add
+
 
-    # Insert new data
+def update_resume(freelancer_id, new_parsed_json):
+    """
+    Merge old and new resumes.
+    Insert only new skills, projects, and experience into tables.
+    """
+    return apply_resume_upload(freelancer_id, new_parsed_json)
+
+
+def apply_resume_upload(freelancer_id, new_parsed_json, summary=None, file_name=None, file_data=None):
+    """
+    Unit of work for a resume upload, in one transaction on one connection:
+    create the freelancer row if needed, lock it (SELECT ... FOR UPDATE),
+    merge new_parsed_json into the stored resume, optionally override the
+    summary and store the uploaded file, then write the freelancer row and
+    the new child rows. Concurrent uploads for the same freelancer queue on
+    the row lock instead of overwriting each other's merge.
+    Returns the merged JSON.
+    """
     conn = get_connection()
-    with conn.cursor() as cursor:
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO freelancers (id) VALUES (%s) ON DUPLICATE KEY UPDATE id = id",
+                (freelancer_id,)
+            )
+            cursor.execute("SELECT parsed_json FROM freelancers WHERE id=%s FOR UPDATE", (freelancer_id,))
+            row = cursor.fetchone()
+            old_parsed = (
+                json.loads(row['parsed_json']) if row and row['parsed_json'] else get_default_parsed_json()
+            )
 
-        for skill in skills_to_add:
-            cursor.execute("""
-                INSERT INTO skills (freelancer_id, skill_name, source)
-                VALUES (%s, %s, 'parsed')
-            """, (freelancer_id, skill))
-
-        for proj in projects_to_add:
-            cursor.execute("""
-                INSERT INTO projects (freelancer_id, title, description, source)
-                VALUES (%s, %s, %s, 'parsed')
-            """, (freelancer_id, proj.get("title", ""), proj.get("description", "")))
-
-        for exp in experience_to_add:
-            # Use only duration (not startDate/endDate) to match database schema
-            cursor.execute("""
-                INSERT INTO experience (freelancer_id, title, company, duration, description, source)
-                VALUES (%s, %s, %s, %s, %s, 'parsed')
-            """, (
-                freelancer_id,
-                exp.get("title", ""),
-                exp.get("company", ""),
-                exp.get("duration", ""),
-                exp.get("description", "")
-            ))
+            merged_json, skills_to_add, projects_to_add, experience_to_add = merge_resumes(
+                old_parsed, new_parsed_json
+            )
+            if summary:
+                merged_json["summary"] = summary
 
-    conn.commit()
-    conn.close()
+            if file_name is not None:
+                cursor.execute("""
+                    UPDATE freelancers 
+                    SET resume_filename=%s, resume_filedata=%s, uploaded_at=CURRENT_TIMESTAMP
+                    WHERE id=%s
+                """, (file_name, file_data, freelancer_id))
+
+            _write_parsed_json(cursor, freelancer_id, merged_json)
+            bulk_insert_skills(cursor, freelancer_id, skills_to_add)
+            bulk_insert_projects(cursor, freelancer_id, projects_to_add)
+            bulk_insert_experience(cursor, freelancer_id, experience_to_add)
+
+        conn.commit()
+        get_profile_cache().invalidate(freelancer_id, merged_json)
+    except Exception as e:
+        print(f"Error applying resume upload: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
     return merged_json
 
@@ -0,0 +1,211 @@
+"""
+Bounded, thread-safe pool of pymysql connections.
+
+get_connection() in app.db hands out PooledConnection proxies: they behave
+like a pymysql connection, but close() returns the connection to the pool
+(rolled back, so no half-finished transaction leaks into the next user)
+instead of tearing down the TCP connection and MySQL auth handshake.
+
+    pool_size      connections kept open and reused
+    max_overflow   extra connections allowed under bursts; closed on return
+    timeout        seconds a caller waits for a free connection
+    recycle        max lifetime of a connection in seconds
+    ping_after     idle seconds after which a connection is pinged on checkout
+"""
+import collections
+import os
+import threading
+import time
+
+import pymysql
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout."""
+
+
+class PooledConnection:
+    """A checked-out connection; close() gives it back to the pool."""
+
+    def __init__(self, pool, conn, created_at):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise pymysql.err.InterfaceError("Connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool._release(conn, self._created_at)
+
+    def __del__(self):
+        # Safety net for helpers that skip close() on an exception path
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, pool_size=10, max_overflow=5, timeout=30.0, recycle=1800.0, ping_after=10.0):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._idle = collections.deque()  # (conn, created_at, returned_at)
+        self._open = 0                    # connections currently open (idle + checked out)
+        self._cond = threading.Condition()
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.health_check_failures = 0
+
+    def _healthy(self, conn, created_at, returned_at):
+        # Called without the pool lock held: the ping is a network round trip
+        now = time.monotonic()
+        if now - created_at > self.recycle:
+            with self._cond:
+                self.recycled += 1
+            return False
+        if now - returned_at > self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self.health_check_failures += 1
+                return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def connection(self):
+        """Check out a connection, waiting up to timeout seconds if the pool is exhausted."""
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    # Counted in _open either way: it is checked out or replaced below
+                    idle = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    idle = None
+                    break
+
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self._open} open, pool_size={self.pool_size}, max_overflow={self.max_overflow})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        # Health checks, closes and connects run outside the lock, so a slow
+        # or dead socket only delays its own caller
+        if idle is not None:
+            conn, created_at, returned_at = idle
+            if self._healthy(conn, created_at, returned_at):
+                with self._cond:
+                    return self._checked_out(conn, created_at, started, waited)
+            self._discard(conn)  # its slot goes to a fresh connection
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+            return self._checked_out(conn, time.monotonic(), started, waited)
+
+    def _checked_out(self, conn, created_at, started, waited):
+        wait = time.monotonic() - started
+        self.checkouts += 1
+        if waited:
+            self.waits += 1
+        self.wait_time_total += wait
+        self.wait_time_max = max(self.wait_time_max, wait)
+        return PooledConnection(self, conn, created_at)
+
+    def _release(self, conn, created_at):
+        reusable = conn.open
+        if reusable:
+            try:
+                conn.rollback()
+            except Exception:
+                reusable = False
+
+        with self._cond:
+            # Overflow connections are not kept once the burst is over
+            keep = reusable and len(self._idle) < self.pool_size and self._open <= self.pool_size
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    def dispose(self):
+        """Close every idle connection (checked-out ones close when returned)."""
+        with self._cond:
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_ms_avg": round(1000 * self.wait_time_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(1000 * self.wait_time_max, 3),
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "recycled": self.recycled,
+                "health_check_failures": self.health_check_failures,
+            }
+
+
+def pool_from_env(connect):
+    return ConnectionPool(
+        connect,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", "5")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        recycle=float(os.getenv("DB_POOL_RECYCLE", "1800")),
+        ping_after=float(os.getenv("DB_POOL_PING_AFTER", "10")),
+    )
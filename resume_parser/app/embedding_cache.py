@@ -0,0 +1,222 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are keyed by sha256(model name + normalised text), so a summary or
+project description that was embedded before is never re-encoded. Lookups
+go through an in-memory LRU first and an on-disk tier (one .npy file per
+key) second. The same cache is shared by indexing (Embedding) and querying
+(Recommender); this assumes a symmetric model such as all-MiniLM-L6-v2,
+where a text embeds the same as a document and as a query.
+
+Only document embeddings are written to disk; one-off search queries stay
+in memory. The disk tier is evicted least recently used first (by file
+mtime, touched on every disk hit) once it exceeds EMBEDDING_CACHE_MAX_BYTES.
+Each process tracks its own writes and rescans the directory before
+evicting, so processes sharing the directory may overshoot the budget by
+what the others wrote since their last scan.
+"""
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+
+def normalize_text(text):
+    """Unicode-normalise and collapse whitespace so trivial edits share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + disk) cache of text -> vector for one model."""
+
+    def __init__(self, model_name, max_items=EMBEDDING_CACHE_SIZE, cache_dir=EMBEDDING_CACHE_DIR,
+                 max_bytes=EMBEDDING_CACHE_MAX_BYTES):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.cache_dir = os.path.join(cache_dir, model_name.replace("/", "_")) if cache_dir else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._disk_bytes = None  # size of the disk tier as of the last scan plus our writes since
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def key(self, text):
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text):
+        """Return the cached vector for text, or None."""
+        key = self.key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                vector = np.load(path)
+                os.utime(path)  # mark as recently used for eviction
+            except (OSError, ValueError):
+                vector = None
+            if vector is not None:
+                with self._lock:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, vector, persist=True):
+        """Cache a vector; with persist=False it is kept in memory only."""
+        key = self.key(text)
+        vector = np.asarray(vector, dtype="float32")
+        with self._lock:
+            self._remember(key, vector)
+
+        if self.cache_dir and persist:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+                size = f.tell()
+            os.replace(tmp_path, path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += size
+                    if self._disk_bytes <= self.max_bytes:
+                        return
+            self._evict()
+
+    def _scan(self):
+        entries = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith(".npy"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted by another process meanwhile
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        # Rescan first: other processes write to the same directory
+        with self._evict_lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            if total > self.max_bytes:
+                # Down to 90% of the budget, so the next few puts don't rescan
+                target = self.max_bytes * 0.9
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    evicted += 1
+            with self._lock:
+                self._disk_bytes = total
+                self.disk_evictions += evicted
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "model": self.model_name,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
+
+
+class CachedEmbeddings:
+    """
+    Drop-in wrapper for a LangChain embeddings object (embed_documents /
+    embed_query) that serves repeated texts from an EmbeddingCache and
+    encodes only the misses, in one batch.
+    """
+
+    def __init__(self, embeddings, cache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        vectors = [self.cache.get(text) for text in texts]
+        # Encode each distinct missing text once, even if it repeats in the batch
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(self.cache.key(texts[i]), []).append(i)
+        if missing:
+            positions = list(missing.values())
+            encoded = self.embeddings.embed_documents([texts[p[0]] for p in positions])
+            for indices, vector in zip(positions, encoded):
+                self.cache.put(texts[indices[0]], vector)
+                for i in indices:
+                    vectors[i] = vector
+        return [np.asarray(v, dtype="float32").tolist() for v in vectors]
+
+    def embed_query(self, text):
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector, persist=False)
+        return np.asarray(vector, dtype="float32").tolist()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """Return the process-wide cache for model_name."""
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            cache = EmbeddingCache(model_name)
+            _caches[model_name] = cache
+        return cache
+
+
+def cache_stats():
+    """Hit/miss counters of every embedding cache in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
@@ -0,0 +1,148 @@
+"""
+Bounded executors for blocking work inside async FastAPI handlers.
+
+    run_cpu(fn, *args)  CPU-bound work (PDF/DOCX text extraction) in a
+                        process pool, so it runs outside the GIL
+    run_io(fn, *args)   blocking I/O (pymysql, sync HTTP, model inference
+                        that releases the GIL) in a sized thread pool
+
+Each pool admits at most workers + queue jobs at once. Beyond that the call
+fails fast with Overloaded, an HTTP 503 with Retry-After, instead of
+letting the backlog and latency grow without bound.
+
+Configuration (env):
+    CPU_POOL_WORKERS / CPU_POOL_QUEUE   default: cpu count / 64
+    IO_POOL_WORKERS / IO_POOL_QUEUE     default: 32 / 64
+    OFFLOAD_BLOCKING=0                  run everything inline on the event
+                                        loop (the old behaviour; used as the
+                                        baseline by benchmarks/bench_concurrency.py)
+"""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+OFFLOAD_BLOCKING = os.getenv("OFFLOAD_BLOCKING", "1") != "0"
+
+
+class Overloaded(HTTPException):
+    """A pool's queue is full; surfaced to clients as 503 Service Unavailable."""
+
+    def __init__(self, pool_name):
+        super().__init__(
+            status_code=503,
+            detail=f"Server busy ({pool_name} pool queue is full), retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+class BoundedExecutor:
+    def __init__(self, name, make_executor, max_workers, max_queue, copy_context=False):
+        self.name = name
+        self.copy_context = copy_context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._make_executor = make_executor
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._make_executor(self.max_workers)
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        call = functools.partial(fn, *args, **kwargs)
+        if not OFFLOAD_BLOCKING:
+            return call()
+        if self.copy_context:
+            # Like asyncio.to_thread: context variables (e.g. the Groq usage scope) follow the call
+            call = functools.partial(contextvars.copy_context().run, call)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(self.name)
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        try:
+            future = self.executor.submit(call)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the job itself finishes, not when the awaiting
+        # coroutine does: a cancelled request leaves its job running, and it
+        # must keep holding the slot until then
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+            }
+
+
+def _process_pool(workers):
+    # spawn: forking a process that already runs threads (uvicorn, the
+    # thread pool, DB pools) can deadlock the child
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _thread_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blocking-io")
+
+
+_cpu_workers = int(os.getenv("CPU_POOL_WORKERS", str(os.cpu_count() or 1)))
+_io_workers = int(os.getenv("IO_POOL_WORKERS", "32"))
+
+cpu_pool = BoundedExecutor("cpu", _process_pool, _cpu_workers, int(os.getenv("CPU_POOL_QUEUE", "64")))
+io_pool = BoundedExecutor("io", _thread_pool, _io_workers, int(os.getenv("IO_POOL_QUEUE", "64")), copy_context=True)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a picklable, module-level fn in the process pool."""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run a blocking fn in the I/O thread pool."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+def executor_stats():
+    return {"cpu": cpu_pool.stats(), "io": io_pool.stats()}
+
+
+def shutdown_executors():
+    cpu_pool.shutdown()
+    io_pool.shutdown()
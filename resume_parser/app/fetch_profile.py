@@ -1,4 +1,39 @@
+import json
+
 from app.db import get_connection
+from app.profile_cache import get_profile_cache
+
+FETCH_BATCH_SIZE = 500  # ids per IN (...) list in get_full_freelancer_profiles
+
+def _freelancer_row(r):
+    return {
+        "id": r['id'],
+        "name": r['name'],
+        "email": r['email'],
+        "phone": r['phone'],
+        "summary": r['summary']
+    }
+
+def _skill_row(r):
+    return {"id": r['id'], "skill": r['skill_name'], "source": r['source']}
+
+def _project_row(r):
+    return {
+        "id": r['id'],
+        "title": r['title'],
+        "description": r['description'],
+        "source": r['source']
+    }
+
+def _experience_row(r):
+    return {
+        "id": r['id'],
+        "title": r['title'],
+        "company": r['company'],
+        "duration": r.get('duration', ''),
+        "description": r['description'],
+        "source": r['source']
+    }
 
 def get_freelancer_by_id(freelancer_id):
     conn = get_connection()
@@ -13,13 +48,7 @@ def get_freelancer_by_id(freelancer_id):
     conn.close()
     
     if result:
-        return {
-            "id": result['id'],
-            "name": result['name'],
-            "email": result['email'],
-            "phone": result['phone'],
-            "summary": result['summary']
-        }
+        return _freelancer_row(result)
     return None
 
 def get_skills(freelancer_id):
@@ -33,7 +62,7 @@ def get_skills(freelancer_id):
     result = cursor.fetchall()
     cursor.close()
     conn.close()
-    return [{"id": r['id'], "skill": r['skill_name'], "source": r['source']} for r in result]
+    return [_skill_row(r) for r in result]
 
 def get_projects(freelancer_id):
     conn = get_connection()
@@ -46,14 +75,7 @@ def get_projects(freelancer_id):
     result = cursor.fetchall()
     cursor.close()
     conn.close()
-    return [
-        {
-            "id": r['id'],
-            "title": r['title'],
-            "description": r['description'],
-            "source": r['source']
-        } for r in result
-    ]
+    return [_project_row(r) for r in result]
 
 def get_experience(freelancer_id):
     conn = get_connection()
@@ -66,25 +88,97 @@ def get_experience(freelancer_id):
     result = cursor.fetchall()
     cursor.close()
     conn.close()
-    return [
-        {
-            "id": r['id'],
-            "title": r['title'],
-            "company": r['company'],
-            "duration": r.get('duration', ''),
-            "description": r['description'],
-            "source": r['source']
-        } for r in result
-    ]
+    return [_experience_row(r) for r in result]
 
 def get_full_freelancer_profile(freelancer_id):
-    """ Optional: Combine freelancer data with skills, projects, experience """
-    freelancer = get_freelancer_by_id(freelancer_id)
-    if not freelancer:
-        return None
+    """
+    Freelancer data with skills, projects and experience, in one query:
+    the child rows come back as JSON arrays aggregated by MySQL.
+    """
+    cache = get_profile_cache()
+    hit, freelancer, version = cache.get("profile", freelancer_id)
+    if hit:
+        return freelancer
 
-    freelancer['skills'] = get_skills(freelancer_id)
-    freelancer['projects'] = get_projects(freelancer_id)
-    freelancer['experience'] = get_experience(freelancer_id)
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT f.id, f.name, f.email, f.phone, f.summary,
+            (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                        'id', s.id, 'skill', s.skill_name, 'source', s.source))
+             FROM skills s WHERE s.freelancer_id = f.id) AS skills,
+            (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                        'id', p.id, 'title', p.title, 'description', p.description,
+                        'source', p.source))
+             FROM projects p WHERE p.freelancer_id = f.id) AS projects,
+            (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                        'id', e.id, 'title', e.title, 'company', e.company,
+                        'duration', COALESCE(e.duration, ''), 'description', e.description,
+                        'source', e.source))
+             FROM experience e WHERE e.freelancer_id = f.id) AS experience
+        FROM freelancers f
+        WHERE f.id = %s
+    """, (freelancer_id,))
+    result = cursor.fetchone()
+    cursor.close()
+    conn.close()
 
+    if not result:
+        return None
+    freelancer = _freelancer_row(result)
+    for key in ("skills", "projects", "experience"):
+        freelancer[key] = sorted(json.loads(result[key]) if result[key] else [], key=lambda r: r["id"])
+    cache.set("profile", freelancer_id, freelancer, version)
     return freelancer
+
+def get_full_freelancer_profiles(freelancer_ids):
+    """
+    Batch version of get_full_freelancer_profile for list and admin views.
+    Runs four queries per FETCH_BATCH_SIZE ids on one connection, whatever
+    the number of profiles; profiles already in the profile cache are not
+    queried. Returns {freelancer_id: profile} keyed by int id (string ids
+    such as "42" are accepted); unknown ids are left out.
+    """
+    # Rows come back keyed by the int id column, so match on ints throughout
+    ids = list(dict.fromkeys(int(i) for i in freelancer_ids))
+    cache = get_profile_cache()
+    profiles, versions = cache.get_many("profile", ids)
+    missing = [i for i in ids if i not in profiles]
+    if not missing:
+        return {i: profiles[i] for i in ids}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(missing), FETCH_BATCH_SIZE):
+            chunk = missing[start:start + FETCH_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+
+            cursor.execute(f"""
+                SELECT id, name, email, phone, summary
+                FROM freelancers
+                WHERE id IN ({placeholders})
+            """, chunk)
+            for r in cursor.fetchall():
+                profile = _freelancer_row(r)
+                profile.update(skills=[], projects=[], experience=[])
+                profiles[r['id']] = profile
+
+            for key, query, to_dict in (
+                ("skills", "SELECT id, freelancer_id, skill_name, source FROM skills", _skill_row),
+                ("projects", "SELECT id, freelancer_id, title, description, source FROM projects", _project_row),
+                ("experience", "SELECT id, freelancer_id, title, company, duration, description, source "
+                               "FROM experience", _experience_row),
+            ):
+                cursor.execute(f"{query} WHERE freelancer_id IN ({placeholders}) ORDER BY id", chunk)
+                for r in cursor.fetchall():
+                    if r['freelancer_id'] in profiles:
+                        profiles[r['freelancer_id']][key].append(to_dict(r))
+    finally:
+        cursor.close()
+        conn.close()
+
+    for i in missing:
+        if i in profiles:
+            cache.set("profile", i, profiles[i], versions[i])
+    return {i: profiles[i] for i in ids if i in profiles}
@@ -1,34 +1,240 @@
+"""
+FAISS index over the freelancer vector store (app.vector_store).
+
+The index is built from the store's live rows, labelled by store row
+(IndexIDMap2), written to disk and served from a read-only memory map
+(faiss.IO_FLAG_MMAP), so the vectors are not copied into FAISS's own
+memory and several processes share the same pages. The store state
+(generation, rows, log size) the index was built from is saved with it;
+any commit to the store makes the index stale and the next
+build_faiss_index() rebuilds it.
+
+Configuration (env):
+    FAISS_INDEX_TYPE       flat / ivf / hnsw / ivfpq (default flat)
+    FAISS_IVFPQ_MIN_ROWS   below this many rows ivfpq falls back to flat
+                           (default 9984, what m x 8-bit codebooks need to train)
+"""
 import os
 import json
 import numpy as np
 import faiss
 
-BASE_FOLDER = "embedding_vectors_fl"
+from app.vector_store import open_vector_store
 
-def build_faiss_index(base_folder=BASE_FOLDER):
-    embeddings = []
-    metadata_list = []
+# Kept inside the vector store directory, next to the vectors it indexes
+INDEX_FOLDER = "faiss"
+INDEX_FILE = "index.faiss"
+INDEX_PARAMS_FILE = "index_params.json"
+# Rows normalised and added per chunk while building, bounding the extra copy
+BUILD_CHUNK_ROWS = 65536
 
-    for freelancer_id in os.listdir(base_folder):
-        folder = os.path.join(base_folder, freelancer_id)
-        emb = np.load(os.path.join(folder, "embedding.npy")).astype('float32')
+# Index types and their default parameters. Vectors are L2-normalised, so
+# every index uses inner product (= cosine similarity).
+#   flat  - exact brute-force scan, the recall baseline
+#   ivf   - IVF-Flat; nlist coarse clusters, nprobe of them scanned per query
+#   hnsw  - HNSW graph; efSearch trades latency for recall
+#   ivfpq - IVF with product quantisation (m sub-vectors x nbits) for small RAM
+INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+DEFAULT_INDEX_PARAMS = {
+    "flat": {},
+    "ivf": {"nlist": None, "nprobe": 16},
+    "hnsw": {"M": 32, "efConstruction": 200, "efSearch": 64},
+    "ivfpq": {"nlist": None, "nprobe": 16, "m": 48, "nbits": 8},
+}
+# Parameters baked into the built index; the others (nprobe, efSearch) are
+# query-time knobs applied to a loaded index without retraining
+BUILD_PARAMS = ("nlist", "m", "nbits", "M", "efConstruction")
+# Each k-means centroid wants >= 39 training points (FAISS warns below that)
+MIN_POINTS_PER_CENTROID = 39
+IVFPQ_MIN_ROWS = int(os.getenv("FAISS_IVFPQ_MIN_ROWS", str(MIN_POINTS_PER_CENTROID * 256)))
 
-        with open(os.path.join(folder, "metadata.json"), "r") as f:
-            metadata = json.load(f)
 
-        embeddings.append(emb)
-        metadata_list.append({
-            "freelancer_id": freelancer_id,
-            "metadata": metadata
-        })
+def _normalized(vectors):
+    """L2-normalised float32 copy of a block of rows."""
+    block = np.array(vectors, dtype='float32')
+    faiss.normalize_L2(block)
+    return block
+
+
+class StoreMetadata:
+    """
+    Row-addressable metadata of the indexed store: index labels are store
+    rows, so metadata_list[label] reads that row's metadata from the store.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, row):
+        metadata = self.store.metadata(int(row))
+        return {"freelancer_id": metadata["freelancer_id"], "metadata": metadata}
+
+
+def default_nlist(num_rows):
+    """~4*sqrt(N) clusters, capped so each cluster gets >= 39 training points."""
+    return max(1, min(int(4 * np.sqrt(num_rows)), num_rows // MIN_POINTS_PER_CENTROID))
+
+
+def max_nbits(num_rows):
+    """Largest PQ code size whose 2**nbits centroids get >= 39 training points each."""
+    return max(1, int(np.log2(max(num_rows // MIN_POINTS_PER_CENTROID, 2))))
+
+
+def resolve_index_type(index_type, num_rows):
+    """
+    index_type, or flat when ivfpq has too few rows to train: PQ recall
+    collapses with under-trained codebooks, and a flat scan of that many
+    rows is cheap and exact.
+    """
+    if index_type == "ivfpq" and num_rows < IVFPQ_MIN_ROWS:
+        print(f"[WARNING] {num_rows} rows are too few to train ivfpq "
+              f"(FAISS_IVFPQ_MIN_ROWS={IVFPQ_MIN_ROWS}), using a flat index")
+        return "flat"
+    return index_type
+
+
+def build_params(params):
+    """The subset of params that requires a rebuild when it changes."""
+    return {k: v for k, v in params.items() if k in BUILD_PARAMS}
+
+
+def resolve_index_params(index_type, num_rows, **overrides):
+    """Merge the defaults for index_type with overrides and fill in derived values."""
+    if index_type not in DEFAULT_INDEX_PARAMS:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {list(DEFAULT_INDEX_PARAMS)}")
+    params = dict(DEFAULT_INDEX_PARAMS[index_type])
+    params.update({k: v for k, v in overrides.items() if v is not None})
+    if "nlist" in params and not params["nlist"]:
+        params["nlist"] = default_nlist(num_rows)
+    if "nbits" in params:
+        params["nbits"] = min(params["nbits"], max_nbits(num_rows))
+    return params
+
+
+def create_index(embeddings, index_type="flat", rows=None, **params):
+    """
+    Build (and train, if needed) a FAISS index of index_type over embeddings.
+    With rows, only those rows of embeddings are indexed, labelled by their
+    row number, and L2-normalised chunk by chunk (embeddings may be a memmap).
+    Returns (index, params) with every parameter that was actually used.
+    """
+    num_rows, dim = (len(rows) if rows is not None else embeddings.shape[0]), embeddings.shape[1]
+    params = resolve_index_params(index_type, num_rows, **params)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["efConstruction"]
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dim, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            if dim % params["m"] != 0:
+                raise ValueError(f"ivfpq m={params['m']} must divide the vector dimension {dim}")
+            index = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["m"], params["nbits"],
+                                     faiss.METRIC_INNER_PRODUCT)
+
+    if rows is None:
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+    else:
+        rows = np.asarray(rows, dtype='int64')
+        if not index.is_trained:
+            # Train on a sample: IVF k-means only uses up to 256 points per cluster anyway
+            sample = rows[np.linspace(0, len(rows) - 1, min(len(rows), 256 * params["nlist"])).astype('int64')]
+            index.train(_normalized(embeddings[sample]))
+        index = faiss.IndexIDMap2(index)
+        for start in range(0, len(rows), BUILD_CHUNK_ROWS):
+            chunk = rows[start:start + BUILD_CHUNK_ROWS]
+            index.add_with_ids(_normalized(embeddings[chunk]), chunk)
+    set_search_params(index, params)
+    return index, params
+
+
+def set_search_params(index, params):
+    """Apply the query-time knobs (nprobe / efSearch) stored in params."""
+    if "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    if "efSearch" in params:
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        index.hnsw.efSearch = params["efSearch"]
+
+
+def index_folder(store):
+    return os.path.join(store.path, INDEX_FOLDER)
+
+
+def save_index(index, index_type, params, state, folder):
+    """
+    Write an index and what it was built from (index type, parameters,
+    store state). Both files are replaced atomically, so processes still
+    mapping the previous index keep a consistent copy.
+    """
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, INDEX_FILE + ".tmp")
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, os.path.join(folder, INDEX_FILE))
+    tmp_path = os.path.join(folder, INDEX_PARAMS_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"index_type": index_type, "params": params, "state": list(state),
+                   "rows": index.ntotal}, f)
+    os.replace(tmp_path, os.path.join(folder, INDEX_PARAMS_FILE))
+
+
+def read_saved_params(folder):
+    """What the index in folder was built from, or None if there is none."""
+    try:
+        with open(os.path.join(folder, INDEX_PARAMS_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(folder):
+    """Memory-map a persisted index and apply its stored search parameters. Returns (index, saved)."""
+    saved = read_saved_params(folder)
+    index = faiss.read_index(os.path.join(folder, INDEX_FILE), faiss.IO_FLAG_MMAP)
+    set_search_params(index, saved["params"])
+    return index, saved
+
+
+def build_faiss_index(store=None, rebuild=False, index_type=None, **params):
+    """
+    Build or load the index over a FreelancerVectorStore (default: the
+    process-wide store). Returns (index, metadata_list); index labels are
+    store rows and metadata_list[label] is that freelancer's metadata.
 
-    embeddings_np = np.vstack(embeddings).astype('float32')
-    faiss.normalize_L2(embeddings_np)
+    index_type (default FAISS_INDEX_TYPE) selects flat / ivf / hnsw / ivfpq.
+    The saved index is reused while the store state, index type and build
+    parameters match; otherwise it is rebuilt from store.vectors(mmap=True)
+    and written to disk. Either way the returned index is memory-mapped and
+    the requested search parameters (nprobe, efSearch) are applied to it.
+    """
+    store = store or open_vector_store()
+    folder = index_folder(store)
+    state = list(store.state)
+    rows = store.live_rows()
+    if not rows:
+        raise ValueError(f"Vector store is empty: {store.path}")
 
-    index = faiss.IndexFlatIP(embeddings_np.shape[1])
-    index.add(embeddings_np)
+    index_type = resolve_index_type(index_type or INDEX_TYPE, len(rows))
+    wanted = resolve_index_params(index_type, len(rows), **params)
+    saved = None if rebuild else read_saved_params(folder)
+    if not (saved and saved["state"] == state and saved["index_type"] == index_type
+            and build_params(saved["params"]) == build_params(wanted)):
+        if saved:
+            print(f"[DEBUG] FAISS index in {folder} is stale, rebuilding")
+        index, used = create_index(store.vectors(mmap=True), index_type, rows=rows, **wanted)
+        save_index(index, index_type, used, state, folder)
+        del index
 
-    return index, metadata_list
+    index, _ = load_index(folder)
+    set_search_params(index, wanted)
+    return index, StoreMetadata(store)
 
 def search_faiss(query_text, embedding_model, index, metadata_list, top_k=10):
     query_vec = embedding_model.encode([query_text]).astype('float32')
@@ -40,10 +246,11 @@ def search_faiss(query_text, embedding_model, index, metadata_list, top_k=10):
     for idx, score in zip(I[0], D[0]):
         if idx == -1:
             continue
+        entry = metadata_list[idx]
         results.append({
-            "freelancer_id": metadata_list[idx]["freelancer_id"],
+            "freelancer_id": entry["freelancer_id"],
             "similarity": float(score),
-            "metadata": metadata_list[idx]["metadata"]
+            "metadata": entry["metadata"]
         })
 
     return results
@@ -0,0 +1,112 @@
+"""
+Incremental parsing of a JSON object that is still being generated.
+
+IncrementalJSONParser scans streamed text once, tracking string/escape
+state and the open containers. At every point where the prefix can be
+closed into valid JSON (right after an opening brace/bracket, before a
+comma, after a closing brace/bracket) it records a cut. snapshot() closes
+the prefix at the latest cut and decodes it, so callers see every field
+and list item that has been fully generated so far.
+
+Text before the first '{' (e.g. "Here is the JSON:" or a ``` fence) is
+ignored, as is anything after the top-level object closes.
+"""
+import json
+import time
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.text = ""
+        self._pos = 0          # next character to scan
+        self._start = None     # index of the top-level '{'
+        self._stack = []       # open containers
+        self._in_string = False
+        self._escape = False
+        self._cut = None       # (end index, closers) of the latest closable prefix
+        self._snapshot_cut = None
+        self.done = False
+
+    def feed(self, chunk):
+        """Append streamed text. Returns True if a larger closable prefix is available."""
+        self.text += chunk
+        before = self._cut
+        self._scan()
+        return self._cut != before
+
+    def _mark(self, end):
+        self._cut = (end, "".join(_CLOSERS[c] for c in reversed(self._stack)))
+
+    def _scan(self):
+        text = self.text
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._stack.append("{")
+                    self._mark(i + 1)
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._mark(i + 1)
+            elif ch in "}]":
+                self._stack.pop()
+                self._mark(i + 1)
+                if not self._stack:
+                    self.done = True
+            elif ch == ",":
+                self._mark(i)
+            i += 1
+        self._pos = i
+
+    def snapshot(self):
+        """The object generated so far (fully generated values only), or None before the first '{'."""
+        if self._cut is None:
+            return None
+        end, closers = self._cut
+        try:
+            return json.loads(self.text[self._start:end] + closers)
+        except ValueError:
+            # Malformed model output so far; a later cut may still decode
+            return None
+
+
+def ndjson_event(event, **fields):
+    """One line of an application/x-ndjson event stream."""
+    return json.dumps({"event": event, **fields}) + "\n"
+
+
+async def iter_partial_json(chunks, min_interval=0.1, parser=None):
+    """
+    Consume an async iterator of text chunks and yield ("partial", obj)
+    whenever more of the object is complete (at most once per min_interval
+    seconds), then ("complete", full_text) at the end of the stream.
+    Pass a parser to inspect it afterwards (parser.done is False if the
+    stream ended before the top-level object closed, i.e. truncation).
+    """
+    parser = parser or IncrementalJSONParser()
+    last_emit = 0.0
+    last_snapshot = None
+    async for chunk in chunks:
+        if not parser.feed(chunk):
+            continue
+        now = time.monotonic()
+        if now - last_emit < min_interval and not parser.done:
+            continue
+        snapshot = parser.snapshot()
+        if snapshot is not None and snapshot != last_snapshot:
+            last_emit, last_snapshot = now, snapshot
+            yield "partial", snapshot
+    yield "complete", parser.text
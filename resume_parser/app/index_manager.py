@@ -0,0 +1,234 @@
+"""
+Long-lived freelancer index.
+
+Loads the consolidated freelancer vector store once, keeps a single FAISS
+index in memory and applies per-freelancer add/replace/delete updates, so
+a recommendation query costs one ANN search instead of one
+FAISS.load_local per freelancer folder.
+
+The store may be written by other processes (uvicorn workers, bulk
+indexing): before each search the manager compares the store's state and
+adds/removes the rows that changed, reloading fully after a compaction.
+
+Searches can be restricted by metadata (availability, hourly rate, skills):
+the eligible rows are turned into a bitmap ID selector that FAISS applies
+during the scan, so ineligible freelancers never take up result slots.
+"""
+import threading
+
+import faiss
+import numpy as np
+
+from app.models import get_embedding_function
+from app.vector_store import open_vector_store
+
+
+class FreelancerIndexManager:
+    """
+    In-memory index over a FreelancerVectorStore.
+
+    Vectors live in a faiss.IndexIDMap2 labelled by their store row. A
+    replaced freelancer gets a new row, so an update is a remove_ids of the
+    old row plus an add_with_ids of the new one.
+    """
+
+    def __init__(self, store, embedding_function=None):
+        self.store = store
+        self.embedding_function = embedding_function
+        self._lock = threading.RLock()
+        self._index = None
+        self._documents = {}   # row -> Document
+        # Filter columns, indexed by store row
+        self._live = np.zeros(0, dtype=bool)
+        self._rate = np.zeros(0, dtype='float64')
+        self._by_availability = {}  # availability -> set(rows)
+        self._by_skill = {}         # lowercased skill -> set(rows)
+        self._state = None          # store.state the index reflects
+
+    def __len__(self):
+        with self._lock:
+            return len(self._documents)
+
+    def load(self):
+        """Build the index from every live row of the store."""
+        with self._lock:
+            self._documents.clear()
+            self._index = None
+            self._live = np.zeros(0, dtype=bool)
+            self._rate = np.zeros(0, dtype='float64')
+            self._by_availability.clear()
+            self._by_skill.clear()
+
+            self._state = self.store.state
+            rows = self.store.live_rows()
+            if not rows:
+                print(f"[WARNING] Vector store is empty: {self.store.path} "
+                      "(run `python -m app.migrate_vectors` to import per-folder vectors)")
+                return self
+
+            vectors = self.store.vectors()[rows]
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.store.dim))
+            self._index.add_with_ids(np.ascontiguousarray(vectors), np.asarray(rows, dtype='int64'))
+            for row in rows:
+                self._documents[row] = self._document(row)
+                self._track(row)
+
+            print(f"[DEBUG] Loaded {len(self._documents)} freelancer vectors into memory")
+        return self
+
+    def _document(self, row):
+        from langchain.docstore.document import Document
+
+        metadata = self.store.metadata(row)
+        return Document(page_content=metadata.get("summary") or "", metadata=metadata)
+
+    def _track(self, row):
+        """Record a row's filterable metadata."""
+        if row >= len(self._live):
+            size = max(row + 1, 2 * len(self._live), 64)
+            live = np.zeros(size, dtype=bool)
+            live[:len(self._live)] = self._live
+            rate = np.full(size, np.nan)
+            rate[:len(self._rate)] = self._rate
+            self._live, self._rate = live, rate
+
+        metadata = self._documents[row].metadata
+        self._live[row] = True
+        try:
+            self._rate[row] = float(metadata.get("hourly_rate"))
+        except (TypeError, ValueError):
+            self._rate[row] = np.nan
+        self._by_availability.setdefault(metadata.get("availability"), set()).add(row)
+        for skill in metadata.get("skills") or []:
+            if isinstance(skill, str):
+                self._by_skill.setdefault(skill.strip().lower(), set()).add(row)
+
+    def _untrack(self, row):
+        """Forget a row's filterable metadata and drop its Document."""
+        document = self._documents.pop(row, None)
+        if row < len(self._live):
+            self._live[row] = False
+        if document is None:
+            return
+        self._by_availability.get(document.metadata.get("availability"), set()).discard(row)
+        for skill in document.metadata.get("skills") or []:
+            if isinstance(skill, str):
+                self._by_skill.get(skill.strip().lower(), set()).discard(row)
+
+    def eligible_mask(self, availability=None, min_rate=None, max_rate=None, skills=None):
+        """
+        Boolean mask over store rows that pass every given filter.
+        skills matches freelancers having at least one of the listed skills.
+        """
+        with self._lock:
+            mask = self._live.copy()
+            if availability is not None:
+                allowed = np.zeros_like(mask)
+                allowed[list(self._by_availability.get(availability, ()))] = True
+                mask &= allowed
+            if min_rate is not None:
+                mask &= self._rate >= min_rate
+            if max_rate is not None:
+                mask &= self._rate <= max_rate
+            if skills:
+                allowed = np.zeros_like(mask)
+                for skill in skills:
+                    allowed[list(self._by_skill.get(skill.strip().lower(), ()))] = True
+                mask &= allowed
+            return mask
+
+    def sync(self):
+        """Apply store changes committed since the index was last synced (by any process)."""
+        with self._lock:
+            state = self.store.state
+            if state == self._state:
+                return
+            if self._state is None or state[:2] != self._state[:2]:
+                self.load()  # compacted or swapped: every row number changed
+                return
+
+            live = set(self.store.live_rows())
+            current = set(self._documents)
+            removed = sorted(current - live)
+            added = sorted(live - current)
+            if removed and self._index is not None:
+                self._index.remove_ids(np.asarray(removed, dtype='int64'))
+            for row in removed:
+                self._untrack(row)
+            if added:
+                vectors = np.ascontiguousarray(self.store.vectors(mmap=True)[added])
+                if self._index is None:
+                    self._index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.store.dim))
+                self._index.add_with_ids(vectors, np.asarray(added, dtype='int64'))
+                for row in added:
+                    self._documents[row] = self._document(row)
+                    self._track(row)
+            self._state = state
+
+    def upsert(self, freelancer_id, vector, metadata):
+        """Persist a freelancer vector and swap it into the live index."""
+        with self._lock:
+            row = self.store.upsert(freelancer_id, np.asarray(vector, dtype='float32').ravel(), metadata)
+            self.sync()
+            return row
+
+    def remove(self, freelancer_id):
+        """Delete a freelancer from the store and index. Returns False if it was not indexed."""
+        with self._lock:
+            if not self.store.delete(freelancer_id):
+                return False
+            self.sync()
+            return True
+
+    def search(self, query, k, **filters):
+        """
+        Return up to k Documents closest to the query text.
+        filters (availability, min_rate, max_rate, skills) are applied inside
+        the ANN scan, so every returned Document is eligible.
+        """
+        # The embedding model is only loaded by the first search, not by load()
+        embedding_function = self.embedding_function or get_embedding_function()
+        query_vec = np.asarray(
+            [embedding_function.embed_query(query)], dtype='float32'
+        )
+        with self._lock:
+            self.sync()
+            if self._index is None or self._index.ntotal == 0:
+                return []
+
+            params = None
+            if any(v is not None for v in filters.values()):
+                mask = self.eligible_mask(**filters)
+                eligible = int(mask.sum())
+                if eligible == 0:
+                    return []
+                k = min(k, eligible)
+                bitmap = np.packbits(mask, bitorder='little')
+                params = faiss.SearchParameters(
+                    sel=faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+                )
+
+            _, rows = self._index.search(query_vec, min(k, self._index.ntotal), params=params)
+            return [self._documents[row] for row in rows[0] if row != -1]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def init_index_manager(embedding_function=None, store_path=None):
+    """
+    Create and load the process-wide index manager (idempotent).
+    Without an embedding_function the shared lazily loaded model is used.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            store = open_vector_store(store_path) if store_path else open_vector_store()
+            _manager = FreelancerIndexManager(store, embedding_function).load()
+    return _manager
+
+
+def get_index_manager():
+    """Return the process-wide index manager, or None if it was never started."""
+    return _manager
@@ -1,11 +1,21 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Body, Header, Response
 from fastapi.responses import JSONResponse
-from .resume_handler import handle_resume_upload
-from .db import save_parsed_json, get_parsed_resume
+from .resume_handler import handle_resume_text
+from .text_extraction import SUPPORTED_TYPES, extract_text_parallel, file_type
+from .db import save_parsed_json, get_parsed_resume, pool_stats
 from .Embedding import process_freelancer
 from .Recommender import recommend_freelancers
+from .index_manager import get_index_manager
+from .embedding_cache import cache_stats
+from .profile_cache import get_profile_cache
+from .parse_cache import bypass_requested, get_parse_cache
+from . import models
 from dotenv import load_dotenv
+from .executors import executor_stats, run_io, shutdown_executors
+from managix_common.groq_client import usage_scope, usage_totals
+from .prompt_budget import budget_stats
 import os
+import threading
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
@@ -13,11 +23,6 @@ api_key = os.getenv("GROQ_API_KEY")
 if not api_key:
     raise ValueError("GROQ_API_KEY not found in .env!")
 
-vector_folder = os.getenv("VECTOR_FOLDER_PATH")
-if not vector_folder:
-    raise ValueError("VECTOR_FOLDER_PATH not found in .env!")
-
-
 
 app = FastAPI()
 
@@ -29,22 +34,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def warmup_models_in_background():
+    # Models and the freelancer index load lazily on first use. With
+    # WARMUP_ON_STARTUP=1 they load in the background instead, without
+    # delaying the worker from accepting (DB-only) requests.
+    if os.getenv("WARMUP_ON_STARTUP", "0") == "1":
+        threading.Thread(target=models.warmup, name="model-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_executors():
+    shutdown_executors()
+
+@app.get("/api/ready")
+async def ready(warmup: bool = False):
+    if warmup and not models.is_ready():
+        await run_io(models.warmup)
+    return {
+        "ready": models.is_ready(),
+        "index_loaded": get_index_manager() is not None,
+    }
+
+@app.get("/api/metrics")
+async def metrics():
+    parse_cache = await run_io(get_parse_cache)
+    return {
+        "embedding_cache": cache_stats(),
+        "db_pool": pool_stats(),
+        "profile_cache": get_profile_cache().stats(),
+        "executors": executor_stats(),
+        "parse_cache": await run_io(parse_cache.stats) if parse_cache else None,
+        "groq_usage": usage_totals(),
+        "prompt_budget": budget_stats(),
+    }
+
 @app.get("/api/get-parsed-json/{freelancer_id}")
 async def get_parsed_json_endpoint(freelancer_id: int):
     try:
-        parsed_json = get_parsed_resume(freelancer_id)
+        parsed_json = await run_io(get_parsed_resume, freelancer_id)
         if parsed_json is None:
             raise HTTPException(status_code=404, detail="No parsed JSON found for this freelancer")
         return parsed_json
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/parse-resume/")
-async def parse_resume(file: UploadFile = File(...), freelancer_id: int = Form(...)):
+async def parse_resume(
+    response: Response,
+    file: UploadFile = File(...),
+    freelancer_id: int = Form(...),
+    x_parse_cache: str = Header(None),
+    cache_control: str = Header(None),
+):
     try:
         api_key = os.getenv('GROQ_API_KEY')
-        print(api_key)
-        parsed_data, error = handle_resume_upload(file, api_key, freelancer_id)
+        file_bytes = await file.read()
+        # Extraction is CPU-bound (process pool, page-parallel); Groq calls
+        # and DB writes block (thread pool). Neither runs on the event loop.
+        resume_text = ''
+        if file_type(file.filename) in SUPPORTED_TYPES:
+            resume_text = await extract_text_parallel(file.filename, file_bytes)
+        # The usage scope follows the call into the I/O thread (io_pool copies the context)
+        with usage_scope() as usage:
+            parsed_data, error = await run_io(
+                handle_resume_text, file.filename, file_bytes, resume_text, api_key, freelancer_id,
+                not bypass_requested(x_parse_cache, cache_control)
+            )
+        response.headers["X-Groq-Prompt-Tokens"] = str(usage["prompt_tokens"])
+        response.headers["X-Groq-Completion-Tokens"] = str(usage["completion_tokens"])
+        response.headers["X-Groq-Max-Tokens"] = str(usage["max_tokens"])
         if error:
                 print("error:", error)
                 raise HTTPException(status_code=400, detail=error)
@@ -64,8 +124,8 @@ async def update_parsed_json(
     parsed_json: dict = Body(...)
 ):
     try:
-        save_parsed_json(freelancer_id, parsed_json)
-        process_freelancer({
+        await run_io(save_parsed_json, freelancer_id, parsed_json)
+        await run_io(process_freelancer, {
         "freelancer_id": str(freelancer_id),
         "parsed_resume": parsed_json,
         "hourly_rate": parsed_json.get("hourly_rate", 0),
@@ -73,16 +133,28 @@ async def update_parsed_json(
         "availability": parsed_json.get("availability", "Unknown")
     }, api_key)
         return {"success": True}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/suggest-freelancers/")
 async def suggest_freelancers(
     project_summary: str = Body(..., embed=True),
+    top_n: int = Body(10, embed=True),
+    min_rate: float = Body(None, embed=True),
+    max_rate: float = Body(None, embed=True),
+    skills: list = Body(None, embed=True),
 ):
     try:
-        collection_list = os.listdir(vector_folder)
-        results = recommend_freelancers(project_summary, collection_list)
+        results = await run_io(
+            recommend_freelancers,
+            project_summary,
+            top_n=top_n,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            skills=skills,
+        )
         filtered_results = [
             {
                 "summary": r.get("summary"),
@@ -92,8 +164,9 @@ async def suggest_freelancers(
             }
             for r in results
         ]
-        print(results)
         return {"suggestions": filtered_results}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -0,0 +1,77 @@
+"""
+Convert the legacy per-freelancer FAISS folders into the consolidated
+vector store (see app.vector_store).
+
+Usage:
+    python -m app.migrate_vectors --source embedding_vectors_fl --dest freelancer_store
+"""
+import argparse
+import os
+
+from langchain_community.vectorstores import FAISS
+
+from app.vector_store import DEFAULT_STORE_PATH, FreelancerVectorStore
+
+LEGACY_FOLDER = os.getenv("VECTOR_FOLDER_PATH", "embedding_vectors_fl")
+BATCH_SIZE = 500
+
+
+def read_legacy_folder(path):
+    """Return (vector, metadata) for one legacy folder, or None if it holds no vector."""
+    # Vectors are already stored, so no embedding model is needed to load
+    store = FAISS.load_local(path, None, allow_dangerous_deserialization=True)
+    if store.index.ntotal == 0:
+        return None
+    vector = store.index.reconstruct(0)
+    document = store.docstore.search(store.index_to_docstore_id[0])
+    metadata = dict(document.metadata)
+    metadata.setdefault("summary", document.page_content)
+    return vector, metadata
+
+
+def migrate(source, dest, model_name="all-MiniLM-L6-v2"):
+    store = FreelancerVectorStore(dest, model_name=model_name)
+    batch = []
+    migrated, skipped = 0, 0
+
+    for freelancer_id in sorted(os.listdir(source)):
+        path = os.path.join(source, freelancer_id)
+        if not os.path.isdir(path):
+            continue
+        try:
+            item = read_legacy_folder(path)
+        except Exception as e:
+            print(f"[WARNING] Skipping {path}: {e}")
+            skipped += 1
+            continue
+        if item is None:
+            skipped += 1
+            continue
+
+        vector, metadata = item
+        # The folder name is the freelancer id process_freelancer saved under
+        metadata["freelancer_id"] = freelancer_id
+        batch.append((freelancer_id, vector, metadata))
+        if len(batch) >= BATCH_SIZE:
+            store.upsert_many(batch)
+            migrated += len(batch)
+            batch = []
+
+    if batch:
+        store.upsert_many(batch)
+        migrated += len(batch)
+
+    print(f"✅ Migrated {migrated} freelancer vectors into {dest} ({skipped} skipped)")
+    return migrated, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate per-freelancer FAISS folders to the consolidated store")
+    parser.add_argument("--source", default=LEGACY_FOLDER, help="Folder containing one FAISS folder per freelancer")
+    parser.add_argument("--dest", default=DEFAULT_STORE_PATH, help="Consolidated vector store directory")
+    args = parser.parse_args()
+    migrate(args.source, args.dest)
+
+
+if __name__ == "__main__":
+    main()
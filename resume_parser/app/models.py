@@ -0,0 +1,52 @@
+"""
+Lazily initialised models shared by the recommender pipeline.
+
+Nothing heavy is imported or loaded at module import time: the embedding
+model is built on first use (thread-safe, exactly once per process), and
+warmup() can be called ahead of traffic to load the embedding model, the
+FlashRank reranker and the freelancer index.
+"""
+import threading
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+_embedding_function = None
+_embedding_lock = threading.Lock()
+_warm = False
+
+
+def get_embedding_function():
+    """Return the shared (cached) HuggingFace embedding function, loading it on first use."""
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_lock:
+            if _embedding_function is None:
+                try:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                except ImportError:
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+                from app.embedding_cache import CachedEmbeddings, get_embedding_cache
+
+                print(f"[DEBUG] Loading embedding model: {EMBEDDING_MODEL}")
+                _embedding_function = CachedEmbeddings(
+                    HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
+                    get_embedding_cache(EMBEDDING_MODEL)
+                )
+    return _embedding_function
+
+
+def warmup():
+    """Load every recommender model and the in-memory index, then run one tiny inference each."""
+    global _warm
+    from app import reranker
+    from app.index_manager import init_index_manager
+
+    get_embedding_function().embeddings.embed_query("warmup")
+    reranker.warmup()
+    init_index_manager()
+    _warm = True
+
+
+def is_ready():
+    """True once warmup() has completed in this process."""
+    return _warm
@@ -0,0 +1,128 @@
+"""
+Disk-backed cache of LLM resume parses.
+
+A parse is keyed by sha256(prompt version + model + extracted resume text),
+so re-uploading the same resume returns the stored JSON without a Groq
+call, while a prompt or model change naturally misses. Entries live in a
+SQLite file, expire after PARSE_CACHE_TTL seconds and are evicted least
+recently used first once the stored JSON exceeds PARSE_CACHE_MAX_BYTES.
+
+Clients can skip the lookup (and refresh the entry) by sending
+`X-Parse-Cache: bypass` or `Cache-Control: no-cache`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", ".parse_cache.sqlite3")
+PARSE_CACHE_TTL = float(os.getenv("PARSE_CACHE_TTL", str(7 * 24 * 3600)))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") != "0"
+
+
+def bypass_requested(x_parse_cache=None, cache_control=None):
+    """True if the request headers ask to skip the parse cache."""
+    return (x_parse_cache or "").strip().lower() == "bypass" or "no-cache" in (cache_control or "").lower()
+
+
+class ParseCache:
+    def __init__(self, path=PARSE_CACHE_PATH, ttl=PARSE_CACHE_TTL, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parses_used_at ON parses (used_at)")
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @staticmethod
+    def key(resume_text, prompt_version, model):
+        payload = f"{prompt_version}\0{model}\0{resume_text.strip()}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key):
+        """The cached parse for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM parses WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE parses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, parsed_json):
+        value = json.dumps(parsed_json)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parses (key, value, size, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(now)
+
+    def note_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM parses WHERE created_at <= ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until back under the byte budget
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM parses ORDER BY used_at"):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM parses WHERE key = ?", victims)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parses").fetchone()
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """The process-wide ParseCache, or None when PARSE_CACHE_ENABLED=0."""
+    global _cache
+    if not PARSE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache()
+    return _cache
@@ -0,0 +1,233 @@
+"""
+Versioned read-through / write-through cache for freelancer profiles.
+
+Two namespaces are cached per freelancer: "parsed" (the parsed_json blob
+returned by db.get_parsed_resume) and "profile" (fetch_profile's full
+profile with child rows). Values are stored as JSON strings, so callers
+always get a fresh copy they may mutate.
+
+Every freelancer has a version counter. Writers bump it (invalidate) and
+may then store the new value (write-through); a reader stores what it
+fetched only if the version did not move while it was reading, so a slow
+read can never re-cache data older than a concurrent write. Entries also
+expire after PROFILE_CACHE_TTL seconds, which bounds staleness from
+writers outside this service. A read that took longer than the TTL is
+not cached at all, which lets the memory backend drop version counters
+that have not moved for a TTL without a reset counter matching an old read.
+
+Backends:
+    memory  in-process LRU (default)
+    redis   shared between workers (PROFILE_CACHE_URL, needs the redis package)
+    off     no caching
+Any object with get_many / set / delete / incr can be plugged in with
+configure_profile_cache(), e.g. a local fake in tests.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PROFILE_CACHE_BACKEND = os.getenv("PROFILE_CACHE_BACKEND", "memory")
+PROFILE_CACHE_URL = os.getenv("PROFILE_CACHE_URL", "redis://localhost:6379/0")
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "2048"))
+
+NAMESPACES = ("parsed", "profile")
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_items=PROFILE_CACHE_SIZE, counter_ttl=PROFILE_CACHE_TTL):
+        self.max_items = max_items
+        self.counter_ttl = counter_ttl
+        self._data = OrderedDict()      # key -> (expires_at, value)
+        self._counters = OrderedDict()  # key -> (bumped_at, version), oldest bump first
+        self._sequence = 0              # versions are unique across keys, so a dropped counter never repeats one
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                if key in self._counters:
+                    values.append(str(self._counters[key][1]))
+                    continue
+                entry = self._data.get(key)
+                if entry is None or entry[0] <= now:
+                    self._data.pop(key, None)
+                    values.append(None)
+                else:
+                    self._data.move_to_end(key)
+                    values.append(entry[1])
+        return values
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key):
+        now = time.monotonic()
+        with self._lock:
+            # A dropped counter reads as 0, which no sequence number matches: entries cached
+            # under it turn stale, and reads at 0 from before the bump are too old to set()
+            while self._counters and next(iter(self._counters.values()))[0] <= now - self.counter_ttl:
+                self._counters.popitem(last=False)
+            self._sequence += 1
+            self._counters[key] = (now, self._sequence)
+            self._counters.move_to_end(key)
+            return self._sequence
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared cache in Redis, so every worker sees the same versions."""
+
+    def __init__(self, url=PROFILE_CACHE_URL, prefix="managix:profile:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    def get_many(self, keys):
+        return self._redis.mget([self._prefix + k for k in keys])
+
+    def set(self, key, value, ttl):
+        self._redis.set(self._prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*[self._prefix + k for k in keys])
+
+    def incr(self, key):
+        return self._redis.incr(self._prefix + key)
+
+
+class ProfileCache:
+    def __init__(self, backend, ttl=PROFILE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts = {ns: {"hits": 0, "misses": 0, "stale": 0, "sets": 0} for ns in NAMESPACES}
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(namespace, freelancer_id):
+        return f"{namespace}:{freelancer_id}"
+
+    @staticmethod
+    def _version_key(freelancer_id):
+        return f"version:{freelancer_id}"
+
+    def _count(self, namespace, name, n=1):
+        with self._lock:
+            self._counts[namespace][name] += n
+
+    def get_many(self, namespace, freelancer_ids):
+        """Return ({id: value} for cached ids, {id: version} to pass to set() for the misses)."""
+        read_at = time.monotonic()
+        if self.backend is None or not freelancer_ids:
+            return {}, {i: (0, read_at) for i in freelancer_ids}
+        keys = []
+        for freelancer_id in freelancer_ids:
+            keys += [self._key(namespace, freelancer_id), self._version_key(freelancer_id)]
+        raw = self.backend.get_many(keys)
+
+        hits, versions = {}, {}
+        for n, freelancer_id in enumerate(freelancer_ids):
+            entry, version = raw[2 * n], int(raw[2 * n + 1] or 0)
+            if entry is not None:
+                entry = json.loads(entry)
+                if entry["v"] == version:
+                    hits[freelancer_id] = entry["d"]
+                    continue
+                self._count(namespace, "stale")
+            versions[freelancer_id] = (version, read_at)
+        self._count(namespace, "hits", len(hits))
+        self._count(namespace, "misses", len(versions))
+        return hits, versions
+
+    def get(self, namespace, freelancer_id):
+        """Return (hit, value, version); on a miss pass version to set() after reading the DB."""
+        hits, versions = self.get_many(namespace, [freelancer_id])
+        if freelancer_id in hits:
+            return True, hits[freelancer_id], None
+        return False, None, versions[freelancer_id]
+
+    def set(self, namespace, freelancer_id, value, version):
+        """Cache a value read at version, unless the freelancer was written since."""
+        if self.backend is None:
+            return
+        version, read_at = version
+        if time.monotonic() - read_at >= self.ttl:
+            return  # its version counter may have been dropped and restarted meanwhile
+        current = int(self.backend.get_many([self._version_key(freelancer_id)])[0] or 0)
+        if current != version:
+            return
+        self.backend.set(self._key(namespace, freelancer_id), json.dumps({"v": version, "d": value}), self.ttl)
+        self._count(namespace, "sets")
+
+    def invalidate(self, freelancer_id, parsed_json=None):
+        """
+        Drop everything cached for a freelancer after a write. With
+        parsed_json the new parsed resume is written through.
+        """
+        if self.backend is None:
+            return
+        version = self.backend.incr(self._version_key(freelancer_id))
+        self.backend.delete(*[self._key(ns, freelancer_id) for ns in NAMESPACES])
+        with self._lock:
+            self.invalidations += 1
+        if parsed_json is not None:
+            self.set("parsed", freelancer_id, parsed_json, (int(version), time.monotonic()))
+
+    def stats(self):
+        with self._lock:
+            stats = {"backend": type(self.backend).__name__ if self.backend else "off",
+                     "invalidations": self.invalidations}
+            for ns, counts in self._counts.items():
+                total = counts["hits"] + counts["misses"]
+                stats[ns] = dict(counts, hit_rate=round(counts["hits"] / total, 4) if total else 0.0)
+            return stats
+
+
+def _backend_from_env():
+    if PROFILE_CACHE_BACKEND == "off":
+        return None
+    if PROFILE_CACHE_BACKEND == "redis":
+        return RedisBackend()
+    return MemoryBackend()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """Return the process-wide ProfileCache (backend chosen by PROFILE_CACHE_BACKEND)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProfileCache(_backend_from_env())
+    return _cache
+
+
+def configure_profile_cache(backend, ttl=PROFILE_CACHE_TTL):
+    """Replace the process-wide cache, e.g. with a local fake backend."""
+    global _cache
+    with _cache_lock:
+        _cache = ProfileCache(backend, ttl)
+    return _cache
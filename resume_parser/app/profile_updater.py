@@ -1,4 +1,5 @@
-from app.db import get_connection
+from app.profile_cache import get_profile_cache
+from app.db import get_connection, bulk_insert_skills, bulk_insert_projects, bulk_insert_experience
 
 def create_freelancer():
     conn = get_connection()
@@ -34,6 +35,7 @@ def update_freelancer_contact(freelancer_id, name, email, phone):
     conn.commit()
     cursor.close()
     conn.close()
+    get_profile_cache().invalidate(freelancer_id)
 
 def update_freelancer_summary(freelancer_id, summary):
     conn = get_connection()
@@ -45,6 +47,7 @@ def update_freelancer_summary(freelancer_id, summary):
     conn.commit()
     cursor.close()
     conn.close()
+    get_profile_cache().invalidate(freelancer_id)
 
 def save_or_update_resume(freelancer_id, filename, filedata):
     conn = get_connection()
@@ -65,36 +68,52 @@ def save_or_update_resume(freelancer_id, filename, filedata):
 def insert_skills(freelancer_id, skills, source='parsed'):
     conn = get_connection()
     cursor = conn.cursor()
-    for skill in skills:
-        cursor.execute("""
-            INSERT INTO skills (freelancer_id, skill_name, source)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE source = VALUES(source)
-        """, (freelancer_id, skill, source))
+    counts = bulk_insert_skills(cursor, freelancer_id, skills, source)
     conn.commit()
     cursor.close()
     conn.close()
+    get_profile_cache().invalidate(freelancer_id)
+    return counts
 
 def insert_projects(freelancer_id, projects, source='parsed'):
     conn = get_connection()
     cursor = conn.cursor()
-    for p in projects:
-        cursor.execute("""
-            INSERT INTO projects (freelancer_id, title, description, source)
-            VALUES (%s, %s, %s, %s)
-        """, (freelancer_id, p['title'], p['description'], source))
+    counts = bulk_insert_projects(cursor, freelancer_id, projects, source)
     conn.commit()
     cursor.close()
     conn.close()
+    get_profile_cache().invalidate(freelancer_id)
+    return counts
 
 def insert_experience(freelancer_id, experience, source='parsed'):
     conn = get_connection()
     cursor = conn.cursor()
-    for exp in experience:
-        cursor.execute("""
-            INSERT INTO experience (freelancer_id, title, company, startDate, endDate, description, source)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (freelancer_id, exp['title'], exp['company'], exp['startDate'], exp['endDate'], exp['description'], source))
+    counts = bulk_insert_experience(cursor, freelancer_id, experience, source)
     conn.commit()
     cursor.close()
     conn.close()
+    get_profile_cache().invalidate(freelancer_id)
+    return counts
+
+def insert_resume_children(freelancer_id, skills, projects, experience, source='parsed'):
+    """
+    Write all child rows of a resume on one connection in one transaction:
+    one multi-row INSERT per table. Returns inserted/skipped counts per table.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        counts = {
+            "skills": bulk_insert_skills(cursor, freelancer_id, skills, source),
+            "projects": bulk_insert_projects(cursor, freelancer_id, projects, source),
+            "experience": bulk_insert_experience(cursor, freelancer_id, experience, source),
+        }
+        conn.commit()
+        get_profile_cache().invalidate(freelancer_id)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return counts
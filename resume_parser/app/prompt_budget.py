@@ -0,0 +1,161 @@
+"""
+Prompt budget for resume parsing.
+
+compact_resume_text() shrinks extracted text before it goes into the parse
+prompt: whitespace runs are collapsed, page-number lines dropped, header/
+footer lines repeated across pages (app.text_extraction separates PDF
+pages with '\\f') kept once, and consecutive duplicate lines removed.
+
+estimate_max_tokens() sizes the completion from the compacted input. The
+JSON answer restates experience, project and education text almost
+verbatim, lists skills compactly and drops most of everything else, so
+each detected section is weighted by how much of it reaches the output.
+Groq reserves max_tokens against the tokens-per-minute limit, so asking
+4096 for a one-page resume throttles throughput for nothing; an
+underestimate is recovered by a continuation (managix_common.structured_output).
+
+Configuration (env):
+    PARSE_MAX_TOKENS        upper bound for max_tokens (default 4096)
+    PARSE_MIN_TOKENS        lower bound for max_tokens (default 512)
+    PROMPT_BUDGET_ENABLED   0 = raw text (page breaks removed) and PARSE_MAX_TOKENS,
+                            as before (default 1)
+"""
+import os
+import re
+import threading
+from collections import Counter
+
+PARSE_MAX_TOKENS = int(os.getenv("PARSE_MAX_TOKENS", "4096"))
+PARSE_MIN_TOKENS = int(os.getenv("PARSE_MIN_TOKENS", "512"))
+PROMPT_BUDGET_ENABLED = os.getenv("PROMPT_BUDGET_ENABLED", "1") != "0"
+
+CHARS_PER_TOKEN = 4        # English prose with the Llama 3 tokenizer
+JSON_OVERHEAD = 1.15       # quotes, keys and escapes around the restated text
+SKELETON_TOKENS = 120      # the fixed keys of the ParsedResumeData object
+EDGE_LINES = 3             # lines at the top/bottom of a page checked for headers/footers
+
+# Share of a section's text that reappears in the JSON answer
+SECTION_WEIGHTS = {
+    "header": 0.5,         # name, contact details
+    "summary": 1.0,
+    "experience": 1.0,
+    "projects": 1.0,
+    "education": 0.8,
+    "skills": 0.7,
+    "other": 0.2,          # certifications, languages, hobbies, references
+}
+_HEADINGS = [
+    ("experience", re.compile(r"experience|employment|work history|career", re.I)),
+    ("projects", re.compile(r"project", re.I)),
+    ("education", re.compile(r"education|academic|qualification", re.I)),
+    ("skills", re.compile(r"skill|technolog|competenc|tools", re.I)),
+    ("summary", re.compile(r"summary|profile|objective|about me", re.I)),
+    ("other", re.compile(r"certific|award|language|interest|hobb|reference|publication|volunteer|achievement", re.I)),
+]
+_MAX_HEADING_CHARS = 40
+
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$|^-\s*\d{1,3}\s*-$", re.I)
+
+_stats = {"prompts": 0, "chars_in": 0, "chars_out": 0, "max_tokens": 0}
+_stats_lock = threading.Lock()
+
+
+def _signature(line):
+    # "Page 2 of 3 - Jane Doe" and "Page 3 of 3 - Jane Doe" are the same footer
+    return _DIGITS.sub("#", line.lower())
+
+
+def _section_of(line):
+    if len(line) > _MAX_HEADING_CHARS:
+        return None
+    for section, pattern in _HEADINGS:
+        if pattern.search(line):
+            return section
+    return None
+
+
+def compact_resume_text(text):
+    """Normalized, deduplicated resume text (pages joined by newlines)."""
+    pages = []
+    for page in text.split("\f"):
+        lines = (_SPACES.sub(" ", line).strip() for line in page.splitlines())
+        pages.append([line for line in lines if line and not _PAGE_NUMBER.match(line)])
+
+    # Header/footer candidates: lines at the same page edge on at least half the pages
+    top, bottom = set(), set()
+    if len(pages) >= 2:
+        top_counts, bottom_counts = Counter(), Counter()
+        for page in pages:
+            top_counts.update({_signature(line) for line in page[:EDGE_LINES] if _section_of(line) is None})
+            bottom_counts.update({_signature(line) for line in page[-EDGE_LINES:] if _section_of(line) is None})
+        threshold = max(2, (len(pages) + 1) // 2)
+        top = {sig for sig, n in top_counts.items() if n >= threshold}
+        bottom = {sig for sig, n in bottom_counts.items() if n >= threshold}
+
+    kept = []
+    seen_boilerplate = set()
+    previous = None
+    for page in pages:
+        body_end = len(page) - EDGE_LINES
+        for i, line in enumerate(page):
+            sig = _signature(line)
+            # Only edge positions count; the same line in the body is content
+            if (i < EDGE_LINES and sig in top) or (i >= body_end and sig in bottom):
+                if sig in seen_boilerplate:
+                    continue
+                seen_boilerplate.add(sig)
+            if line == previous:
+                continue
+            kept.append(line)
+            previous = line
+    return "\n".join(kept)
+
+
+def section_sizes(text):
+    """Characters per detected resume section ({section: chars})."""
+    sizes = Counter()
+    section = "header"
+    for line in text.splitlines():
+        heading = _section_of(line)
+        if heading is not None:
+            section = heading
+            continue
+        sizes[section] += len(line) + 1
+    return dict(sizes)
+
+
+def estimate_max_tokens(text):
+    """max_tokens for parsing text into ParsedResumeData, within PARSE_MIN_TOKENS..PARSE_MAX_TOKENS."""
+    weighted_chars = sum(SECTION_WEIGHTS[section] * chars for section, chars in section_sizes(text).items())
+    estimate = SKELETON_TOKENS + JSON_OVERHEAD * weighted_chars / CHARS_PER_TOKEN
+    return int(min(PARSE_MAX_TOKENS, max(PARSE_MIN_TOKENS, estimate)))
+
+
+def budget_resume_prompt(resume_text, extra_tokens=0):
+    """
+    (text to embed in the parse prompt, max_tokens for the answer);
+    extra_tokens covers output beyond the parsed fields (app.resume_summary).
+    """
+    if not PROMPT_BUDGET_ENABLED:
+        # The page separators are only markers for compact_resume_text, not prompt text
+        return resume_text.replace("\f", ""), PARSE_MAX_TOKENS
+    compact = compact_resume_text(resume_text)
+    max_tokens = estimate_max_tokens(compact) + extra_tokens
+    with _stats_lock:
+        _stats["prompts"] += 1
+        _stats["chars_in"] += len(resume_text)
+        _stats["chars_out"] += len(compact)
+        _stats["max_tokens"] += max_tokens
+    print(f"[DEBUG] Prompt budget: {len(resume_text)} -> {len(compact)} chars, max_tokens={max_tokens}")
+    return compact, max_tokens
+
+
+def budget_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["enabled"] = PROMPT_BUDGET_ENABLED
+    stats["chars_saved_ratio"] = round(1 - stats["chars_out"] / stats["chars_in"], 4) if stats["chars_in"] else 0.0
+    stats["avg_max_tokens"] = round(stats["max_tokens"] / stats["prompts"]) if stats["prompts"] else 0
+    return stats
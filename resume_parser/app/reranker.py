@@ -0,0 +1,178 @@
+"""
+Process-wide FlashRank cross-encoder.
+
+The ONNX model and tokenizer are loaded once per process and reused by
+every request. Passages are scored in bounded batches, and an optional
+RerankBatcher coalesces concurrent queries into a single inference call.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_RERANK_MODEL = "ms-marco-MiniLM-L-12-v2"
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+RERANK_BATCH_WINDOW_MS = float(os.getenv("RERANK_BATCH_WINDOW_MS", "5"))
+
+_rankers = {}
+_rankers_lock = threading.Lock()
+
+
+def get_ranker(model_name=DEFAULT_RERANK_MODEL):
+    """Return the shared Ranker for model_name, loading it on first use."""
+    ranker = _rankers.get(model_name)
+    if ranker is None:
+        with _rankers_lock:
+            ranker = _rankers.get(model_name)
+            if ranker is None:
+                # Imported here so importing this module does not pull in onnxruntime
+                from flashrank import Ranker
+
+                print(f"[DEBUG] Loading FlashRank model: {model_name}")
+                ranker = Ranker(model_name=model_name)
+                _rankers[model_name] = ranker
+    return ranker
+
+
+def warmup(model_name=DEFAULT_RERANK_MODEL):
+    """Load the model and run one tiny inference so the first request is not slow."""
+    score_pairs([("warmup", "warmup")], model_name)
+
+
+def _run_session(ranker, pairs):
+    """Score (query, passage) pairs in one ONNX call (mirrors Ranker.rerank)."""
+    encoded = ranker.tokenizer.encode_batch([list(p) for p in pairs])
+    input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+    attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+    token_type_ids = np.array([e.type_ids for e in encoded], dtype=np.int64)
+
+    onnx_input = {"input_ids": input_ids, "attention_mask": attention_mask}
+    if not np.all(token_type_ids == 0):
+        onnx_input["token_type_ids"] = token_type_ids
+
+    logits = ranker.session.run(None, onnx_input)[0]
+    if logits.shape[1] == 1:
+        return (1 / (1 + np.exp(-logits.flatten()))).tolist()
+    exp_logits = np.exp(logits)
+    return (exp_logits[:, 1] / np.sum(exp_logits, axis=1)).tolist()
+
+
+def _rerank_fallback(ranker, pairs):
+    """Score pairs through the public Ranker API, one request per query."""
+    from flashrank import RerankRequest
+
+    scores = [None] * len(pairs)
+    by_query = {}
+    for i, (query, text) in enumerate(pairs):
+        by_query.setdefault(query, []).append({"id": i, "text": text})
+    for query, passages in by_query.items():
+        for result in ranker.rerank(RerankRequest(query=query, passages=passages)):
+            scores[result["id"]] = float(result["score"])
+    return scores
+
+
+def score_pairs(pairs, model_name=DEFAULT_RERANK_MODEL, batch_size=None):
+    """
+    Score (query, passage) pairs with the shared cross-encoder.
+    Returns scores in input order; at most batch_size pairs per inference.
+    """
+    if not pairs:
+        return []
+    ranker = get_ranker(model_name)
+    batch_size = batch_size or RERANK_BATCH_SIZE
+    direct = hasattr(ranker, "session") and hasattr(ranker, "tokenizer")
+
+    scores = []
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        scores.extend(_run_session(ranker, batch) if direct else _rerank_fallback(ranker, batch))
+    return scores
+
+
+class RerankBatcher:
+    """
+    Coalesces concurrent rerank calls into shared inference batches.
+
+    Callers block in rerank(); a worker thread waits up to window_ms for
+    more requests, scores every pending pair together and hands each
+    caller back its own slice of scores.
+    """
+
+    def __init__(self, model_name=DEFAULT_RERANK_MODEL, window_ms=RERANK_BATCH_WINDOW_MS,
+                 max_pairs=None):
+        self.model_name = model_name
+        self.window = window_ms / 1000.0
+        self.max_pairs = max_pairs or RERANK_BATCH_SIZE * 4
+        self._pending = []
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+        self._worker.start()
+
+    def rerank(self, query, texts):
+        if not texts:
+            return []
+        job = {"pairs": [(query, t) for t in texts], "done": threading.Event(),
+               "scores": None, "error": None}
+        with self._cond:
+            self._pending.append(job)
+            self._cond.notify()
+        job["done"].wait()
+        if job["error"] is not None:
+            raise job["error"]
+        return job["scores"]
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while sum(len(j["pairs"]) for j in self._pending) < self.max_pairs:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, []
+            return batch
+
+    def _run(self):
+        while True:
+            jobs = self._take_batch()
+            pairs = [p for job in jobs for p in job["pairs"]]
+            try:
+                scores = score_pairs(pairs, self.model_name)
+            except Exception as e:
+                for job in jobs:
+                    job["error"] = e
+                    job["done"].set()
+                continue
+            offset = 0
+            for job in jobs:
+                n = len(job["pairs"])
+                job["scores"] = scores[offset:offset + n]
+                offset += n
+                job["done"].set()
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher(model_name=DEFAULT_RERANK_MODEL):
+    """Return the process-wide RerankBatcher (started on first use)."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = RerankBatcher(model_name)
+    return _batcher
+
+
+def rerank(query, texts, model_name=DEFAULT_RERANK_MODEL):
+    """
+    Score every text against query, in input order.
+    Set RERANK_BATCHING=1 to coalesce concurrent queries into shared batches.
+    """
+    if os.getenv("RERANK_BATCHING", "0") == "1":
+        return get_batcher(model_name).rerank(query, texts)
+    return score_pairs([(query, t) for t in texts], model_name)
@@ -1,66 +1,51 @@
 import os
-import pdfplumber
-import tempfile
-import requests
 import json
-from docx import Document as DocxDocument
 from dotenv import load_dotenv
 
-from app.db import (
-    update_resume,
-    save_resume_file,
-    is_email_duplicate,
-    update_summary,
-    ensure_freelancer_exists
-)
+from app.db import apply_resume_upload, is_email_duplicate
 from app.utils import extract_json_from_groq_response
-from app.profile_updater import update_freelancer_contact, update_freelancer_summary
+from managix_common.groq_client import DEFAULT_MODEL, chat_completion_sync, finish_reason, message_content
+from app.parse_cache import get_parse_cache
+from app.prompt_budget import budget_resume_prompt
+from app.resume_summary import SUMMARY_TOKENS, parse_prompt_version, summary_instructions
+from app.text_extraction import SUPPORTED_TYPES, extract_text, file_type
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Bump when the parse prompt changes so cached parses are not reused
+PARSE_PROMPT_VERSION = parse_prompt_version("resume-handler-parse-v2")
 
 
 # ---------------- Helper Functions ----------------
 
 def extract_text_from_resume(file_name, file_bytes):
-    resume_text = ''
-    file_type = file_name.split('.')[-1].lower()
-
-    if file_type == 'pdf':
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
-        try:
-            with pdfplumber.open(tmp_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        resume_text += text + '\n'
-        finally:
-            os.unlink(tmp_path)
-
-    elif file_type == 'docx':
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
-        try:
-            doc = DocxDocument(tmp_path)
-            for para in doc.paragraphs:
-                resume_text += para.text + '\n'
-        finally:
-            os.unlink(tmp_path)
-
-    return resume_text.strip()
-
-
-def call_groq_llm(resume_text, api_key):
+    """Text of a PDF/DOCX upload, read in memory; '' for other file types."""
+    if file_type(file_name) not in SUPPORTED_TYPES:
+        return ''
+    return extract_text(file_name, file_bytes)
+
+
+def call_groq_llm(resume_text, api_key, use_cache=True):
     """
     Send text to Groq LLM for JSON parsing. Returns dict and raw response.
-    Handles empty or invalid responses gracefully.
+    Handles empty or invalid responses gracefully. Parses are cached by
+    resume text, prompt version and model; use_cache=False skips the
+    lookup and refreshes the entry.
     """
     if not resume_text.strip():
         return None, "Resume text is empty"
 
+    resume_text, max_tokens = budget_resume_prompt(resume_text, SUMMARY_TOKENS)
+    cache = get_parse_cache()
+    cache_key = cache.key(resume_text, PARSE_PROMPT_VERSION, DEFAULT_MODEL) if cache else None
+    if cache is not None:
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached, json.dumps(cached)
+        else:
+            cache.note_bypass()
+
     prompt = f"""
 You are an expert resume parser. Convert the resume text below to a standardized JSON
 with the following structure (only include fields you can confidently extract):
@@ -93,28 +78,25 @@ with the following structure (only include fields you can confidently extract):
     }}
   ]
 }}
-
+{summary_instructions("marketing_summary", "freelancer")}
 Resume Text:
 {resume_text}
 """
 
-    headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
-    data = {
-        'messages': [
-            {'role': 'system', 'content': 'You are a helpful assistant.'},
-            {'role': 'user', 'content': prompt}
-        ],
-        'model': 'llama-3.1-8b-instant',
-        'max_tokens': 2048
-    }
+    messages = [
+        {'role': 'system', 'content': 'You are a helpful assistant.'},
+        {'role': 'user', 'content': prompt}
+    ]
 
     try:
-        response = requests.post('https://api.groq.com/openai/v1/chat/completions', headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        content = response.json()['choices'][0]['message']['content']
+        response_data = chat_completion_sync(messages, max_tokens=max_tokens, api_key=api_key)
+        content = message_content(response_data)
         parsed_json = extract_json_from_groq_response(content)
         if not parsed_json:
             return None, "Groq returned empty JSON"
+        # A truncated response may have been salvaged partially; don't keep it
+        if cache is not None and finish_reason(response_data) != "length":
+            cache.put(cache_key, parsed_json)
         return parsed_json, content
     except Exception as e:
         return None, str(e)
@@ -173,29 +155,13 @@ def generate_summary_with_groq(parsed_json, api_key):
     - Output only the summary text.
     """
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    data = {
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt},
-        ],
-        "model": "llama-3.1-8b-instant",
-        "max_tokens": 150,
-    }
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": prompt},
+    ]
 
     try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60,
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
+        content = message_content(chat_completion_sync(messages, max_tokens=150, api_key=api_key))
         return content.strip()
     except Exception:
         # If summary generation fails for any reason, just fallback later.
@@ -209,13 +175,19 @@ def handle_resume_upload(uploaded_file, api_key, freelancer_id):
     file_bytes = uploaded_file.read()  # Streamlit files are BytesIO
 
     resume_text = extract_text_from_resume(file_name, file_bytes)
+    return handle_resume_text(file_name, file_bytes, resume_text, api_key, freelancer_id)
+
+
+def handle_resume_text(file_name, file_bytes, resume_text, api_key, freelancer_id, use_cache=True):
+    """
+    Parse, merge and store a resume whose text was already extracted
+    (the API extracts it in the process pool, see app.executors).
+    use_cache=False bypasses the parse cache.
+    """
     if not resume_text:
         return None, "No text could be extracted from the resume."
 
-    ensure_freelancer_exists(freelancer_id)
-    save_resume_file(freelancer_id, file_name, file_bytes)
-
-    new_parsed_json, raw_response = call_groq_llm(resume_text, api_key)
+    new_parsed_json, raw_response = call_groq_llm(resume_text, api_key, use_cache)
     if new_parsed_json is None:
         return None, f"Parsing failed. Groq response: {raw_response}"
 
@@ -226,22 +198,20 @@ def handle_resume_upload(uploaded_file, api_key, freelancer_id):
     if is_email_duplicate(new_parsed_json.get("email"), freelancer_id):
         return None, f"Email {new_parsed_json.get('email')} already exists."
 
-    merged_json = update_resume(freelancer_id, new_parsed_json)
-
-    # Ensure summary exists
-    summary, err = generate_summary_with_groq(new_parsed_json, api_key), None
+    # Ensure summary exists: written by the parse itself in combined mode,
+    # otherwise generated before the transaction so the freelancer row is
+    # never locked during an LLM call
+    summary = str(new_parsed_json.pop("marketing_summary", "") or "").strip()
+    if not summary:
+        summary = generate_summary_with_groq(new_parsed_json, api_key)
     if not summary:
         summary = "Experienced freelancer with relevant technical expertise."
-    update_summary(freelancer_id, summary)
-    merged_json["summary"] = summary
-
-    update_freelancer_contact(
-        freelancer_id,
-        merged_json.get("name", ""),
-        merged_json.get("email", ""),
-        merged_json.get("phone", ""),
+
+    # Store the file, merge the resume, contact fields, summary and child
+    # rows in a single transaction
+    merged_json = apply_resume_upload(
+        freelancer_id, new_parsed_json, summary=summary, file_name=file_name, file_data=file_bytes
     )
-    update_freelancer_summary(freelancer_id, merged_json.get("summary", ""))
 
     # NOTE: We intentionally do NOT call the embedding/FAISS pipeline here to
     # avoid heavy Torch/Transformer dependencies crashing Streamlit on Windows.
@@ -0,0 +1,46 @@
+"""
+Resume summary written in the parse completion.
+
+The summary used to come from a second Groq call made after the parse
+returned, so every upload paid two sequential round trips. In combined
+mode the parse prompt also asks for the summary (same guidelines as the
+separate call), so one completion returns both; callers keep the separate
+call as a fallback for when the model leaves the summary empty.
+
+Configuration (env):
+    PARSE_SUMMARY_MODE   combined (default) | separate (second call, the old flow)
+"""
+import os
+
+PARSE_SUMMARY_MODE = os.getenv("PARSE_SUMMARY_MODE", "combined")
+COMBINED_SUMMARY = PARSE_SUMMARY_MODE != "separate"
+
+SUMMARY_TOKENS = 100 if COMBINED_SUMMARY else 0  # 30-50 words, added to the parse max_tokens
+
+
+def summary_guidelines(subject="person"):
+    """The summary guidelines shared by the combined and separate prompts."""
+    return f"""- Do NOT include the {subject}'s name or contact info.
+- Use a professional, factual tone.
+- Mention the main role/specialization.
+- If years of experience are clearly derivable from the resume, include them;
+  otherwise omit them (do not invent).
+- Highlight key technical skills and what they enable the {subject} to build.
+- Keep the summary between 30 and 50 words."""
+
+
+def summary_instructions(field, subject="person", only_if_missing=False):
+    """Parse prompt instructions for writing the summary into field ("" in separate mode)."""
+    if not COMBINED_SUMMARY:
+        return ""
+    if only_if_missing:
+        intro = f'For "{field}": use the resume\'s own summary if it has one, otherwise write one'
+    else:
+        intro = f'Also return a top-level "{field}" string summarizing the {subject}'
+    guidelines = summary_guidelines(subject).replace("\n", "\n  ")
+    return f"- {intro} following these guidelines:\n  {guidelines}\n"
+
+
+def parse_prompt_version(base):
+    """Parse cache prompt version for the current mode (combined parses carry the summary)."""
+    return f"{base}-summary" if COMBINED_SUMMARY else base
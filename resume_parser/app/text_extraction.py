@@ -0,0 +1,142 @@
+"""
+In-memory text extraction for uploaded resumes.
+
+pdfplumber and python-docx both read from seekable file-like objects, so
+uploads are wrapped in io.BytesIO and never written to disk (no temp file
+write, close and unlink per resume).
+
+Long PDFs are capped: extraction stops after PDF_MAX_PAGES pages or once
+MAX_EXTRACT_CHARS characters are collected (more than the parse prompt can
+use anyway). PDF pages are separated by a form feed.
+extract_text_parallel() additionally fans page ranges out over the cpu
+process pool (app.executors) for the async services.
+
+Configuration (env):
+    PDF_MAX_PAGES        pages read at most (default 40)
+    MAX_EXTRACT_CHARS    characters kept at most, ~6k tokens (default 24000)
+    PDF_PAGES_PER_JOB    pages per process-pool job (default 4)
+"""
+import asyncio
+import io
+import os
+
+import pdfplumber
+from docx import Document as DocxDocument
+
+from app.executors import cpu_pool, run_cpu
+
+SUPPORTED_TYPES = ("pdf", "docx")
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+MAX_EXTRACT_CHARS = int(os.getenv("MAX_EXTRACT_CHARS", "24000"))
+PDF_PAGES_PER_JOB = int(os.getenv("PDF_PAGES_PER_JOB", "4"))
+
+
+def as_stream(data):
+    """A binary stream over bytes/bytearray/memoryview; file objects pass through."""
+    if hasattr(data, "read"):
+        return data
+    return io.BytesIO(data)
+
+
+def file_type(file_name):
+    return file_name.rsplit(".", 1)[-1].lower()
+
+
+PAGE_BREAK = "\n\f"  # lets app.prompt_budget find page headers/footers
+
+
+def _join(texts, max_chars, separator="\n"):
+    # One join for the whole document (no quadratic += building)
+    return separator.join(texts).strip()[:max_chars]
+
+
+def extract_pdf_pages(data, start=0, stop=None, max_chars=None):
+    """
+    Extract pages [start, stop) of a PDF. Returns (page_count, page_texts);
+    stops early once max_chars characters are collected. Unreadable pages
+    are skipped. Module-level so process-pool workers can run it.
+    """
+    page_texts = []
+    collected = 0
+    with pdfplumber.open(as_stream(data)) as pdf:
+        page_count = len(pdf.pages)
+        for i in range(start, min(page_count, stop if stop is not None else page_count)):
+            if max_chars is not None and collected >= max_chars:
+                break
+            try:
+                text = pdf.pages[i].extract_text()
+            except Exception as e:
+                print(f"[WARNING] Failed to extract text from page {i+1}: {str(e)}")
+                continue
+            if text:
+                page_texts.append(text)
+                collected += len(text) + 1
+    return page_count, page_texts
+
+
+def extract_pdf_text(data, max_pages=PDF_MAX_PAGES, max_chars=MAX_EXTRACT_CHARS):
+    """Text of the first max_pages pages, serially, capped at max_chars."""
+    page_count, page_texts = extract_pdf_pages(data, 0, max_pages, max_chars)
+    print(f"[DEBUG] PDF has {page_count} pages, extracted {len(page_texts)}")
+    return _join(page_texts, max_chars, PAGE_BREAK)
+
+
+def extract_docx_text(data, max_chars=MAX_EXTRACT_CHARS):
+    doc = DocxDocument(as_stream(data))
+    print(f"[DEBUG] DOCX has {len(doc.paragraphs)} paragraphs")
+    return _join((para.text for para in doc.paragraphs if para.text), max_chars)
+
+
+def extract_text(file_name, data):
+    """Extract text based on file extension; raises ValueError for unsupported types."""
+    kind = file_type(file_name)
+    if kind == "pdf":
+        return extract_pdf_text(data)
+    if kind == "docx":
+        return extract_docx_text(data)
+    raise ValueError(f"Unsupported file type: {kind}")
+
+
+async def extract_pdf_text_parallel(data, max_pages=PDF_MAX_PAGES, max_chars=MAX_EXTRACT_CHARS,
+                                    pages_per_job=PDF_PAGES_PER_JOB):
+    """
+    extract_pdf_text over the cpu process pool. The first job reads the
+    first pages_per_job pages and the page count (most resumes end there);
+    the remaining pages go out in waves of one job per worker, in page
+    order, until max_pages are read or max_chars are collected.
+    """
+    data = bytes(data)  # pickled once per job
+    start = min(pages_per_job, max_pages)
+    page_count, page_texts = await run_cpu(extract_pdf_pages, data, 0, start, max_chars)
+    collected = sum(len(text) + 1 for text in page_texts)
+    last_page = min(page_count, max_pages)
+
+    while start < last_page and collected < max_chars:
+        wave = []
+        for _ in range(max(1, cpu_pool.max_workers)):
+            if start >= last_page:
+                break
+            wave.append(run_cpu(extract_pdf_pages, data, start, min(start + pages_per_job, last_page),
+                                max_chars - collected))
+            start += pages_per_job
+        for _, texts in await asyncio.gather(*wave):
+            page_texts.extend(texts)
+            collected += sum(len(text) + 1 for text in texts)
+
+    print(f"[DEBUG] PDF has {page_count} pages, extracted {len(page_texts)} (read up to page {min(start, last_page)})")
+    return _join(page_texts, max_chars, PAGE_BREAK)
+
+
+async def extract_text_pooled(file_name, data):
+    """Async extract_text as one process-pool job (batches parallelize across files, not pages)."""
+    return await run_cpu(extract_text, file_name, bytes(data))
+
+
+async def extract_text_parallel(file_name, data):
+    """Async extract_text: PDFs page-parallel, DOCX in one process-pool job."""
+    kind = file_type(file_name)
+    if kind == "pdf":
+        return await extract_pdf_text_parallel(data)
+    if kind == "docx":
+        return await run_cpu(extract_docx_text, bytes(data))
+    raise ValueError(f"Unsupported file type: {kind}")
@@ -1,20 +1,14 @@
-import json
+from managix_common.json_repair import parse_json_object
 
 def extract_json_from_groq_response(content: str):
     """
-    Extracts valid JSON from Groq LLM's raw string output.
+    Extracts valid JSON from Groq LLM's raw string output, repairing
+    truncated or slightly malformed output (see app/json_repair.py).
 
     Parameters:
         content (str): The raw string output from the LLM.
-    
+
     Returns:
-        dict | None: Parsed JSON dictionary if valid, else None.
+        dict | None: Parsed JSON dictionary if any could be recovered, else None.
     """
-    json_start = content.find('{')
-    json_end = content.rfind('}') + 1
-    if json_start != -1 and json_end != 0:
-        try:
-            return json.loads(content[json_start:json_end])
-        except json.JSONDecodeError:
-            return None
-    return None
\ No newline at end of file
+    return parse_json_object(content) or None
@@ -0,0 +1,449 @@
+"""
+Consolidated on-disk freelancer vector store.
+
+Replaces one FAISS directory (index + pickle docstore) per freelancer with
+a single directory holding:
+
+    vectors.f32      contiguous float32 matrix, one row per stored vector
+    metadata.jsonl   append-only log: one line per stored row (its
+                     metadata) or per deletion
+    manifest.json    store id, dim, committed row count and log size,
+                     generation, embedding model and format version
+    store.lock       fcntl lock file shared by every process using the store
+
+Rows are append-only: replacing a freelancer appends a new row and
+tombstones the old one, deleting only tombstones. A write appends to
+vectors.f32 and metadata.jsonl and then commits by replacing
+manifest.json, so it costs O(items), not O(store). compact() rewrites the
+files without dead rows and bumps the generation; writes run it first once
+dead rows pass VECTOR_STORE_COMPACT_RATIO of all rows (default 0.5, 0
+disables) and number at least VECTOR_STORE_COMPACT_MIN_DEAD (default 1000).
+
+Each store gets a random id when it is created. A directory swapped in
+under a running process (bulk_index --swap) has a different id, so the
+process drops its state and replays the new store from the start, and
+reopens store.lock once it notices the lock file it holds is no longer
+the one at the path.
+
+Several processes (uvicorn workers, bulk_index) can share a store: writes
+hold an exclusive lock on store.lock, reads a shared one, and every access
+first catches up with what other processes committed (a stat of the
+manifest; the log is replayed from the last offset read). Bytes past the
+committed sizes are a crashed write and are truncated by the next writer.
+On platforms without fcntl the store is single-process.
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+FORMAT_VERSION = 2
+VECTORS_FILE = "vectors.f32"
+LOG_FILE = "metadata.jsonl"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "store.lock"
+# Format 1 sidecars, rewritten whole on every write; converted on open
+V1_IDS_FILE = "ids.json"
+V1_METADATA_FILE = "metadata.json"
+
+METADATA_COLUMNS = (
+    "freelancer_id",
+    "name",
+    "skills",
+    "categories",
+    "summary",
+    "hourly_rate",
+    "availability",
+)
+
+DEFAULT_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "freelancer_store")
+COMPACT_RATIO = float(os.getenv("VECTOR_STORE_COMPACT_RATIO", "0.5"))
+COMPACT_MIN_DEAD = int(os.getenv("VECTOR_STORE_COMPACT_MIN_DEAD", "1000"))
+
+
+def _write_json(path, data):
+    """Write JSON atomically so readers never see a half-written sidecar."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _log_lines(entries):
+    return "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+
+
+class FreelancerVectorStore:
+    """Single-file vector matrix plus an append-only metadata log."""
+
+    def __init__(self, path, dim=None, model_name=None):
+        self.path = path
+        self.dim = dim
+        self.model_name = model_name
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        self._reset()
+
+        os.makedirs(path, exist_ok=True)
+        with self._locked(exclusive=True):
+            manifest = self._read_manifest()
+            if manifest is not None and manifest.get("version") == 1:
+                self._convert_v1(manifest)
+            self._refresh()
+
+    def _reset(self):
+        self.rows = 0
+        self.ids = {}
+        self.columns = {name: [] for name in METADATA_COLUMNS}
+        self.columns["deleted"] = []
+        self.store_id = None
+        self.generation = 0
+        self._log_bytes = 0
+        self._stamp = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        # The thread lock serializes this process; the flock other processes.
+        # A nested call inside an exclusive section keeps the outer lock.
+        with self._lock:
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            while True:
+                if self._lock_file is None:
+                    self._lock_file = open(self._file(LOCK_FILE), "a+b")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                if self._holds_current_lock_file():
+                    break
+                # The directory was replaced: lock the new store's file instead
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _holds_current_lock_file(self):
+        try:
+            current = os.stat(self._file(LOCK_FILE))
+        except FileNotFoundError:
+            return not os.path.isdir(self.path)  # mid-swap: keep the old lock until the new store appears
+        held = os.fstat(self._lock_file.fileno())
+        return (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino)
+
+    def _read_manifest(self):
+        try:
+            with open(self._file(MANIFEST_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _manifest_stamp(self):
+        try:
+            st = os.stat(self._file(MANIFEST_FILE))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Catch up with manifests committed by other processes (caller holds the lock)."""
+        stamp = self._manifest_stamp()
+        if stamp is None or stamp == self._stamp:
+            return
+        manifest = self._read_manifest()
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store version: {manifest.get('version')}")
+        if manifest.get("store_id") != self.store_id or manifest["generation"] != self.generation:
+            # Another store swapped in, or compacted: row numbers changed, replay from the start
+            self._reset()
+
+        log_bytes = manifest["log_bytes"]
+        if log_bytes > self._log_bytes:
+            with open(self._file(LOG_FILE), "rb") as f:
+                f.seek(self._log_bytes)
+                data = f.read(log_bytes - self._log_bytes)
+            for line in data.splitlines():
+                self._apply(json.loads(line))
+            self._log_bytes = log_bytes
+
+        self.dim = manifest["dim"]
+        self.model_name = manifest.get("model")
+        self.rows = manifest["rows"]
+        self.generation = manifest["generation"]
+        self.store_id = manifest.get("store_id")
+        self._stamp = stamp
+
+    def _apply(self, entry):
+        """Replay one log entry into ids/columns."""
+        if "delete" in entry:
+            row = self.ids.pop(entry["delete"], None)
+            if row is not None:
+                self.columns["deleted"][row] = True
+            return
+        freelancer_id = entry["freelancer_id"]
+        old_row = self.ids.get(freelancer_id)
+        if old_row is not None:
+            self.columns["deleted"][old_row] = True
+        for name in METADATA_COLUMNS:
+            self.columns[name].append(entry.get(name))
+        self.columns["deleted"].append(False)
+        self.ids[freelancer_id] = entry["row"]
+
+    def _truncate_uncommitted(self):
+        # Drop bytes a crashed writer appended after the last committed manifest
+        for name, committed in ((VECTORS_FILE, self.rows * (self.dim or 0) * 4), (LOG_FILE, self._log_bytes)):
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > committed:
+                with open(path, "r+b") as f:
+                    f.truncate(committed)
+
+    def _commit(self):
+        if self.store_id is None:
+            self.store_id = uuid.uuid4().hex  # new store, or one written before store ids
+        _write_json(self._file(MANIFEST_FILE), {
+            "version": FORMAT_VERSION,
+            "store_id": self.store_id,
+            "dim": self.dim,
+            "rows": self.rows,
+            "log_bytes": self._log_bytes,
+            "generation": self.generation,
+            "model": self.model_name,
+        })
+        self._stamp = self._manifest_stamp()
+
+    def _convert_v1(self, manifest):
+        """Rewrite a format 1 store (ids.json + metadata.json) as a metadata log."""
+        with open(self._file(V1_IDS_FILE), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        with open(self._file(V1_METADATA_FILE), "r", encoding="utf-8") as f:
+            columns = json.load(f)
+        entries = []
+        for row in range(manifest["rows"]):
+            entry = {name: columns[name][row] for name in METADATA_COLUMNS}
+            entry["row"] = row
+            entries.append(entry)
+        replaced = {entry["freelancer_id"] for entry in entries}
+        entries.extend({"delete": fid} for fid in sorted(replaced - set(ids)))
+
+        data = _log_lines(entries)
+        with open(self._file(LOG_FILE) + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(self._file(LOG_FILE) + ".tmp", self._file(LOG_FILE))
+        self.dim, self.rows, self.model_name = manifest["dim"], manifest["rows"], manifest.get("model")
+        self._log_bytes = len(data)
+        self._truncate_uncommitted()
+        self._commit()
+        self._reset()  # replayed by the following _refresh
+        for name in (V1_IDS_FILE, V1_METADATA_FILE):
+            os.remove(self._file(name))
+        print(f"[DEBUG] Converted vector store {self.path} to format {FORMAT_VERSION}")
+
+    @property
+    def state(self):
+        """
+        (store id, generation, rows, log size): changes whenever any process
+        commits a write. A new store id or generation means row numbers changed.
+        """
+        with self._locked():
+            self._refresh()
+            return self.store_id, self.generation, self.rows, self._log_bytes
+
+    def __len__(self):
+        with self._locked():
+            self._refresh()
+            return len(self.ids)
+
+    def __contains__(self, freelancer_id):
+        return self.row_of(freelancer_id) is not None
+
+    def upsert(self, freelancer_id, vector, metadata):
+        """Store one freelancer vector, tombstoning any previous row. Returns the new row."""
+        return self.upsert_many([(freelancer_id, vector, metadata)])[0]
+
+    def upsert_many(self, items):
+        """
+        Append many (freelancer_id, vector, metadata) items in one write.
+        Returns the new row of each item, in order.
+        """
+        if not items:
+            return []
+        matrix = np.asarray([vector for _, vector, _ in items], dtype="float32")
+        if matrix.ndim != 2:
+            raise ValueError("Vectors must all have the same dimension")
+
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._compact_if_needed()
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {matrix.shape[1]} does not match store dimension {self.dim}")
+            self._truncate_uncommitted()
+
+            entries = []
+            for offset, (freelancer_id, _, metadata) in enumerate(items):
+                entry = {name: metadata.get(name) for name in METADATA_COLUMNS}
+                entry["freelancer_id"] = str(freelancer_id)
+                entry["row"] = self.rows + offset
+                entries.append(entry)
+            data = _log_lines(entries)
+
+            with open(self._file(VECTORS_FILE), "ab") as f:
+                f.write(np.ascontiguousarray(matrix).tobytes())
+            with open(self._file(LOG_FILE), "ab") as f:
+                f.write(data)
+            for entry in entries:
+                self._apply(entry)
+            self.rows += len(entries)
+            self._log_bytes += len(data)
+            self._commit()
+            return [entry["row"] for entry in entries]
+
+    def delete(self, freelancer_id):
+        """Tombstone a freelancer's vector. Returns False if it was not stored."""
+        freelancer_id = str(freelancer_id)
+        with self._locked(exclusive=True):
+            self._refresh()
+            if freelancer_id not in self.ids:
+                return False
+            self._compact_if_needed()
+            self._truncate_uncommitted()
+            data = _log_lines([{"delete": freelancer_id}])
+            with open(self._file(LOG_FILE), "ab") as f:
+                f.write(data)
+            self._apply({"delete": freelancer_id})
+            self._log_bytes += len(data)
+            self._commit()
+            return True
+
+    def row_of(self, freelancer_id):
+        with self._locked():
+            self._refresh()
+            return self.ids.get(str(freelancer_id))
+
+    def live_rows(self):
+        """Rows that are not tombstoned, in ascending order."""
+        with self._locked():
+            self._refresh()
+            return sorted(self.ids.values())
+
+    def dead_rows(self):
+        """Number of tombstoned rows still taking space until compact()."""
+        with self._locked():
+            self._refresh()
+            return self.rows - len(self.ids)
+
+    def metadata(self, row):
+        """Metadata dict for one row (rows never change once written, until compact())."""
+        if row >= len(self.columns["deleted"]):
+            with self._locked():
+                self._refresh()
+        return {name: self.columns[name][row] for name in METADATA_COLUMNS}
+
+    def vectors(self, mmap=False):
+        """
+        The full float32 matrix, tombstoned rows included (index by row).
+        With mmap=True the file is mapped read-only instead of read into memory.
+        """
+        with self._locked():
+            self._refresh()
+            if not self.rows:
+                return np.empty((0, self.dim or 0), dtype="float32")
+            vectors_path = self._file(VECTORS_FILE)
+            if mmap:
+                return np.memmap(vectors_path, dtype="float32", mode="r", shape=(self.rows, self.dim))
+            return np.fromfile(vectors_path, dtype="float32", count=self.rows * self.dim).reshape(self.rows, self.dim)
+
+    def compact(self):
+        """
+        Rewrite the store without tombstoned rows. Row numbers change and
+        the generation is bumped, so indexes built on this store reload.
+        """
+        with self._locked(exclusive=True):
+            self._refresh()
+            rows = sorted(self.ids.values())
+            matrix = self.vectors()[rows] if rows else np.empty((0, self.dim or 0), dtype="float32")
+            entries = []
+            for new_row, row in enumerate(rows):
+                entry = {name: self.columns[name][row] for name in METADATA_COLUMNS}
+                entry["row"] = new_row
+                entries.append(entry)
+            data = _log_lines(entries)
+
+            for name, content in ((VECTORS_FILE, np.ascontiguousarray(matrix, dtype="float32").tobytes()),
+                                  (LOG_FILE, data)):
+                tmp_path = self._file(name + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, self._file(name))
+
+            dim, model_name, store_id, generation = self.dim, self.model_name, self.store_id, self.generation + 1
+            self._reset()
+            self.dim, self.model_name, self.store_id, self.generation = dim, model_name, store_id, generation
+            for entry in entries:
+                self._apply(entry)
+            self.rows = len(entries)
+            self._log_bytes = len(data)
+            self._commit()
+
+    def _compact_if_needed(self):
+        # Before a write (caller holds the exclusive lock), so rows it returns stay valid
+        dead = self.rows - len(self.ids)
+        if COMPACT_RATIO > 0 and dead >= COMPACT_MIN_DEAD and dead >= COMPACT_RATIO * self.rows:
+            print(f"[DEBUG] Compacting vector store {self.path}: {dead} of {self.rows} rows are dead")
+            self.compact()
+
+
+def swap_store(new_path, live_path, backup_path):
+    """
+    Make new_path the store at live_path, moving the current one to
+    backup_path. Holds the live store's exclusive lock while renaming, so
+    no writer is mid-write; processes that have the live store open notice
+    the new store id and lock file on their next access.
+    """
+    if os.path.exists(backup_path):
+        shutil.rmtree(backup_path)
+    if not os.path.exists(live_path):
+        os.rename(new_path, live_path)
+        return
+    with open(os.path.join(live_path, LOCK_FILE), "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        os.rename(live_path, backup_path)
+        os.rename(new_path, live_path)
+        # Closing the file releases the lock on the (now backup) lock file
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_vector_store(path=DEFAULT_STORE_PATH, model_name=None):
+    """Return the process-wide store for path, so writers and readers share one instance."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = FreelancerVectorStore(path, model_name=model_name)
+            _stores[path] = store
+        return store
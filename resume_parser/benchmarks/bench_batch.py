@@ -0,0 +1,116 @@
+"""
+Wall-clock time to parse N resumes with fastapi_app: N sequential
+/parse-resume calls (how the .NET backend onboards a company today)
+versus one /parse-resumes/batch request, then the same batch re-uploaded
+so every file is a parse cache hit.
+
+Uses the generation-time mock Groq server from bench_summary_mode. The
+Groq rate limiter is on (--requests-per-minute, burst of
+GROQ_RATE_BURST_SECONDS worth of requests): the first batch is paced by
+it, the cached re-upload makes no Groq requests and must not be.
+
+Usage (from resume_parser/):
+    python benchmarks/bench_batch.py --files 40 --concurrency 8 --requests-per-minute 60
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_concurrency import free_port, make_pdf, start, wait_for  # noqa: E402
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+def sequential(base, files):
+    started = time.perf_counter()
+    with httpx.Client(timeout=300) as client:
+        for upload in files:
+            client.post(f"{base}/parse-resume", json=upload, headers=NO_CACHE).raise_for_status()
+    return time.perf_counter() - started
+
+
+def batch(base, files, headers=None):
+    started = time.perf_counter()
+    first = None
+    events = []
+    with httpx.Client(timeout=600) as client:
+        with client.stream("POST", f"{base}/parse-resumes/batch", json={"files": files},
+                           headers=headers or {}) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    events.append(json.loads(line))
+                    first = first or time.perf_counter() - started
+    done = events[-1]
+    assert done["event"] == "done" and done["failed"] == 0, done
+    return time.perf_counter() - started, first
+
+
+def groq_requests(base):
+    return httpx.get(f"{base}/metrics").json()["groq_usage"]["requests"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8, help="BATCH_CONCURRENCY")
+    parser.add_argument("--requests-per-minute", type=float, default=60, help="GROQ_REQUESTS_PER_MINUTE (0 = off)")
+    parser.add_argument("--burst-seconds", type=float, default=5, help="GROQ_RATE_BURST_SECONDS")
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=500)
+    args = parser.parse_args()
+
+    mock_port, api_port = free_port(), free_port()
+    mock = start([os.path.join(ROOT, "benchmarks", "bench_summary_mode.py"), "--mock-groq-port", str(mock_port),
+                  "--ttft", str(args.ttft), "--tokens-per-second", str(args.tokens_per_second)])
+    cache_dir = tempfile.TemporaryDirectory()
+    env = dict(os.environ, GROQ_BASE_URL=f"http://127.0.0.1:{mock_port}", GROQ_API_KEY="bench",
+               PARSE_CACHE_PATH=os.path.join(cache_dir.name, "parse_cache.sqlite3"),
+               BATCH_CONCURRENCY=str(args.concurrency), GROQ_REQUESTS_PER_MINUTE=str(args.requests_per_minute),
+               GROQ_RATE_BURST_SECONDS=str(args.burst_seconds))
+    api = start(["-m", "uvicorn", "fastapi_app:app", "--port", str(api_port), "--log-level", "warning"], env)
+    # Distinct text per file, so the first batch cannot hit the cache
+    files = [{"filename": f"resume_{i}.pdf", "file_base64": base64.b64encode(make_pdf(1 + i % 3, 45 + i)).decode()}
+             for i in range(args.files)]
+    try:
+        base = f"http://127.0.0.1:{api_port}"
+        wait_for(f"http://127.0.0.1:{mock_port}/docs")
+        wait_for(f"{base}/")
+        warmup = [{"filename": "warmup.pdf", "file_base64": base64.b64encode(make_pdf(1, 10)).decode()}]
+        sequential(base, warmup)  # warm the pools
+        burst = max(1.0, args.requests_per_minute / 60 * args.burst_seconds) if args.requests_per_minute else args.files
+        floor = max(0.0, args.files - burst) * 60 / args.requests_per_minute if args.requests_per_minute else 0.0
+        print(f"files={args.files} concurrency={args.concurrency} rpm={args.requests_per_minute:g} "
+              f"ttft={args.ttft}s tokens/s={args.tokens_per_second:g} cpus={os.cpu_count()}")
+        print(f"rate limit floor for {args.files} Groq requests: {floor:.1f}s\n")
+        print(f"{'run':<28} {'seconds':>8} {'first s':>8} {'groq calls':>11}")
+
+        calls = groq_requests(base)
+        seq = sequential(base, files)
+        seq_calls, calls = groq_requests(base) - calls, groq_requests(base)
+        print(f"{'sequential /parse-resume':<28} {seq:>8.2f} {'':>8} {seq_calls:>11}")
+
+        for label, headers in (("batch", NO_CACHE), ("batch re-upload (cached)", None)):
+            total, first = batch(base, files, headers)
+            used, calls = groq_requests(base) - calls, groq_requests(base)
+            print(f"{label:<28} {total:>8.2f} {first:>8.2f} {used:>11}")
+        print(f"\nrate limiter: {httpx.get(f'{base}/metrics').json()['rate_limit']['requests']}")
+    finally:
+        api.terminate()
+        mock.terminate()
+        api.wait()
+        mock.wait()
+        cache_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
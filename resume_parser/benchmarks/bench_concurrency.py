@@ -0,0 +1,177 @@
+"""
+Throughput of fastapi_app's /parse-resume under concurrent uploads, with
+blocking work inline on the event loop (OFFLOAD_BLOCKING=0, the old
+behaviour) versus offloaded to app.executors (OFFLOAD_BLOCKING=1).
+
+Starts a mock Groq server (fixed latency, canned resume JSON) and the API
+under uvicorn as subprocesses, then fires --requests uploads of a generated
+multi-page PDF with --concurrency in flight.
+
+Usage (from resume_parser/):
+    python benchmarks/bench_concurrency.py --concurrency 50 --requests 200
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CANNED_RESUME = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "",
+    "summary": "Backend engineer building data pipelines.",
+    "education": [],
+    "skills": ["Python", "FastAPI", "MySQL"],
+    "projects": [{"title": "Pipeline", "description": "ETL on AWS"}],
+    "experience": [{"title": "Engineer", "company": "Acme", "duration": "2020-2024", "description": "APIs"}],
+}
+
+
+def make_pdf(pages=3, lines_per_page=45):
+    """A minimal multi-page text PDF built by hand (no PDF library needed)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} line {i}: Python FastAPI MySQL AWS Docker experience 2019-2024"
+                 for i in range(lines_per_page)]
+        text = "".join(f"({line}) Tj 0 -14 Td " for line in lines)
+        stream = f"BT /F1 10 Tf 40 800 Td {text}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def mock_groq_app(latency):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.post("/chat/completions")
+    async def chat(body: dict):
+        await asyncio.sleep(latency)
+        max_tokens = body.get("max_tokens") or 0
+        content = "Backend engineer." if max_tokens <= 200 else json.dumps(CANNED_RESUME)
+        prompt_chars = sum(len(message["content"]) for message in body.get("messages", []))
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(content) // 4},
+        }
+
+    return app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def start(args, env=None):
+    return subprocess.Popen([sys.executable] + args, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def fire(url, payload, total, concurrency):
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        async def one():
+            async with semaphore:
+                start_t = time.perf_counter()
+                response = await client.post(url, json=payload)
+                latencies.append(time.perf_counter() - start_t)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+    return elapsed, np.array(latencies), statuses
+
+
+def run_scenario(offload, mock_url, payload, args):
+    port = free_port()
+    env = dict(os.environ, GROQ_BASE_URL=mock_url, GROQ_API_KEY="bench", GROQ_REQUESTS_PER_MINUTE="0",
+               OFFLOAD_BLOCKING="1" if offload else "0")
+    server = start(["-m", "uvicorn", "fastapi_app:app", "--port", str(port), "--log-level", "warning"], env)
+    try:
+        wait_for(f"http://127.0.0.1:{port}/")
+        base = f"http://127.0.0.1:{port}/parse-resume"
+        asyncio.run(fire(base, payload, min(args.concurrency, 10), args.concurrency))  # warm the pools
+        return asyncio.run(fire(base, payload, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=3, help="Pages in the generated resume PDF")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="Mock Groq response time (s)")
+    parser.add_argument("--mock-groq-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mock_groq_port:
+        import uvicorn
+        uvicorn.run(mock_groq_app(args.groq_latency), port=args.mock_groq_port, log_level="warning")
+        return
+
+    mock_port = free_port()
+    mock = start([os.path.abspath(__file__), "--mock-groq-port", str(mock_port),
+                  "--groq-latency", str(args.groq_latency)])
+    payload = {"filename": "resume.pdf", "file_base64": base64.b64encode(make_pdf(args.pages)).decode()}
+    try:
+        wait_for(f"http://127.0.0.1:{mock_port}/docs")
+        print(f"requests={args.requests} concurrency={args.concurrency} pages={args.pages} "
+              f"groq_latency={args.groq_latency}s cpus={os.cpu_count()}\n")
+        print(f"{'mode':<10} {'req/s':>8} {'p50 s':>8} {'p95 s':>8}  statuses")
+        for label, offload in (("inline", False), ("offloaded", True)):
+            elapsed, latencies, statuses = run_scenario(offload, f"http://127.0.0.1:{mock_port}", payload, args)
+            print(f"{label:<10} {args.requests / elapsed:>8.1f} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 95):>8.2f}  {statuses}")
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Text-extraction throughput on a corpus of synthetic resumes: the old
+temp-file path (write NamedTemporaryFile, reopen from disk, unlink) versus
+app.text_extraction reading the upload from memory.
+
+A second table times one long PDF (--long-pages): the old uncapped serial
+loop versus the page/char-capped serial and process-pool extraction.
+
+Usage (from resume_parser/):
+    python benchmarks/bench_extraction.py --docs 200 --pages 1 2 3 5 --long-pages 40
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import pdfplumber  # noqa: E402
+from docx import Document as DocxDocument  # noqa: E402
+
+from app import text_extraction  # noqa: E402
+from app.executors import cpu_pool, shutdown_executors  # noqa: E402
+from benchmarks.bench_concurrency import make_pdf  # noqa: E402
+
+
+def make_docx(paragraphs=60):
+    doc = DocxDocument()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Paragraph {i}: Python FastAPI MySQL AWS Docker experience 2019-2024")
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def legacy_extract(file_name, file_bytes):
+    """The pre-BytesIO implementation, kept here as the baseline."""
+    suffix = "." + text_extraction.file_type(file_name)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(file_bytes)
+        tmp_path = tmp.name
+    try:
+        if suffix == ".pdf":
+            resume_text = ""
+            with pdfplumber.open(tmp_path) as pdf:
+                for page in pdf.pages:
+                    text = page.extract_text()
+                    if text:
+                        resume_text += text + "\n"
+            return resume_text.strip()
+        doc = DocxDocument(tmp_path)
+        return "\n".join(para.text for para in doc.paragraphs if para.text).strip()
+    finally:
+        os.unlink(tmp_path)
+
+
+def measure(extract, corpus):
+    started = time.perf_counter()
+    chars = sum(len(extract(name, data)) for name, data in corpus)
+    return time.perf_counter() - started, chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200, help="Documents per corpus")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 3, 5], help="PDF page counts to cycle through")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--long-pages", type=int, default=40, help="Pages in the long-PDF case (0 to skip)")
+    args = parser.parse_args()
+
+    pdfs = [("resume.pdf", make_pdf(args.pages[i % len(args.pages)])) for i in range(args.docs)]
+    docxs = [("resume.docx", make_docx()) for _ in range(args.docs)]
+    # Keep the benchmark output readable: extract_pdf_text logs per document
+    sys.stdout, real_stdout = open(os.devnull, "w"), sys.stdout
+    results = []
+    try:
+        for label, corpus in (("pdf", pdfs), ("docx", docxs)):
+            size_mb = sum(len(data) for _, data in corpus) / 1e6
+            for mode, extract in (("tempfile", legacy_extract), ("in-memory", text_extraction.extract_text)):
+                elapsed, chars = min(measure(extract, corpus) for _ in range(args.repeat))
+                results.append((label, mode, args.docs / elapsed, size_mb / elapsed, chars))
+    finally:
+        sys.stdout = real_stdout
+
+    print(f"docs={args.docs} pages={args.pages} best of {args.repeat}\n")
+    print(f"{'corpus':<6} {'mode':<10} {'docs/s':>9} {'MB/s':>8} {'chars':>10}")
+    for label, mode, docs_per_s, mb_per_s, chars in results:
+        print(f"{label:<6} {mode:<10} {docs_per_s:>9.1f} {mb_per_s:>8.2f} {chars:>10}")
+
+    if args.long_pages:
+        bench_long_pdf(args.long_pages, args.repeat)
+
+
+def bench_long_pdf(pages, repeat):
+    pdf = make_pdf(pages)
+    modes = (
+        ("uncapped serial", lambda: legacy_extract("long.pdf", pdf)),
+        ("capped serial", lambda: text_extraction.extract_pdf_text(pdf)),
+        ("capped parallel", lambda: asyncio.run(text_extraction.extract_pdf_text_parallel(pdf))),
+    )
+    sys.stdout, real_stdout = open(os.devnull, "w"), sys.stdout
+    results = []
+    try:
+        asyncio.run(text_extraction.extract_pdf_text_parallel(pdf, max_pages=1))  # start the pool workers
+        for mode, run in modes:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                chars = len(run())
+                timings.append(time.perf_counter() - started)
+            results.append((mode, min(timings), chars))
+    finally:
+        sys.stdout = real_stdout
+        shutdown_executors()
+
+    print(f"\nlong pdf: pages={pages} max_pages={text_extraction.PDF_MAX_PAGES} "
+          f"max_chars={text_extraction.MAX_EXTRACT_CHARS} workers={cpu_pool.max_workers}\n")
+    print(f"{'mode':<16} {'seconds':>8} {'chars':>8}")
+    for mode, seconds, chars in results:
+        print(f"{mode:<16} {seconds:>8.2f} {chars:>8}")
+
+
+if __name__ == "__main__":
+    main()
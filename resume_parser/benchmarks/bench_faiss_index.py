@@ -0,0 +1,94 @@
+"""
+Recall vs latency of the FAISS index types in app.freelancer_faiss_index.
+
+Uses synthetic 384-dimensional, L2-normalised vectors clustered like
+all-MiniLM-L6-v2 summary embeddings, and measures every index type against
+the exact IndexFlatIP baseline.
+
+Usage (from resume_parser/):
+    python benchmarks/bench_faiss_index.py --rows 50000 --queries 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.freelancer_faiss_index import create_index  # noqa: E402
+
+DIM = 384
+
+
+def synthetic_embeddings(rows, dim=DIM, clusters=200, noise=0.35, seed=0):
+    """Unit vectors drawn around random topic centroids (roughly how MiniLM embeddings cluster)."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype("float32")
+    assignment = rng.integers(0, clusters, rows)
+    vectors = centroids[assignment] + noise * rng.standard_normal((rows, dim)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def measure(index, queries, k):
+    """Return (neighbour ids, per-query latencies in ms) for one-at-a-time searches."""
+    ids = np.empty((len(queries), k), dtype="int64")
+    latencies = []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, found = index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[i] = found[0]
+    return ids, np.array(latencies)
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = synthetic_embeddings(args.rows)
+    queries = synthetic_embeddings(args.queries, seed=1)
+
+    configs = [
+        ("flat", {}),
+        ("ivf", {"nprobe": 8}),
+        ("ivf", {"nprobe": 32}),
+        ("hnsw", {"efSearch": 32}),
+        ("hnsw", {"efSearch": 128}),
+        ("ivfpq", {"nprobe": 16}),
+        ("ivfpq", {"nprobe": 64}),
+    ]
+
+    truth = None
+    print(f"rows={args.rows} dim={DIM} queries={args.queries} k={args.k}\n")
+    print(f"{'index':<8} {'params':<52} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'MB':>8}")
+    for index_type, params in configs:
+        start = time.perf_counter()
+        index, used = create_index(data, index_type, **params)
+        build_s = time.perf_counter() - start
+
+        found, latencies = measure(index, queries, args.k)
+        if truth is None:
+            truth = found  # flat is exact and always runs first
+        size_mb = len(_serialized(index)) / 1e6
+
+        print(f"{index_type:<8} {str(used):<52} {build_s:>8.2f} {recall_at_k(found, truth):>7.3f} "
+              f"{np.percentile(latencies, 50):>8.3f} {np.percentile(latencies, 95):>8.3f} {size_mb:>8.1f}")
+
+
+def _serialized(index):
+    import faiss
+    return faiss.serialize_index(index)
+
+
+if __name__ == "__main__":
+    main()
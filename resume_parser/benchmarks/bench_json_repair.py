@@ -0,0 +1,246 @@
+"""
+Microbenchmark: managix_common.json_repair.parse_json_object versus the
+regex/trial-parse strategy chain it replaced in fastapi_app, ai_planner and
+ai_allocation_app (reproduced below as legacy_extract_json).
+
+Inputs are resume-shaped responses of growing size: valid, wrapped in a
+``` fence, with trailing commas, and truncated mid-value (the case that
+sent the old chain into its O(n^2) progressive-truncation loop).
+
+Usage (from resume_parser/):
+    python benchmarks/bench_json_repair.py --sizes 2 4 8 16
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from managix_common.json_repair import parse_json_object  # noqa: E402
+
+
+def legacy_extract_json(response_text: str) -> dict:
+    """fastapi_app.extract_json_from_groq_response before app/json_repair.py (verbatim)."""
+    if not response_text:
+        print("[WARNING] Empty response text from Groq")
+        return {}
+    
+    text = response_text.strip()
+    original_text = text
+    
+    # Strategy 1: Look for JSON in markdown code blocks first (most reliable)
+    # Handle both complete and incomplete code blocks
+    if "```json" in text or "```" in text:
+        # Find all code block markers
+        code_blocks = list(re.finditer(r'```(?:json)?', text))
+        if code_blocks:
+            # Extract content from first code block
+            start_marker = code_blocks[0].end()
+            # Find the next ``` after start_marker, or use end of text if not found
+            end_marker = text.find("```", start_marker)
+            if end_marker == -1:
+                # No closing ```, use end of text (incomplete JSON from Groq)
+                end_marker = len(text)
+                print("[DEBUG] No closing ``` found, using end of text (JSON might be incomplete)")
+            
+            text = text[start_marker:end_marker].strip()
+            print("[DEBUG] Extracted JSON from markdown code block")
+    
+    text = text.strip()
+    
+    # Strategy 3: Find JSON object boundaries by matching braces (handles text before JSON)
+    if not text.startswith("{"):
+        start_idx = text.find("{")
+        if start_idx != -1:
+            # Count braces to find the matching closing brace
+            brace_count = 0
+            end_idx = -1
+            for i in range(start_idx, len(text)):
+                if text[i] == '{':
+                    brace_count += 1
+                elif text[i] == '}':
+                    brace_count -= 1
+                    if brace_count == 0:
+                        end_idx = i
+                        break
+            
+            if end_idx != -1 and end_idx > start_idx:
+                text = text[start_idx:end_idx+1]
+                print("[DEBUG] Extracted JSON object from text with prefix (handled nested braces)")
+    
+    text = text.strip()
+    
+    # Strategy 4: Try to parse as-is
+    try:
+        parsed = json.loads(text)
+        print(f"[DEBUG] Successfully parsed JSON with {len(parsed)} top-level keys")
+        return parsed
+    except json.JSONDecodeError as e:
+        print(f"[WARNING] Initial JSON parse failed: {str(e)} at position {e.pos}")
+        print(f"[DEBUG] Text around error (chars {max(0, e.pos-100)} to {min(len(text), e.pos+100)}):")
+        print(f"  ...{text[max(0, e.pos-100):e.pos+100]}...")
+        
+        # Strategy 5: Fix common JSON issues
+        try:
+            fixed_text = text
+            # Remove trailing commas
+            fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
+            # Fix unclosed strings (if any)
+            # Remove any text after the last }
+            last_brace = fixed_text.rfind('}')
+            if last_brace != -1:
+                fixed_text = fixed_text[:last_brace+1]
+            
+            parsed = json.loads(fixed_text)
+            print("[DEBUG] Successfully parsed after fixing JSON issues (trailing commas, etc.)")
+            return parsed
+        except json.JSONDecodeError as e2:
+            print(f"[ERROR] JSON decode error after fixes: {str(e2)} at position {e2.pos}")
+            
+            # Strategy 6: Try progressive truncation from the end
+            # Sometimes Groq returns incomplete JSON or extra text
+            brace_start = text.find('{')
+            if brace_start != -1:
+                print(f"[DEBUG] Attempting progressive truncation from position {len(text)}")
+                # Try different end positions, starting from the last } and working backwards
+                last_brace = text.rfind('}')
+                if last_brace != -1:
+                    # Try parsing from first { to last }
+                    try:
+                        potential_json = text[brace_start:last_brace+1]
+                        parsed = json.loads(potential_json)
+                        print(f"[DEBUG] Successfully parsed by using first {{ to last }}")
+                        return parsed
+                    except:
+                        pass
+                
+                # Try truncating character by character from the end
+                for truncate_pos in range(len(text), brace_start + 50, -1):
+                    try:
+                        potential_json = text[brace_start:truncate_pos]
+                        # Check if it's valid JSON structure
+                        if potential_json.count('{') == potential_json.count('}'):
+                            parsed = json.loads(potential_json)
+                            print(f"[DEBUG] Successfully parsed by truncating to position {truncate_pos}")
+                            return parsed
+                    except:
+                        continue
+            
+            # Strategy 7: Try to fix incomplete JSON by closing arrays/objects intelligently
+            try:
+                fixed_text = text
+                
+                # Remove trailing commas first
+                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
+                
+                # Count unclosed brackets/braces
+                open_braces = fixed_text.count('{') - fixed_text.count('}')
+                open_brackets = fixed_text.count('[') - fixed_text.count(']')
+                
+                # If we have unclosed structures, try to fix them
+                if open_braces > 0 or open_brackets > 0:
+                    # Find where the JSON is incomplete and close it properly
+                    # Close brackets first (they're inside objects), then braces
+                    if open_brackets > 0:
+                        # Find the last unclosed array
+                        last_open_bracket = fixed_text.rfind('[')
+                        if last_open_bracket != -1:
+                            # Check if it has content
+                            after_bracket = fixed_text[last_open_bracket+1:].strip()
+                            if after_bracket and not after_bracket.startswith(']'):
+                                # There's content, need to close the array
+                                # Find a safe place to insert ]
+                                # Look for the last complete item before the truncation
+                                fixed_text = fixed_text.rstrip()
+                                if not fixed_text.endswith(']'):
+                                    fixed_text += ']'
+                                    open_brackets -= 1
+                    
+                    # Close braces
+                    if open_braces > 0:
+                        fixed_text = fixed_text.rstrip()
+                        if not fixed_text.endswith('}'):
+                            # Find where to close - before the last incomplete structure
+                            fixed_text += '\n' + '}' * open_braces
+                    
+                    # Close remaining brackets
+                    if open_brackets > 0:
+                        fixed_text += '\n' + ']' * open_brackets
+                
+                # Remove any trailing commas again after closing
+                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
+                
+                parsed = json.loads(fixed_text)
+                print(f"[DEBUG] Successfully parsed after closing {open_braces} braces and {open_brackets} brackets")
+                return parsed
+            except Exception as e3:
+                print(f"[WARNING] Failed to fix incomplete JSON: {str(e3)}")
+                import traceback
+                print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+            
+            # Strategy 8: Last resort - try to extract partial data and return what we can
+            print(f"[ERROR] All JSON extraction strategies failed")
+            print(f"[DEBUG] Full response text length: {len(original_text)}")
+            print(f"[DEBUG] First 1000 chars of original: {original_text[:1000]}")
+            print(f"[DEBUG] Last 500 chars of original: {original_text[-500:]}")
+            print(f"[DEBUG] Extracted text length: {len(text)}")
+            print(f"[DEBUG] First 1000 chars of extracted: {text[:1000]}")
+            
+            # Return empty dict so caller can handle gracefully
+            return {}
+
+
+def make_response(kb):
+    experience = []
+    doc = {"name": "Jane Doe", "email": "jane@example.com", "skills": ["Python", "FastAPI", "MySQL"],
+           "experience": experience}
+    while len(json.dumps(doc, indent=2)) < kb * 1024:
+        experience.append({"title": "Engineer %d" % len(experience), "company": "Acme",
+                           "duration": "2019-2024", "description": "Built and operated APIs, pipelines and tooling."})
+    return json.dumps(doc, indent=2)
+
+
+def variants(kb):
+    text = make_response(kb)
+    return {
+        "valid": text,
+        "fenced": "Here is the JSON:\n```json\n" + text + "\n```",
+        "trailing commas": text.replace("}", ",}").replace(",}", "}", 1),
+        "truncated": text[: int(len(text) * 0.97)],
+    }
+
+
+def timed(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):  # the legacy chain logs heavily
+            started = time.perf_counter()
+            result = fn(text)
+            best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 4, 8, 16], help="Response sizes in KB")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'case':<16} {'legacy ms':>10} {'repair ms':>10} {'speedup':>8}  recovered (legacy/repair)")
+    for kb in args.sizes:
+        for case, text in variants(kb).items():
+            legacy_s, legacy_result = timed(legacy_extract_json, text, args.repeat)
+            repair_s, repair_result = timed(parse_json_object, text, args.repeat)
+            recovered = "%d/%d" % (len(legacy_result.get("experience", [])), len(repair_result.get("experience", [])))
+            print(f"{kb:>4}K {case:<16} {legacy_s * 1000:>10.2f} {repair_s * 1000:>10.2f} "
+                  f"{legacy_s / repair_s:>7.1f}x  {recovered} experience items")
+
+
+if __name__ == "__main__":
+    main()
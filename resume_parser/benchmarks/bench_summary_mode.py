@@ -0,0 +1,136 @@
+"""
+Upload latency of fastapi_app's /parse-resume with the summary written by
+a second Groq call (PARSE_SUMMARY_MODE=separate, the old flow) versus in
+the parse completion itself (combined).
+
+The mock Groq server models generation time, not just a fixed delay:
+--ttft seconds before the first token plus completion tokens divided by
+--tokens-per-second. Its resumes have no summary of their own, so the
+separate mode always needs the second call. Uploads are sent one at a time
+with the parse cache disabled.
+
+Usage (from resume_parser/):
+    python benchmarks/bench_summary_mode.py --requests 20 --ttft 0.3 --tokens-per-second 500
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_concurrency import free_port, make_pdf, start, wait_for  # noqa: E402
+
+PARSED_RESUME = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "+1 555 0100",
+    "summary": "",
+    "education": [{"degree": "BSc Computer Science", "institution": "State University", "year": "2016",
+                   "details": "Distributed systems, databases"}],
+    "skills": ["Python", "FastAPI", "MySQL", "AWS", "Docker", "Kubernetes", "React", "TypeScript"],
+    "projects": [{"title": f"Project {i}", "description": "Built an event-driven data pipeline on AWS "
+                                                           "processing millions of records per day"}
+                 for i in range(4)],
+    "experience": [{"title": "Backend Engineer", "company": f"Company {i}", "duration": f"{2016 + 2 * i}-{2018 + 2 * i}",
+                    "description": "Designed REST APIs, migrated services to Kubernetes, cut p95 latency by 40%"}
+                   for i in range(4)],
+}
+SUMMARY = ("Backend engineer with eight years of experience building Python and FastAPI services, "
+           "data pipelines on AWS and containerized deployments on Kubernetes, delivering scalable "
+           "APIs and React dashboards for data-heavy products.")
+
+
+def mock_groq_app(ttft, tokens_per_second):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.post("/chat/completions")
+    async def chat(body: dict):
+        prompt = body["messages"][-1]["content"]
+        if "Output only the summary text" in prompt:
+            content = SUMMARY
+        else:
+            # A combined-mode parse prompt carries the summary guidelines
+            parsed = dict(PARSED_RESUME, summary=SUMMARY if "30 and 50 words" in prompt else "")
+            content = json.dumps(parsed)
+        completion_tokens = len(content) // 4
+        await asyncio.sleep(ttft + completion_tokens / tokens_per_second)
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": completion_tokens},
+        }
+
+    return app
+
+
+def run_mode(mode, mock_url, payload, requests):
+    port = free_port()
+    env = dict(os.environ, GROQ_BASE_URL=mock_url, GROQ_API_KEY="bench", GROQ_REQUESTS_PER_MINUTE="0",
+               PARSE_CACHE_ENABLED="0", PARSE_SUMMARY_MODE=mode)
+    server = start(["-m", "uvicorn", "fastapi_app:app", "--port", str(port), "--log-level", "warning"], env)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_for(f"{base}/")
+        latencies = []
+        with httpx.Client(timeout=120) as client:
+            client.post(f"{base}/parse-resume", json=payload).raise_for_status()  # warm the pools
+            before = client.get(f"{base}/metrics").json()["groq_usage"]["requests"]
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.post(f"{base}/parse-resume", json=payload)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                assert response.json()["summary"], "upload came back without a summary"
+            calls = client.get(f"{base}/metrics").json()["groq_usage"]["requests"] - before
+        return np.array(latencies), calls / requests
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=2, help="Pages in the generated resume PDF")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Mock time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="Mock generation speed")
+    parser.add_argument("--mock-groq-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mock_groq_port:
+        import uvicorn
+        uvicorn.run(mock_groq_app(args.ttft, args.tokens_per_second), port=args.mock_groq_port, log_level="warning")
+        return
+
+    mock_port = free_port()
+    mock = start([os.path.abspath(__file__), "--mock-groq-port", str(mock_port), "--ttft", str(args.ttft),
+                  "--tokens-per-second", str(args.tokens_per_second)])
+    payload = {"filename": "resume.pdf", "file_base64": base64.b64encode(make_pdf(args.pages)).decode()}
+    try:
+        wait_for(f"http://127.0.0.1:{mock_port}/docs")
+        print(f"requests={args.requests} pages={args.pages} ttft={args.ttft}s "
+              f"tokens/s={args.tokens_per_second:g}\n")
+        print(f"{'mode':<10} {'calls':>6} {'mean s':>8} {'p50 s':>8} {'p95 s':>8}")
+        results = {}
+        for mode in ("separate", "combined"):
+            latencies, calls = run_mode(mode, f"http://127.0.0.1:{mock_port}", payload, args.requests)
+            results[mode] = latencies.mean()
+            print(f"{mode:<10} {calls:>6.1f} {latencies.mean():>8.2f} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 95):>8.2f}")
+        print(f"\ncombined saves {1 - results['combined'] / results['separate']:.0%} of upload latency")
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+if __name__ == "__main__":
+    main()
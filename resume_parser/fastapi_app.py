@@ -5,19 +5,32 @@ parses them using Groq LLM, and returns structured JSON.
 No database operations - just parsing and returning data.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
+import asyncio
 import base64
-import tempfile
-import pdfplumber
-from docx import Document as DocxDocument
-import requests
 import json
-import re
+import time
 from dotenv import load_dotenv
+import httpx
+
+from app.executors import cpu_pool, executor_stats, run_io, shutdown_executors
+from managix_common.groq_client import (
+    DEFAULT_MODEL, GroqError, aclose, chat_completion, message_content, stream_chat_completion, usage_scope,
+    usage_totals,
+)
+from managix_common.json_repair import parse_json_object
+from managix_common.structured_output import structured_completion
+from app.incremental_json import IncrementalJSONParser, iter_partial_json, ndjson_event
+from app.parse_cache import bypass_requested, get_parse_cache
+from app.prompt_budget import budget_resume_prompt, budget_stats
+from managix_common.rate_limit import rate_limit_stats
+from app.resume_summary import SUMMARY_TOKENS, parse_prompt_version, summary_instructions
+from app.text_extraction import extract_text_parallel, extract_text_pooled
 
 load_dotenv()
 
@@ -33,6 +46,11 @@ app.add_middleware(
 )
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Bump when the parse prompt changes so cached parses are not reused
+PARSE_PROMPT_VERSION = parse_prompt_version("fastapi-parse-v3")
+# /parse-resumes/batch: files per request, and parses (Groq calls) in flight per batch
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
 
 # ===================== Models =====================
 
@@ -66,270 +84,23 @@ class ResumeUploadRequest(BaseModel):
     filename: str
     file_base64: str
 
-# ===================== Helper Functions =====================
+class ResumeBatchRequest(BaseModel):
+    files: List[ResumeUploadRequest]
 
-def extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
-    """Extract text from PDF bytes"""
-    resume_text = ''
-    tmp_path = None
-    
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
-        
-        print(f"[DEBUG] Created temporary PDF file: {tmp_path}")
-        
-        with pdfplumber.open(tmp_path) as pdf:
-            print(f"[DEBUG] PDF has {len(pdf.pages)} pages")
-            for i, page in enumerate(pdf.pages):
-                try:
-                    text = page.extract_text()
-                    if text:
-                        resume_text += text + '\n'
-                        print(f"[DEBUG] Extracted {len(text)} characters from page {i+1}")
-                except Exception as e:
-                    print(f"[WARNING] Failed to extract text from page {i+1}: {str(e)}")
-                    continue
-    except Exception as e:
-        print(f"[ERROR] PDF extraction failed: {str(e)}")
-        raise Exception(f"Failed to extract text from PDF: {str(e)}")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.unlink(tmp_path)
-                print(f"[DEBUG] Cleaned up temporary file: {tmp_path}")
-            except:
-                pass
-    
-    return resume_text.strip()
-
-def extract_text_from_docx_bytes(file_bytes: bytes) -> str:
-    """Extract text from DOCX bytes"""
-    resume_text = ''
-    tmp_path = None
-    
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
-        
-        print(f"[DEBUG] Created temporary DOCX file: {tmp_path}")
-        
-        doc = DocxDocument(tmp_path)
-        print(f"[DEBUG] DOCX has {len(doc.paragraphs)} paragraphs")
-        
-        for para in doc.paragraphs:
-            if para.text:
-                resume_text += para.text + '\n'
-        
-        print(f"[DEBUG] Extracted {len(resume_text)} characters from DOCX")
-    except Exception as e:
-        print(f"[ERROR] DOCX extraction failed: {str(e)}")
-        raise Exception(f"Failed to extract text from DOCX: {str(e)}")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.unlink(tmp_path)
-                print(f"[DEBUG] Cleaned up temporary file: {tmp_path}")
-            except:
-                pass
-    
-    return resume_text.strip()
-
-def extract_text_from_resume(filename: str, file_bytes: bytes) -> str:
-    """Extract text based on file extension"""
-    file_type = filename.split('.')[-1].lower()
-    
-    if file_type == 'pdf':
-        return extract_text_from_pdf_bytes(file_bytes)
-    elif file_type == 'docx':
-        return extract_text_from_docx_bytes(file_bytes)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
+# ===================== Helper Functions =====================
 
 def extract_json_from_groq_response(response_text: str) -> dict:
-    """Extract JSON from Groq response (handles markdown code blocks and text before JSON)"""
-    if not response_text:
-        print("[WARNING] Empty response text from Groq")
-        return {}
-    
-    text = response_text.strip()
-    original_text = text
-    
-    # Strategy 1: Look for JSON in markdown code blocks first (most reliable)
-    # Handle both complete and incomplete code blocks
-    if "```json" in text or "```" in text:
-        # Find all code block markers
-        code_blocks = list(re.finditer(r'```(?:json)?', text))
-        if code_blocks:
-            # Extract content from first code block
-            start_marker = code_blocks[0].end()
-            # Find the next ``` after start_marker, or use end of text if not found
-            end_marker = text.find("```", start_marker)
-            if end_marker == -1:
-                # No closing ```, use end of text (incomplete JSON from Groq)
-                end_marker = len(text)
-                print("[DEBUG] No closing ``` found, using end of text (JSON might be incomplete)")
-            
-            text = text[start_marker:end_marker].strip()
-            print("[DEBUG] Extracted JSON from markdown code block")
-    
-    text = text.strip()
-    
-    # Strategy 3: Find JSON object boundaries by matching braces (handles text before JSON)
-    if not text.startswith("{"):
-        start_idx = text.find("{")
-        if start_idx != -1:
-            # Count braces to find the matching closing brace
-            brace_count = 0
-            end_idx = -1
-            for i in range(start_idx, len(text)):
-                if text[i] == '{':
-                    brace_count += 1
-                elif text[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_idx = i
-                        break
-            
-            if end_idx != -1 and end_idx > start_idx:
-                text = text[start_idx:end_idx+1]
-                print("[DEBUG] Extracted JSON object from text with prefix (handled nested braces)")
-    
-    text = text.strip()
-    
-    # Strategy 4: Try to parse as-is
-    try:
-        parsed = json.loads(text)
+    """Extract JSON from Groq response (handles markdown code blocks, text around the JSON and truncation)"""
+    parsed = parse_json_object(response_text)
+    if parsed:
         print(f"[DEBUG] Successfully parsed JSON with {len(parsed)} top-level keys")
-        return parsed
-    except json.JSONDecodeError as e:
-        print(f"[WARNING] Initial JSON parse failed: {str(e)} at position {e.pos}")
-        print(f"[DEBUG] Text around error (chars {max(0, e.pos-100)} to {min(len(text), e.pos+100)}):")
-        print(f"  ...{text[max(0, e.pos-100):e.pos+100]}...")
-        
-        # Strategy 5: Fix common JSON issues
-        try:
-            fixed_text = text
-            # Remove trailing commas
-            fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-            # Fix unclosed strings (if any)
-            # Remove any text after the last }
-            last_brace = fixed_text.rfind('}')
-            if last_brace != -1:
-                fixed_text = fixed_text[:last_brace+1]
-            
-            parsed = json.loads(fixed_text)
-            print("[DEBUG] Successfully parsed after fixing JSON issues (trailing commas, etc.)")
-            return parsed
-        except json.JSONDecodeError as e2:
-            print(f"[ERROR] JSON decode error after fixes: {str(e2)} at position {e2.pos}")
-            
-            # Strategy 6: Try progressive truncation from the end
-            # Sometimes Groq returns incomplete JSON or extra text
-            brace_start = text.find('{')
-            if brace_start != -1:
-                print(f"[DEBUG] Attempting progressive truncation from position {len(text)}")
-                # Try different end positions, starting from the last } and working backwards
-                last_brace = text.rfind('}')
-                if last_brace != -1:
-                    # Try parsing from first { to last }
-                    try:
-                        potential_json = text[brace_start:last_brace+1]
-                        parsed = json.loads(potential_json)
-                        print(f"[DEBUG] Successfully parsed by using first {{ to last }}")
-                        return parsed
-                    except:
-                        pass
-                
-                # Try truncating character by character from the end
-                for truncate_pos in range(len(text), brace_start + 50, -1):
-                    try:
-                        potential_json = text[brace_start:truncate_pos]
-                        # Check if it's valid JSON structure
-                        if potential_json.count('{') == potential_json.count('}'):
-                            parsed = json.loads(potential_json)
-                            print(f"[DEBUG] Successfully parsed by truncating to position {truncate_pos}")
-                            return parsed
-                    except:
-                        continue
-            
-            # Strategy 7: Try to fix incomplete JSON by closing arrays/objects intelligently
-            try:
-                fixed_text = text
-                
-                # Remove trailing commas first
-                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-                
-                # Count unclosed brackets/braces
-                open_braces = fixed_text.count('{') - fixed_text.count('}')
-                open_brackets = fixed_text.count('[') - fixed_text.count(']')
-                
-                # If we have unclosed structures, try to fix them
-                if open_braces > 0 or open_brackets > 0:
-                    # Find where the JSON is incomplete and close it properly
-                    # Close brackets first (they're inside objects), then braces
-                    if open_brackets > 0:
-                        # Find the last unclosed array
-                        last_open_bracket = fixed_text.rfind('[')
-                        if last_open_bracket != -1:
-                            # Check if it has content
-                            after_bracket = fixed_text[last_open_bracket+1:].strip()
-                            if after_bracket and not after_bracket.startswith(']'):
-                                # There's content, need to close the array
-                                # Find a safe place to insert ]
-                                # Look for the last complete item before the truncation
-                                fixed_text = fixed_text.rstrip()
-                                if not fixed_text.endswith(']'):
-                                    fixed_text += ']'
-                                    open_brackets -= 1
-                    
-                    # Close braces
-                    if open_braces > 0:
-                        fixed_text = fixed_text.rstrip()
-                        if not fixed_text.endswith('}'):
-                            # Find where to close - before the last incomplete structure
-                            fixed_text += '\n' + '}' * open_braces
-                    
-                    # Close remaining brackets
-                    if open_brackets > 0:
-                        fixed_text += '\n' + ']' * open_brackets
-                
-                # Remove any trailing commas again after closing
-                fixed_text = re.sub(r',(\s*[}\]])', r'\1', fixed_text)
-                
-                parsed = json.loads(fixed_text)
-                print(f"[DEBUG] Successfully parsed after closing {open_braces} braces and {open_brackets} brackets")
-                return parsed
-            except Exception as e3:
-                print(f"[WARNING] Failed to fix incomplete JSON: {str(e3)}")
-                import traceback
-                print(f"[DEBUG] Traceback: {traceback.format_exc()}")
-            
-            # Strategy 8: Last resort - try to extract partial data and return what we can
-            print(f"[ERROR] All JSON extraction strategies failed")
-            print(f"[DEBUG] Full response text length: {len(original_text)}")
-            print(f"[DEBUG] First 1000 chars of original: {original_text[:1000]}")
-            print(f"[DEBUG] Last 500 chars of original: {original_text[-500:]}")
-            print(f"[DEBUG] Extracted text length: {len(text)}")
-            print(f"[DEBUG] First 1000 chars of extracted: {text[:1000]}")
-            
-            # Return empty dict so caller can handle gracefully
-            return {}
-
-def call_groq_llm(resume_text: str) -> dict:
-    """Send text to Groq LLM for JSON parsing"""
-    if not GROQ_API_KEY:
-        print("[ERROR] GROQ_API_KEY not set in environment")
-        raise ValueError("GROQ_API_KEY not set in environment")
-    
-    if not resume_text or not resume_text.strip():
-        print("[ERROR] Resume text is empty")
-        raise ValueError("Resume text is empty")
-    
-    print(f"[DEBUG] Sending {len(resume_text)} characters to Groq API")
-    
+    else:
+        print("[ERROR] No JSON object could be recovered from the Groq response")
+        print(f"[DEBUG] First 1000 chars of response: {(response_text or '')[:1000]}")
+    return parsed
+
+def build_parse_messages(resume_text: str) -> list:
+    """Chat messages asking Groq to parse resume_text into ParsedResumeData JSON"""
     prompt = f"""Parse the following resume text and return ONLY a complete, valid JSON object. Do not add any explanatory text, comments, or markdown formatting.
 
 Required JSON structure:
@@ -369,52 +140,71 @@ CRITICAL REQUIREMENTS:
 - All arrays and objects must be properly closed
 - All strings must be properly quoted
 - For skills: return a flat array of strings like ["Python", "Java"], not objects
-
+{summary_instructions("summary", only_if_missing=True)}
 Resume text to parse:
 {resume_text}
 
 Return the JSON now:"""
     
-    headers = {
-        'Authorization': f'Bearer {GROQ_API_KEY}',
-        'Content-Type': 'application/json'
-    }
+    return [
+        {'role': 'system', 'content': 'You are a helpful assistant. Always return complete, valid JSON. Never truncate your response.'},
+        {'role': 'user', 'content': prompt}
+    ]
+
+async def lookup_parse_cache(resume_text: str, use_cache: bool = True):
+    """
+    Validate the parse input and consult the parse cache.
+    Returns (cache, cache_key, cached_parse_or_None); cache is None when disabled.
+    The sqlite work runs on the I/O pool, not the event loop.
+    """
+    if not GROQ_API_KEY:
+        print("[ERROR] GROQ_API_KEY not set in environment")
+        raise ValueError("GROQ_API_KEY not set in environment")
     
-    data = {
-        'messages': [
-            {'role': 'system', 'content': 'You are a helpful assistant. Always return complete, valid JSON. Never truncate your response.'},
-            {'role': 'user', 'content': prompt}
-        ],
-        'model': 'llama-3.1-8b-instant',
-        'max_tokens': 4096  # Increased to prevent truncation
-    }
+    if not resume_text or not resume_text.strip():
+        print("[ERROR] Resume text is empty")
+        raise ValueError("Resume text is empty")
+    
+    cache = await run_io(get_parse_cache)
+    cache_key = cache.key(resume_text, PARSE_PROMPT_VERSION, DEFAULT_MODEL) if cache else None
+    if cache is not None:
+        if use_cache:
+            cached = await run_io(cache.get, cache_key)
+            if cached is not None:
+                print("[DEBUG] Parse cache hit, skipping Groq call")
+                return cache, cache_key, cached
+        else:
+            cache.note_bypass()
+    
+    return cache, cache_key, None
+
+async def call_groq_llm(resume_text: str, use_cache: bool = True) -> dict:
+    """
+    Send text to Groq LLM for JSON parsing. Parses are cached by resume
+    text, prompt version and model; use_cache=False skips the lookup and
+    refreshes the entry.
+    """
+    resume_text, max_tokens = budget_resume_prompt(resume_text, SUMMARY_TOKENS)
+    cache, cache_key, cached = await lookup_parse_cache(resume_text, use_cache)
+    if cached is not None:
+        return cached
+    
+    print(f"[DEBUG] Sending {len(resume_text)} characters to Groq API")
+    messages = build_parse_messages(resume_text)
     
     try:
         print("[DEBUG] Making request to Groq API...")
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers=headers,
-            json=data,
-            timeout=60
+        # JSON mode + ParsedResumeData validation; a truncated answer is continued, not regenerated
+        parsed_json, info = await structured_completion(
+            messages,
+            ParsedResumeData,
+            max_tokens=max_tokens,
+            api_key=GROQ_API_KEY
         )
-        print(f"[DEBUG] Groq API response status: {response.status_code}")
-        response.raise_for_status()
-        
-        response_data = response.json()
-        if 'choices' not in response_data or not response_data['choices']:
-            print("[ERROR] Groq response missing 'choices'")
-            raise ValueError("Invalid response from Groq API: missing choices")
-        
-        content = response_data['choices'][0]['message']['content']
-        print(f"[DEBUG] Groq returned {len(content)} characters of content")
-        
-        # Check if response was truncated (Groq stops at max_tokens)
-        if 'finish_reason' in response_data['choices'][0]:
-            finish_reason = response_data['choices'][0]['finish_reason']
-            if finish_reason == 'length':
-                print("[WARNING] Groq response was truncated (hit max_tokens limit). JSON may be incomplete.")
-        
-        parsed_json = extract_json_from_groq_response(content)
+        content = info["content"]
+        truncated = info["truncated"]
+        print(f"[DEBUG] Groq returned {len(content)} characters of content "
+              f"(validated={info['validated']}, continuations={info['continuations']})")
         
         if not parsed_json:
             print("[ERROR] Failed to extract JSON from Groq response")
@@ -423,8 +213,10 @@ Return the JSON now:"""
             raise ValueError("Groq returned empty or invalid JSON. The response may have been truncated.")
         
         print(f"[DEBUG] Successfully parsed JSON with {len(parsed_json)} keys")
+        if cache is not None and not truncated:
+            await run_io(cache.put, cache_key, parsed_json)
         return parsed_json
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, GroqError) as e:
         print(f"[ERROR] Groq API request failed: {str(e)}")
         raise Exception(f"Groq API request error: {str(e)}")
     except KeyError as e:
@@ -434,7 +226,40 @@ Return the JSON now:"""
         print(f"[ERROR] Groq API error: {str(e)}")
         raise Exception(f"Groq API error: {str(e)}")
 
-def generate_summary_with_groq(parsed_json: dict) -> str:
+async def stream_groq_llm(resume_text: str, use_cache: bool = True):
+    """
+    Streaming call_groq_llm: yields ("partial", dict) with the fields Groq
+    has fully generated so far, then ("final", dict) with the complete parse.
+    A cache hit yields only the final parse.
+    """
+    resume_text, max_tokens = budget_resume_prompt(resume_text, SUMMARY_TOKENS)
+    cache, cache_key, cached = await lookup_parse_cache(resume_text, use_cache)
+    if cached is not None:
+        yield "final", cached
+        return
+    
+    print(f"[DEBUG] Streaming {len(resume_text)} characters through Groq API")
+    parser = IncrementalJSONParser()
+    chunks = stream_chat_completion(build_parse_messages(resume_text), max_tokens=max_tokens, api_key=GROQ_API_KEY)
+    content = ""
+    async for kind, value in iter_partial_json(chunks, parser=parser):
+        if kind == "partial":
+            yield "partial", value
+        else:
+            content = value
+    
+    print(f"[DEBUG] Groq streamed {len(content)} characters of content")
+    if not parser.done:
+        print("[WARNING] Groq stream ended before the JSON object was closed. JSON may be incomplete.")
+    parsed_json = extract_json_from_groq_response(content)
+    if not parsed_json:
+        print(f"[DEBUG] Raw Groq content (first 1000 chars): {content[:1000]}")
+        raise ValueError("Groq returned empty or invalid JSON. The response may have been truncated.")
+    if cache is not None and parser.done:
+        await run_io(cache.put, cache_key, parsed_json)
+    yield "final", parsed_json
+
+async def generate_summary_with_groq(parsed_json: dict) -> str:
     """Generate a professional summary using Groq"""
     if not GROQ_API_KEY:
         return "Experienced professional with relevant technical expertise."
@@ -456,35 +281,100 @@ Guidelines:
 - Output only the summary text.
 """
     
-    headers = {
-        'Authorization': f'Bearer {GROQ_API_KEY}',
-        'Content-Type': 'application/json'
-    }
-    
-    data = {
-        'messages': [
-            {'role': 'system', 'content': 'You are a helpful assistant.'},
-            {'role': 'user', 'content': prompt}
-        ],
-        'model': 'llama-3.1-8b-instant',
-        'max_tokens': 150
-    }
+    messages = [
+        {'role': 'system', 'content': 'You are a helpful assistant.'},
+        {'role': 'user', 'content': prompt}
+    ]
     
     try:
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        response.raise_for_status()
-        content = response.json()['choices'][0]['message']['content']
-        return content.strip()
+        response_data = await chat_completion(messages, max_tokens=150, api_key=GROQ_API_KEY)
+        return message_content(response_data).strip()
     except:
         return "Experienced professional with relevant technical expertise."
 
+def normalize_parsed_resume(parsed_json: dict) -> dict:
+    """Fill defaults, flatten skills and drop unknown fields so the result fits ParsedResumeData"""
+    # Ensure all required fields exist with defaults
+    parsed_json.setdefault("name", "")
+    parsed_json.setdefault("email", "")
+    parsed_json.setdefault("phone", "")
+    parsed_json.setdefault("summary", "")
+    parsed_json.setdefault("education", [])
+    parsed_json.setdefault("skills", [])
+    parsed_json.setdefault("projects", [])
+    parsed_json.setdefault("experience", [])
+
+    # Transform skills if they come as objects/dictionaries from Groq
+    # Groq sometimes returns: [{"category": "...", "language": "...", "details": ["skill1", "skill2"]}]
+    # We need: ["skill1", "skill2", "skill3", ...] - flat list of strings
+    if "skills" in parsed_json and parsed_json["skills"]:
+        original_skills_count = len(parsed_json["skills"])
+        flattened_skills = []
+        for skill_item in parsed_json["skills"]:
+            if isinstance(skill_item, str):
+                # Already a string, keep it
+                flattened_skills.append(skill_item.strip())
+            elif isinstance(skill_item, dict):
+                # Extract from "details" array if present (this is the main source of skills)
+                if "details" in skill_item and isinstance(skill_item["details"], list):
+                    flattened_skills.extend([str(s).strip() for s in skill_item["details"] if s and str(s).strip()])
+                # Also extract from "language" field if it's a skill name (not a category)
+                if "language" in skill_item and skill_item["language"]:
+                    lang = str(skill_item["language"]).strip()
+                    # Skip generic category names
+                    generic_categories = ["programming languages", "web & frameworks", "databases", "tools & platforms", "networking", "other skills"]
+                    if lang.lower() not in generic_categories:
+                        flattened_skills.append(lang)
+        # Remove duplicates while preserving order, and filter out empty strings
+        seen = set()
+        unique_skills = []
+        for skill in flattened_skills:
+            if skill:
+                skill_lower = skill.lower().strip()
+                if skill_lower and skill_lower not in seen:
+                    seen.add(skill_lower)
+                    unique_skills.append(skill.strip())
+        parsed_json["skills"] = unique_skills
+        print(f"[DEBUG] Flattened skills: {original_skills_count} skill groups → {len(parsed_json['skills'])} individual skills")
+
+    # Remove extra fields that Groq might return but we don't need (LinkedIn, GitHub, etc.)
+    # Keep only the fields we expect
+    allowed_fields = ["name", "email", "phone", "summary", "education", "skills", "projects", "experience"]
+    parsed_json = {k: v for k, v in parsed_json.items() if k in allowed_fields}
+
+    # Ensure lists contain proper objects
+    if "education" in parsed_json and parsed_json["education"]:
+        parsed_json["education"] = [
+            {**item, "degree": item.get("degree", "") or "", "institution": item.get("institution", "") or "", 
+             "year": item.get("year", "") or "", "details": item.get("details", "") or ""}
+            if isinstance(item, dict) else {"degree": "", "institution": "", "year": "", "details": ""}
+            for item in parsed_json["education"]
+        ]
+
+    if "projects" in parsed_json and parsed_json["projects"]:
+        parsed_json["projects"] = [
+            {**item, "title": item.get("title", "") or "", "description": item.get("description", "") or ""}
+            if isinstance(item, dict) else {"title": "", "description": ""}
+            for item in parsed_json["projects"]
+        ]
+
+    if "experience" in parsed_json and parsed_json["experience"]:
+        parsed_json["experience"] = [
+            {**item, "title": item.get("title", "") or "", "company": item.get("company", "") or "",
+             "duration": item.get("duration", "") or "", "description": item.get("description", "") or ""}
+            if isinstance(item, dict) else {"title": "", "company": "", "duration": "", "description": ""}
+            for item in parsed_json["experience"]
+        ]
+    
+    return parsed_json
+
 # ===================== API Endpoints =====================
 
+@app.on_event("shutdown")
+async def release_clients():
+    await aclose()
+    shutdown_executors()
+
 @app.get("/")
 def read_root():
     """Health check endpoint"""
@@ -494,52 +384,123 @@ def read_root():
         "version": "1.0.0"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Groq token usage, prompt compaction, parse cache and executor counters"""
+    parse_cache = await run_io(get_parse_cache)
+    return {
+        "groq_usage": usage_totals(),
+        "prompt_budget": budget_stats(),
+        "parse_cache": await run_io(parse_cache.stats) if parse_cache else None,
+        "executors": executor_stats(),
+        "rate_limit": rate_limit_stats(),
+    }
+
+def set_usage_headers(response: Response, usage: dict):
+    """Per-request Groq token counts as X-Groq-* response headers"""
+    response.headers["X-Groq-Requests"] = str(usage["requests"])
+    response.headers["X-Groq-Prompt-Tokens"] = str(usage["prompt_tokens"])
+    response.headers["X-Groq-Completion-Tokens"] = str(usage["completion_tokens"])
+    response.headers["X-Groq-Max-Tokens"] = str(usage["max_tokens"])
+
+async def read_resume_upload(request: ResumeUploadRequest, extract=extract_text_parallel) -> str:
+    """Validate an upload, decode it and extract its text (raises HTTPException 400)"""
+    # Validate inputs
+    if not request.filename:
+        raise HTTPException(status_code=400, detail="Filename is required")
+    if not request.file_base64:
+        raise HTTPException(status_code=400, detail="File base64 content is required")
+    
+    # Decode base64 file
+    try:
+        print(f"[DEBUG] Decoding base64 file (length: {len(request.file_base64)})")
+        file_bytes = base64.b64decode(request.file_base64)
+        print(f"[DEBUG] Decoded file size: {len(file_bytes)} bytes")
+    except Exception as e:
+        print(f"[ERROR] Base64 decode failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid base64 encoding: {str(e)}")
+    
+    # Extract text from resume
+    try:
+        print(f"[DEBUG] Extracting text from {request.filename}")
+        # pdfplumber/python-docx are CPU-bound: pages are extracted in the process pool
+        resume_text = await extract(request.filename, file_bytes)
+        print(f"[DEBUG] Extracted text length: {len(resume_text)} characters")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Text extraction failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to extract text from file: {str(e)}")
+    
+    if not resume_text or not resume_text.strip():
+        print("[ERROR] No text extracted from resume")
+        raise HTTPException(status_code=400, detail="No text could be extracted from the resume")
+    
+    return resume_text
+
+async def finalize_parsed_resume(parsed_json: dict) -> ParsedResumeData:
+    """Fill in a missing summary, normalize and validate a complete parse"""
+    # Generate summary if not present or empty (combined mode asks for it in
+    # the parse itself, so this second call is the fallback)
+    if not parsed_json.get("summary") or not str(parsed_json.get("summary", "")).strip():
+        try:
+            print("[DEBUG] Generating summary with Groq")
+            summary = await generate_summary_with_groq(parsed_json)
+            parsed_json["summary"] = summary if summary else "Experienced professional with relevant technical expertise."
+        except Exception as e:
+            print(f"[WARNING] Summary generation failed: {str(e)}, using default")
+            parsed_json["summary"] = "Experienced professional with relevant technical expertise."
+    
+    parsed_json = normalize_parsed_resume(parsed_json)
+    
+    # Convert to Pydantic model for validation
+    try:
+        print("[DEBUG] Converting to Pydantic model")
+        result = ParsedResumeData(**parsed_json)
+        print("[DEBUG] Successfully created Pydantic model")
+        return result
+    except Exception as e:
+        print(f"[ERROR] Pydantic validation failed: {str(e)}")
+        print(f"[DEBUG] Parsed JSON that failed validation: {json.dumps(parsed_json, indent=2)}")
+        raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
+
 @app.post("/parse-resume", response_model=ParsedResumeData)
-async def parse_resume(request: ResumeUploadRequest):
+async def parse_resume(
+    request: ResumeUploadRequest,
+    response: Response,
+    x_parse_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None),
+):
     """
     Parse a resume file and return structured JSON data.
     
     Args:
         request: Contains filename and base64-encoded file content
+        x_parse_cache / cache_control: "bypass" / "no-cache" skips the parse cache
     
     Returns:
-        ParsedResumeData: Structured resume data
+        ParsedResumeData: Structured resume data; the X-Groq-* headers carry
+        the tokens this request used (0 on a parse cache hit)
     """
+    with usage_scope() as usage:
+        result = await parse_resume_upload(request, x_parse_cache, cache_control)
+    set_usage_headers(response, usage)
+    return result
+
+async def parse_resume_upload(request: ResumeUploadRequest, x_parse_cache: Optional[str],
+                                  cache_control: Optional[str]) -> ParsedResumeData:
+    """The /parse-resume pipeline: extract, parse with Groq, finalize"""
     try:
         print(f"[DEBUG] Received request to parse resume: {request.filename}")
         
-        # Validate inputs
-        if not request.filename:
-            raise HTTPException(status_code=400, detail="Filename is required")
-        if not request.file_base64:
-            raise HTTPException(status_code=400, detail="File base64 content is required")
-        
-        # Decode base64 file
-        try:
-            print(f"[DEBUG] Decoding base64 file (length: {len(request.file_base64)})")
-            file_bytes = base64.b64decode(request.file_base64)
-            print(f"[DEBUG] Decoded file size: {len(file_bytes)} bytes")
-        except Exception as e:
-            print(f"[ERROR] Base64 decode failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid base64 encoding: {str(e)}")
-        
-        # Extract text from resume
-        try:
-            print(f"[DEBUG] Extracting text from {request.filename}")
-            resume_text = extract_text_from_resume(request.filename, file_bytes)
-            print(f"[DEBUG] Extracted text length: {len(resume_text)} characters")
-        except Exception as e:
-            print(f"[ERROR] Text extraction failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Failed to extract text from file: {str(e)}")
-        
-        if not resume_text or not resume_text.strip():
-            print("[ERROR] No text extracted from resume")
-            raise HTTPException(status_code=400, detail="No text could be extracted from the resume")
+        resume_text = await read_resume_upload(request)
         
         # Parse with Groq LLM
         try:
             print("[DEBUG] Calling Groq LLM to parse resume")
-            parsed_json = call_groq_llm(resume_text)
+            parsed_json = await call_groq_llm(
+                resume_text, use_cache=not bypass_requested(x_parse_cache, cache_control)
+            )
             print(f"[DEBUG] Groq returned JSON with keys: {list(parsed_json.keys())}")
         except Exception as e:
             print(f"[ERROR] Groq LLM call failed: {str(e)}")
@@ -549,98 +510,7 @@ async def parse_resume(request: ResumeUploadRequest):
             print("[ERROR] Groq returned empty JSON")
             raise HTTPException(status_code=500, detail="AI parsing returned empty results")
         
-        # Generate summary if not present or empty
-        if not parsed_json.get("summary") or not str(parsed_json.get("summary", "")).strip():
-            try:
-                print("[DEBUG] Generating summary with Groq")
-                summary = generate_summary_with_groq(parsed_json)
-                parsed_json["summary"] = summary if summary else "Experienced professional with relevant technical expertise."
-            except Exception as e:
-                print(f"[WARNING] Summary generation failed: {str(e)}, using default")
-                parsed_json["summary"] = "Experienced professional with relevant technical expertise."
-        
-        # Ensure all required fields exist with defaults
-        parsed_json.setdefault("name", "")
-        parsed_json.setdefault("email", "")
-        parsed_json.setdefault("phone", "")
-        parsed_json.setdefault("summary", "")
-        parsed_json.setdefault("education", [])
-        parsed_json.setdefault("skills", [])
-        parsed_json.setdefault("projects", [])
-        parsed_json.setdefault("experience", [])
-        
-        # Transform skills if they come as objects/dictionaries from Groq
-        # Groq sometimes returns: [{"category": "...", "language": "...", "details": ["skill1", "skill2"]}]
-        # We need: ["skill1", "skill2", "skill3", ...] - flat list of strings
-        if "skills" in parsed_json and parsed_json["skills"]:
-            original_skills_count = len(parsed_json["skills"])
-            flattened_skills = []
-            for skill_item in parsed_json["skills"]:
-                if isinstance(skill_item, str):
-                    # Already a string, keep it
-                    flattened_skills.append(skill_item.strip())
-                elif isinstance(skill_item, dict):
-                    # Extract from "details" array if present (this is the main source of skills)
-                    if "details" in skill_item and isinstance(skill_item["details"], list):
-                        flattened_skills.extend([str(s).strip() for s in skill_item["details"] if s and str(s).strip()])
-                    # Also extract from "language" field if it's a skill name (not a category)
-                    if "language" in skill_item and skill_item["language"]:
-                        lang = str(skill_item["language"]).strip()
-                        # Skip generic category names
-                        generic_categories = ["programming languages", "web & frameworks", "databases", "tools & platforms", "networking", "other skills"]
-                        if lang.lower() not in generic_categories:
-                            flattened_skills.append(lang)
-            # Remove duplicates while preserving order, and filter out empty strings
-            seen = set()
-            unique_skills = []
-            for skill in flattened_skills:
-                if skill:
-                    skill_lower = skill.lower().strip()
-                    if skill_lower and skill_lower not in seen:
-                        seen.add(skill_lower)
-                        unique_skills.append(skill.strip())
-            parsed_json["skills"] = unique_skills
-            print(f"[DEBUG] Flattened skills: {original_skills_count} skill groups → {len(parsed_json['skills'])} individual skills")
-        
-        # Remove extra fields that Groq might return but we don't need (LinkedIn, GitHub, etc.)
-        # Keep only the fields we expect
-        allowed_fields = ["name", "email", "phone", "summary", "education", "skills", "projects", "experience"]
-        parsed_json = {k: v for k, v in parsed_json.items() if k in allowed_fields}
-        
-        # Ensure lists contain proper objects
-        if "education" in parsed_json and parsed_json["education"]:
-            parsed_json["education"] = [
-                {**item, "degree": item.get("degree", "") or "", "institution": item.get("institution", "") or "", 
-                 "year": item.get("year", "") or "", "details": item.get("details", "") or ""}
-                if isinstance(item, dict) else {"degree": "", "institution": "", "year": "", "details": ""}
-                for item in parsed_json["education"]
-            ]
-        
-        if "projects" in parsed_json and parsed_json["projects"]:
-            parsed_json["projects"] = [
-                {**item, "title": item.get("title", "") or "", "description": item.get("description", "") or ""}
-                if isinstance(item, dict) else {"title": "", "description": ""}
-                for item in parsed_json["projects"]
-            ]
-        
-        if "experience" in parsed_json and parsed_json["experience"]:
-            parsed_json["experience"] = [
-                {**item, "title": item.get("title", "") or "", "company": item.get("company", "") or "",
-                 "duration": item.get("duration", "") or "", "description": item.get("description", "") or ""}
-                if isinstance(item, dict) else {"title": "", "company": "", "duration": "", "description": ""}
-                for item in parsed_json["experience"]
-            ]
-        
-        # Convert to Pydantic model for validation
-        try:
-            print("[DEBUG] Converting to Pydantic model")
-            result = ParsedResumeData(**parsed_json)
-            print("[DEBUG] Successfully created Pydantic model")
-            return result
-        except Exception as e:
-            print(f"[ERROR] Pydantic validation failed: {str(e)}")
-            print(f"[DEBUG] Parsed JSON that failed validation: {json.dumps(parsed_json, indent=2)}")
-            raise HTTPException(status_code=500, detail=f"Data validation error: {str(e)}")
+        return await finalize_parsed_resume(parsed_json)
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -655,6 +525,131 @@ async def parse_resume(request: ResumeUploadRequest):
         print(f"[ERROR] Traceback: {error_trace}")
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
 
+async def stream_parse_events(resume_text: str, use_cache: bool):
+    """NDJSON events for /parse-resume/stream (see its docstring)."""
+    try:
+        async for kind, parsed_json in stream_groq_llm(resume_text, use_cache):
+            if kind == "partial":
+                try:
+                    partial = ParsedResumeData(**normalize_parsed_resume(parsed_json))
+                except Exception:
+                    continue  # a list item with the wrong shape; the next snapshot may fit
+                yield ndjson_event("partial", data=partial.model_dump())
+            else:
+                result = await finalize_parsed_resume(parsed_json)
+                yield ndjson_event("final", data=result.model_dump())
+    except HTTPException as e:
+        yield ndjson_event("error", detail=e.detail)
+    except (httpx.HTTPError, GroqError) as e:
+        print(f"[ERROR] Groq API request failed: {str(e)}")
+        yield ndjson_event("error", detail=f"Groq API request error: {str(e)}")
+    except Exception as e:
+        print(f"[ERROR] Streaming parse failed: {str(e)}")
+        yield ndjson_event("error", detail=f"Failed to parse resume with AI: {str(e)}")
+
+@app.post("/parse-resume/stream")
+async def parse_resume_stream(
+    request: ResumeUploadRequest,
+    x_parse_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None),
+):
+    """
+    Streaming variant of /parse-resume. Returns application/x-ndjson, one
+    event per line, so clients can render fields while Groq is still
+    generating:
+    
+        {"event": "partial", "data": {...}}   ParsedResumeData with the fields generated so far
+        {"event": "final", "data": {...}}     same body as /parse-resume
+        {"event": "error", "detail": "..."}   parsing failed after streaming began
+    
+    Upload problems (missing fields, bad base64, no extractable text) are
+    still reported as plain 400 responses before the stream starts.
+    """
+    print(f"[DEBUG] Received request to stream-parse resume: {request.filename}")
+    resume_text = await read_resume_upload(request)
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=400, detail="GROQ_API_KEY not set in environment")
+    return StreamingResponse(
+        stream_parse_events(resume_text, not bypass_requested(x_parse_cache, cache_control)),
+        media_type="application/x-ndjson",
+    )
+
+async def parse_batch_item(index: int, upload: ResumeUploadRequest, use_cache: bool,
+                           extract_slots: asyncio.Semaphore, parse_slots: asyncio.Semaphore):
+    """Parse one batch file. Returns (succeeded, NDJSON event); never raises"""
+    try:
+        async with extract_slots:
+            resume_text = await read_resume_upload(upload, extract_text_pooled)
+        async with parse_slots:
+            # Cache lookup first; only real Groq requests wait for the rate limiter (in groq_client)
+            parsed_json = await call_groq_llm(resume_text, use_cache=use_cache)
+            if not parsed_json:
+                raise ValueError("AI parsing returned empty results")
+            result = await finalize_parsed_resume(parsed_json)
+        return True, ndjson_event("result", index=index, filename=upload.filename, data=result.model_dump())
+    except HTTPException as e:
+        detail = e.detail
+    except Exception as e:
+        print(f"[ERROR] Batch item {index} ({upload.filename}) failed: {str(e)}")
+        detail = f"Failed to parse resume with AI: {str(e)}"
+    return False, ndjson_event("error", index=index, filename=upload.filename, detail=detail)
+
+async def stream_batch_events(files: List[ResumeUploadRequest], use_cache: bool):
+    """NDJSON events for /parse-resumes/batch, in completion order (see its docstring)."""
+    started = time.perf_counter()
+    # One extraction job per file keeps the cpu pool busy without overrunning its queue
+    extract_slots = asyncio.Semaphore(max(1, cpu_pool.max_workers) * 2)
+    parse_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(parse_batch_item(index, upload, use_cache, extract_slots, parse_slots))
+        for index, upload in enumerate(files)
+    ]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            succeeded, event = await next_done
+            failed += not succeeded
+            yield event
+    finally:
+        # Client went away: stop the files that have not finished
+        for task in tasks:
+            task.cancel()
+    elapsed = time.perf_counter() - started
+    print(f"[DEBUG] Batch of {len(files)} resumes done in {elapsed:.2f}s ({failed} failed)")
+    yield ndjson_event("done", total=len(files), succeeded=len(files) - failed, failed=failed,
+                       elapsed_seconds=round(elapsed, 3))
+
+@app.post("/parse-resumes/batch")
+async def parse_resumes_batch(
+    request: ResumeBatchRequest,
+    x_parse_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None),
+):
+    """
+    Parse many resumes in one request. Text is extracted in parallel in the
+    process pool, at most BATCH_CONCURRENCY parses run at once, and with
+    GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE set each Groq request
+    waits for the rate_limit token buckets (parse cache hits do not; the
+    limits are per worker process, see managix_common.rate_limit). Returns application/x-ndjson with one line per file as soon
+    as it finishes (in completion order, so index identifies the file),
+    then a summary:
+    
+        {"event": "result", "index": 0, "filename": "...", "data": {...}}   same body as /parse-resume
+        {"event": "error", "index": 3, "filename": "...", "detail": "..."}
+        {"event": "done", "total": 10, "succeeded": 9, "failed": 1, "elapsed_seconds": 4.2}
+    """
+    print(f"[DEBUG] Received batch of {len(request.files)} resumes")
+    if not request.files:
+        raise HTTPException(status_code=400, detail="At least one file is required")
+    if len(request.files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} files per batch")
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=400, detail="GROQ_API_KEY not set in environment")
+    return StreamingResponse(
+        stream_batch_events(request.files, not bypass_requested(x_parse_cache, cache_control)),
+        media_type="application/x-ndjson",
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,34 @@
+-- Unique keys backing the bulk INSERT ... ON DUPLICATE KEY UPDATE writes
+-- in app/db.py (bulk_insert_skills / bulk_insert_projects / bulk_insert_experience).
+--
+-- Run once:  mysql -u <user> -p <db> < migrations/001_unique_child_keys.sql
+
+-- 1. Drop existing duplicates, keeping the oldest row of each group
+DELETE s1 FROM skills s1
+JOIN skills s2
+  ON s1.freelancer_id = s2.freelancer_id
+ AND s1.skill_name = s2.skill_name
+ AND s1.id > s2.id;
+
+DELETE p1 FROM projects p1
+JOIN projects p2
+  ON p1.freelancer_id = p2.freelancer_id
+ AND p1.title = p2.title
+ AND p1.id > p2.id;
+
+DELETE e1 FROM experience e1
+JOIN experience e2
+  ON e1.freelancer_id = e2.freelancer_id
+ AND e1.title = e2.title
+ AND e1.company = e2.company
+ AND e1.id > e2.id;
+
+-- 2. Add the keys (191-char prefixes keep utf8mb4 keys within InnoDB limits)
+ALTER TABLE skills
+    ADD UNIQUE KEY uq_skills_freelancer_skill (freelancer_id, skill_name(191));
+
+ALTER TABLE projects
+    ADD UNIQUE KEY uq_projects_freelancer_title (freelancer_id, title(191));
+
+ALTER TABLE experience
+    ADD UNIQUE KEY uq_experience_freelancer_title_company (freelancer_id, title(191), company(191));
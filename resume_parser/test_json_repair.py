@@ -0,0 +1,103 @@
+"""Fuzz tests for app/json_repair.py"""
+import json, random, sys, time
+sys.path.insert(0, '.')
+from managix_common.json_repair import parse_json_object, repair_json
+
+rng = random.Random(1234)
+WORDS = ["Python", "Go", "React", "AWS", "Led a team", "Built APIs", "2019-2024", "São Paulo", 'say "hi"',
+         "back\\slash", "tab\there", "line\nbreak", "{braces}", "[brackets]", "comma, colon: ok", ""]
+
+
+def random_value(depth=0):
+    kind = rng.random()
+    if depth < 3 and kind < 0.25:
+        return {rng.choice(["name", "title", "skills", "items", "x y", "k:" + str(rng.randint(0, 9))]) + str(i): random_value(depth + 1)
+                for i in range(rng.randint(0, 4))}
+    if depth < 3 and kind < 0.45:
+        return [random_value(depth + 1) for _ in range(rng.randint(0, 4))]
+    if kind < 0.8:
+        return rng.choice(WORDS)
+    if kind < 0.9:
+        return rng.choice([0, 7, -3, 2.5, 1e-3, 123456789])
+    return rng.choice([True, False, None])
+
+
+def random_doc():
+    return {"name": rng.choice(WORDS), "skills": [rng.choice(WORDS) for _ in range(rng.randint(0, 6))],
+            "experience": [random_value(1) for _ in range(rng.randint(0, 3))]}
+
+
+def is_prefix_of(partial, full):
+    """Every value in partial is complete and appears at the same place in full."""
+    if isinstance(partial, dict):
+        return isinstance(full, dict) and all(k in full and is_prefix_of(v, full[k]) for k, v in partial.items())
+    if isinstance(partial, list):
+        return (isinstance(full, list) and len(partial) <= len(full)
+                and all(is_prefix_of(p, f) for p, f in zip(partial, full)))
+    return partial == full
+
+
+def wrap(text):
+    return rng.choice(["{}", "Here is the JSON:\n{}", "```json\n{}\n```", "```\n{}\n```\nLet me know!", "{} trailing notes"]).format(text)
+
+
+docs = [random_doc() for _ in range(300)]
+
+# Test 1: complete documents round-trip exactly, with or without prose/fences around them
+for doc in docs:
+    for text in (json.dumps(doc), json.dumps(doc, indent=2, ensure_ascii=False)):
+        assert parse_json_object(wrap(text)) == doc, text
+        assert json.loads(repair_json(text)) == doc, text
+print(f"[PASS] Test 1: {len(docs) * 2} complete documents round-trip")
+
+# Test 2: every truncation point yields a dict holding only complete values of the original
+cuts = 0
+for doc in docs[:120]:
+    text = json.dumps(doc, indent=rng.choice([None, 2]))
+    for end in range(1, len(text)):
+        partial = parse_json_object(text[:end])
+        assert isinstance(partial, dict)
+        assert is_prefix_of(partial, doc), (text[:end], partial)
+        cuts += 1
+print(f"[PASS] Test 2: {cuts} truncated prefixes parse to consistent partial objects")
+
+# Test 3: common LLM mistakes are repaired
+cases = [
+    ('{"a": [1, 2, ], "b": "x",}', {"a": [1, 2], "b": "x"}),
+    ('{"a": 1,, "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "line1\nline2\tend"}', {"a": "line1\nline2\tend"}),
+    ('{"path": "C:\\Users\\dev"}', {"path": "C:\\Users\\dev"}),
+    ('{"ok": True, "no": False, "none": None}', {"ok": True, "no": False, "none": None}),
+    ('{"a": [1, 2}', {"a": [1, 2]}),
+    ('{"a": {"b": 1]}', {"a": {"b": 1}}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "x", "b": }', {"a": "x"}),
+    ('{"skills": ["Python", "Ja', {"skills": ["Python"]}),
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ('Sure! {"a": {"b": [{"c": 1}, {"d": ', {"a": {"b": [{"c": 1}, {}]}}),
+    ('no json here', {}),
+    ('', {}),
+]
+for text, expected in cases:
+    got = parse_json_object(text)
+    assert got == expected, f"{text!r}: expected {expected}, got {got}"
+print(f"[PASS] Test 3: {len(cases)} malformed responses repaired")
+
+# Test 4: random garbage never raises and always returns a dict
+alphabet = '{}[]",:\\ \n abc123-.truefalsnul'
+for _ in range(3000):
+    text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+    assert isinstance(parse_json_object(text), dict), text
+print("[PASS] Test 4: 3000 random garbage strings handled")
+
+# Test 5: repair is linear - a truncated 16 KB response repairs in milliseconds
+big = json.dumps({"experience": [{"title": "Engineer %d" % i, "description": "Built APIs " * 8} for i in range(200)]})
+truncated = big[:16 * 1024]
+started = time.perf_counter()
+partial = parse_json_object(truncated)
+elapsed = time.perf_counter() - started
+assert 0 < len(partial["experience"]) < 200
+assert elapsed < 0.5, f"repair took {elapsed:.3f}s"
+print(f"[PASS] Test 5: 16 KB truncated response repaired in {elapsed * 1000:.1f} ms")
+
+print("\n=== ALL 5 TESTS PASSED ===")
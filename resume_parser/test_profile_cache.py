@@ -0,0 +1,102 @@
+"""Tests for app/profile_cache.py (version checks, write-through, counter expiry)"""
+import sys, time
+sys.path.insert(0, '.')
+from app.profile_cache import MemoryBackend, configure_profile_cache, get_profile_cache
+
+
+class FakeBackend:
+    """Dict-backed stand-in for Redis: no expiry, counters kept forever, calls recorded."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = []
+
+    def get_many(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+        self.sets.append(key)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+
+backend = FakeBackend()
+configure_profile_cache(backend, ttl=60)
+cache = get_profile_cache()
+assert cache.backend is backend, "configure_profile_cache should replace the process-wide cache"
+
+# Test 1: miss, set at the version read, then hit
+hit, value, version = cache.get("profile", 7)
+assert not hit and value is None
+cache.set("profile", 7, {"name": "Ada"}, version)
+hit, value, _ = cache.get("profile", 7)
+assert hit and value == {"name": "Ada"}, value
+print("[PASS] Test 1: read-through miss then hit")
+
+# Test 2: a write bumps the version; an entry cached under the old version is stale
+old_entry = backend.data["profile:7"]
+cache.invalidate(7)
+assert "profile:7" not in backend.data
+backend.data["profile:7"] = old_entry  # e.g. another worker's late write of the old value
+hit, _, _ = cache.get("profile", 7)
+assert not hit, "entry with an old version must not be served"
+assert cache.stats()["profile"]["stale"] == 1
+print("[PASS] Test 2: version check rejects an entry from before the write")
+
+# Test 3: a read that overlaps a write is not re-cached
+_, _, version = cache.get("parsed", 9)
+stale_read = {"summary": "before the update"}  # what the slow DB read returned
+cache.invalidate(9)                             # concurrent write commits meanwhile
+sets_before = len(backend.sets)
+cache.set("parsed", 9, stale_read, version)
+assert len(backend.sets) == sets_before, "stale read was cached"
+hit, _, _ = cache.get("parsed", 9)
+assert not hit
+print("[PASS] Test 3: stale read is not re-cached after a concurrent write")
+
+# Test 4: write-through stores the new value at the new version
+cache.invalidate(9, {"summary": "after the update"})
+hit, value, _ = cache.get("parsed", 9)
+assert hit and value == {"summary": "after the update"}, value
+hit, _, _ = cache.get("profile", 9)
+assert not hit, "write-through must only fill the parsed namespace"
+print("[PASS] Test 4: write-through after invalidate")
+
+# Test 5: a read slower than the TTL is not cached
+configure_profile_cache(backend, ttl=0.05)
+cache = get_profile_cache()
+_, _, version = cache.get("profile", 11)
+time.sleep(0.06)
+sets_before = len(backend.sets)
+cache.set("profile", 11, {"name": "slow"}, version)
+assert len(backend.sets) == sets_before, "read older than the TTL was cached"
+print("[PASS] Test 5: read older than the TTL is not cached")
+
+# Test 6: MemoryBackend drops idle version counters, and a dropped counter cannot revive an old read
+memory = MemoryBackend(max_items=100, counter_ttl=0.05)
+cache = configure_profile_cache(memory, ttl=0.05)
+_, _, version = cache.get("profile", 1)  # read at version 0, before any write
+cache.invalidate(1)
+for i in range(2, 50):
+    cache.invalidate(i)
+time.sleep(0.06)
+cache.invalidate(1000)                   # any write prunes counters idle for a TTL
+assert len(memory._counters) == 1, f"{len(memory._counters)} counters kept"
+cache.set("profile", 1, {"name": "stale"}, version)  # counter for 1 reads 0 again
+hit, _, _ = cache.get("profile", 1)
+assert not hit, "read from before the dropped write was cached"
+_, _, version = cache.get("profile", 1)
+cache.set("profile", 1, {"name": "fresh"}, version)
+hit, value, _ = cache.get("profile", 1)
+assert hit and value == {"name": "fresh"}, value
+print("[PASS] Test 6: idle version counters are dropped without reviving old reads")
+
+configure_profile_cache(MemoryBackend())
+print("\n=== ALL 6 TESTS PASSED ===")